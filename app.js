@@ -31,6 +31,7 @@ let activeFilters = {
   city: '',
   subject: '',
   week: '',
+  hours: '',
   maxCost: '',
   scholarship: '',
   county: '',
@@ -46,6 +47,7 @@ const filterGrades = document.getElementById('filterGrades');
 const filterCity = document.getElementById('filterCity');
 const filterSubject = document.getElementById('filterSubject');
 const filterWeek = document.getElementById('filterWeek');
+const filterHours = document.getElementById('filterHours');
 const filterMaxCost = document.getElementById('filterMaxCost');
 const filterScholarship = document.getElementById('filterScholarship');
 const filterCounty = document.getElementById('filterCounty');
@@ -145,6 +147,90 @@ function normalizeCostToWeekly(cost, period) {
   return cost;
 }
 
+// ===== Cost index (weekly cents) =====
+// data.js ships COST_INDEX: priced program ids sorted by weekly cost. A max
+// cost is then one binary search; a program passes if its rank is below it.
+// Free programs and those without a price are not in the index and always pass.
+let costRank = null;
+let costWeekly = [];
+
+function getCostRank() {
+  if (costRank) return costRank;
+  let idx = typeof COST_INDEX !== 'undefined' ? COST_INDEX : null;
+  if (!idx || !Array.isArray(idx.weekly)) {
+    const priced = allPrograms
+      .map(p => [p.id, Number.isFinite(p.costWeeklyCents)
+        ? p.costWeeklyCents
+        : Math.round(normalizeCostToWeekly(p.cost, p.costPeriod) * 100)])
+      .filter(([, cents]) => cents > 0)
+      .sort((a, b) => a[1] - b[1]);
+    idx = { weekly: priced.map(t => t[1]), byWeekly: priced.map(t => t[0]) };
+  }
+  costWeekly = idx.weekly;
+  costRank = new Map(idx.byWeekly.map((id, rank) => [id, rank]));
+  return costRank;
+}
+
+// ===== Schedule index (minutes since midnight) =====
+// data.js ships SCHEDULE_INDEX: program ids sorted by the start and by the end
+// of the daily window they cover (pre/after-care included where known).
+// Older data.js files lack it, so it is rebuilt here from startTime/endTime.
+let scheduleIndex = null;
+
+function parseClockMinutes(text) {
+  const m = /^(\d{1,2}):(\d{2})\s*([AP]M)$/i.exec(String(text || '').trim());
+  if (!m) return null;
+  const hour = Number(m[1]) % 12 + (m[3].toUpperCase() === 'PM' ? 12 : 0);
+  return hour * 60 + Number(m[2]);
+}
+
+function coverWindow(p) {
+  if (Number.isFinite(p.coverStart) && Number.isFinite(p.coverEnd)) return [p.coverStart, p.coverEnd];
+  const start = parseClockMinutes(p.startTime);
+  const end = parseClockMinutes(p.endTime);
+  return start !== null && end !== null ? [start, end] : null;
+}
+
+function getScheduleIndex() {
+  if (scheduleIndex) return scheduleIndex;
+  let idx = typeof SCHEDULE_INDEX !== 'undefined' ? SCHEDULE_INDEX : null;
+  if (!idx || !Array.isArray(idx.starts)) {
+    const timed = allPrograms.map(p => [p.id, coverWindow(p)]).filter(([, w]) => w);
+    const byStart = [...timed].sort((a, b) => a[1][0] - b[1][0]);
+    const byEnd = [...timed].sort((a, b) => a[1][1] - b[1][1]);
+    idx = {
+      starts: byStart.map(t => t[1][0]),
+      byStart: byStart.map(t => t[0]),
+      ends: byEnd.map(t => t[1][1]),
+      byEnd: byEnd.map(t => t[0])
+    };
+  }
+  scheduleIndex = { ...idx, timed: new Set(idx.byStart) };
+  return scheduleIndex;
+}
+
+// First index whose value is > target (upper) or >= target (lower)
+function bisect(sorted, target, upper) {
+  let lo = 0, hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (upper ? sorted[mid] <= target : sorted[mid] < target) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// Ids of programs whose daily window starts by `from` and runs until `to` or later
+function programsCovering(from, to) {
+  const idx = getScheduleIndex();
+  const startsInTime = idx.byStart.slice(0, bisect(idx.starts, from, true));
+  const endsLateEnough = idx.byEnd.slice(bisect(idx.ends, to, false));
+  const [small, large] = startsInTime.length < endsLateEnough.length
+    ? [startsInTime, new Set(endsLateEnough)]
+    : [endsLateEnough, new Set(startsInTime)];
+  return new Set(small.filter(id => large.has(id)));
+}
+
 function formatCost(cost, period) {
   if (!cost || cost === 0) return 'Contact for pricing';
   return `$${cost.toLocaleString()} / ${period}`;
@@ -198,6 +284,236 @@ function fmtWeekOption(mondayIso) {
   return `${monLabel} - ${MONTH_ABBR[fri.getMonth()]} ${fri.getDate()}, ${fri.getFullYear()}`;
 }
 
+// ===== ISO week bitmasks =====
+// data.js gives each dated program weekYear and weekMask = [lo, hi]: bit w-1
+// is ISO week w of weekYear (weeks 1-32 in lo, 33-53 in hi), and WEEK_INDEX
+// maps "YYYY-Www" to the ids running that week. Older data.js files lack
+// both, so they are derived from startDate/endDate here, once per program.
+let weekInfoCache = null;
+let weekIndex = null;
+
+function isoWeekOf(d) {
+  const thursday = new Date(d.getFullYear(), d.getMonth(), d.getDate() + 3 - (d.getDay() + 6) % 7);
+  const year = thursday.getFullYear();
+  const jan4 = new Date(year, 0, 4);
+  const week = 1 + Math.round(((thursday - jan4) / 86400000 - 3 + (jan4.getDay() + 6) % 7) / 7);
+  return { year, week };
+}
+
+function mondayOfIsoWeek(year, week) {
+  const jan4 = new Date(year, 0, 4);
+  return new Date(year, 0, 4 - (jan4.getDay() + 6) % 7 + (week - 1) * 7);
+}
+
+function weekKey(year, week) {
+  return `${year}-W${String(week).padStart(2, '0')}`;
+}
+
+function weekBit(week) {
+  return week <= 32 ? [(1 << (week - 1)) >>> 0, 0] : [0, 1 << (week - 33)];
+}
+
+function masksOverlap(a, b) {
+  return ((a[0] & b[0]) | (a[1] & b[1])) !== 0;
+}
+
+// Bitmask of the weeks of `year` touched by the days from..to (inclusive)
+function maskBetween(from, to, year) {
+  const mask = [0, 0];
+  for (let d = getMondayOfWeek(from); d <= to; d = new Date(d.getFullYear(), d.getMonth(), d.getDate() + 7)) {
+    const w = isoWeekOf(d);
+    if (w.year !== year) continue;
+    const bit = weekBit(w.week);
+    mask[0] = (mask[0] | bit[0]) >>> 0;
+    mask[1] |= bit[1];
+  }
+  return mask;
+}
+
+// { year, mask, start, end, spills } for a dated program, null otherwise
+function weekInfo(p) {
+  if (!weekInfoCache) weekInfoCache = new Map();
+  if (weekInfoCache.has(p.id)) return weekInfoCache.get(p.id);
+  let info = null;
+  const start = parseDate(p.startDate);
+  if (start) {
+    const parsedEnd = parseDate(p.endDate);
+    const end = parsedEnd && parsedEnd >= start ? parsedEnd : start;
+    const year = Number.isFinite(p.weekYear) ? p.weekYear : isoWeekOf(start).year;
+    const mask = Array.isArray(p.weekMask) ? p.weekMask : maskBetween(start, end, year);
+    info = { year, mask, start, end, spills: isoWeekOf(end).year !== year };
+  }
+  weekInfoCache.set(p.id, info);
+  return info;
+}
+
+function getWeekIndex() {
+  if (weekIndex) return weekIndex;
+  if (typeof WEEK_INDEX !== 'undefined' && WEEK_INDEX) {
+    weekIndex = WEEK_INDEX;
+    return weekIndex;
+  }
+  weekIndex = {};
+  allPrograms.forEach(p => {
+    const info = weekInfo(p);
+    if (!info) return;
+    for (let week = 1; week <= 53; week++) {
+      if (!masksOverlap(info.mask, weekBit(week))) continue;
+      const key = weekKey(info.year, week);
+      (weekIndex[key] = weekIndex[key] || []).push(p.id);
+    }
+  });
+  return weekIndex;
+}
+
+// ===== Facet bitsets (option counts) =====
+// data.js ships FACET_INDEX: for every filter option, a bitset (bit i is
+// allPrograms[i]) of the programs that pass when it is picked. Counts next
+// to each option are the bits left after ANDing the other active filters.
+// Older data.js files lack it, so it is rebuilt here from the programs.
+let facetIndex = null;
+const facetExtraBits = new Map(); // hours / search / past bitsets, by key
+
+function decodeBitset(b64) {
+  const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+  return new Uint32Array(bytes.buffer, 0, bytes.length >> 2);
+}
+
+function bitsetOf(size, keep) {
+  const bits = new Uint32Array((size + 31) >> 5);
+  for (let i = 0; i < size; i++) if (keep(allPrograms[i], i)) bits[i >> 5] |= 1 << (i & 31);
+  return bits;
+}
+
+function popcount(x) {
+  x -= (x >>> 1) & 0x55555555;
+  x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+  return (((x + (x >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+function getFacetIndex() {
+  if (facetIndex) return facetIndex;
+  const size = allPrograms.length;
+  const idx = typeof FACET_INDEX !== 'undefined' ? FACET_INDEX : null;
+  facetIndex = {};
+  if (idx && idx.size === size) {
+    for (const [facet, values] of Object.entries(idx)) {
+      if (facet === 'size') continue;
+      facetIndex[facet] = new Map(Object.entries(values).map(([v, b64]) => [v, decodeBitset(b64)]));
+    }
+    return facetIndex;
+  }
+  const valuesOf = {
+    category: p => [p.category],
+    type: p => [p.providerProgramType || p.type],
+    city: p => [p.city],
+    county: p => [p.county],
+    subject: p => p.subjects || [],
+    stars: p => [p.starsLevel],
+    status: p => [p.referralStatus],
+    scholarship: p => (p.scholarshipAvailable ? ['yes'] : []),
+  };
+  for (const [facet, fn] of Object.entries(valuesOf)) {
+    const values = new Set(allPrograms.flatMap(p => fn(p)).filter(v => v != null && v !== '').map(String));
+    facetIndex[facet] = new Map([...values].map(v => [v, bitsetOf(size, p => fn(p).map(String).includes(v))]));
+  }
+  facetIndex.grade = new Map(gradeOrder.map(g => [g, bitsetOf(size, p => gradesOverlap(p.gradesMin, p.gradesMax, g))]));
+  const rank = getCostRank();
+  facetIndex.maxCost = new Map([100, 200, 300, 500, 1000].map(d => {
+    const bound = bisect(costWeekly, d * 100, true);
+    return [String(d), bitsetOf(size, p => !(rank.get(p.id) >= bound))];
+  }));
+  facetIndex.week = new Map(Object.entries(getWeekIndex()).map(([key, ids]) => {
+    const set = new Set(ids);
+    return [key, bitsetOf(size, p => set.has(p.id) || !weekInfo(p))];
+  }));
+  return facetIndex;
+}
+
+// Bitset of programs passing one filter value; null means no restriction.
+function facetBits(facet, value) {
+  if (!value) return null;
+  const size = allPrograms.length;
+  if (facet === 'week') {
+    const monday = parseDate(value);
+    if (!monday) return null;
+    const w = isoWeekOf(monday);
+    value = weekKey(w.year, w.week);
+  }
+  if (facet === 'hours' || facet === 'search') {
+    const key = `${facet}:${value}`;
+    if (!facetExtraBits.has(key)) {
+      let keep;
+      if (facet === 'hours') {
+        const [from, to] = value.split('-').map(Number);
+        const covering = programsCovering(from, to);
+        const timed = getScheduleIndex().timed;
+        keep = p => !timed.has(p.id) || covering.has(p.id);
+      } else {
+        keep = p => [p.name, p.organization, p.city, p.county, p.description, ...(p.subjects || [])]
+          .join(' ').toLowerCase().includes(value);
+      }
+      if (facetExtraBits.size > 200) facetExtraBits.clear();
+      facetExtraBits.set(key, bitsetOf(size, keep));
+    }
+    return facetExtraBits.get(key);
+  }
+  const values = getFacetIndex()[facet];
+  return (values && values.get(String(value))) || new Uint32Array((size + 31) >> 5);
+}
+
+// Filter selects and the facet / activeFilters key behind each. Which ones
+// apply depends on the category, exactly as in applyFilters().
+const FACET_SELECTS = [
+  [filterType, 'type', 'type', 'all'],
+  [filterGrades, 'grade', 'grades', 'all'],
+  [filterCity, 'city', 'city', 'all'],
+  [filterSubject, 'subject', 'subject', 'all'],
+  [filterHours, 'hours', 'hours', 'all'],
+  [filterMaxCost, 'maxCost', 'maxCost', 'camp'],
+  [filterScholarship, 'scholarship', 'scholarship', 'camp'],
+  [filterWeek, 'week', 'week', 'camp'],
+  [filterCounty, 'county', 'county', 'provider'],
+  [filterStars, 'stars', 'stars', 'provider'],
+  [filterStatus, 'status', 'status', 'provider'],
+];
+
+function facetApplies(scope) {
+  return scope === 'all' || (scope === 'camp') === (activeCategory === 'camp');
+}
+
+function updateFacetCounts() {
+  const size = allPrograms.length;
+  const words = (size + 31) >> 5;
+  const always = [facetBits('category', activeCategory)];
+  const search = activeFilters.search.toLowerCase().trim();
+  if (search) always.push(facetBits('search', search));
+  if (!activeFilters.showPast) {
+    if (!facetExtraBits.has('past')) facetExtraBits.set('past', bitsetOf(size, p => !isPast(p)));
+    always.push(facetExtraBits.get('past'));
+  }
+  const active = FACET_SELECTS
+    .filter(([, , key, scope]) => facetApplies(scope) && activeFilters[key])
+    .map(([, facet, key]) => [facet, facetBits(facet, activeFilters[key])]);
+
+  FACET_SELECTS.forEach(([selectEl, facet, key, scope]) => {
+    if (!selectEl || !facetApplies(scope)) return;
+    const base = new Uint32Array(words).fill(0xffffffff);
+    for (const bits of always.concat(active.filter(([f]) => f !== facet).map(([, b]) => b))) {
+      for (let w = 0; w < words; w++) base[w] &= bits[w];
+    }
+    for (const opt of selectEl.options) {
+      if (!opt.value) continue;
+      if (opt.dataset.label === undefined) opt.dataset.label = opt.textContent;
+      const bits = facetBits(facet, opt.value);
+      let count = 0;
+      for (let w = 0; w < words; w++) count += popcount(base[w] & bits[w]);
+      opt.textContent = `${opt.dataset.label} (${count})`;
+      opt.disabled = count === 0 && opt.value !== activeFilters[key];
+    }
+  });
+}
+
 function show(el, isVisible) {
   if (!el) return;
   el.classList.toggle('hidden', !isVisible);
@@ -257,14 +573,14 @@ function populateDropdown(selectEl, values, firstLabel) {
 
 function populateWeekDropdown(programs) {
   resetFilterOptions(filterWeek, 'Any Week');
-  const mondaySet = new Set();
-  programs.forEach(p => {
-    if (!p.startDate) return;
-    const d = parseDate(p.startDate);
-    if (!d) return;
-    mondaySet.add(toIso(getMondayOfWeek(d)));
-  });
-  [...mondaySet].sort().forEach(iso => {
+  const ids = new Set(programs.map(p => p.id));
+  const mondays = Object.entries(getWeekIndex())
+    .filter(([, postings]) => postings.some(id => ids.has(id)))
+    .map(([key]) => {
+      const [year, week] = key.split('-W').map(Number);
+      return toIso(mondayOfIsoWeek(year, week));
+    });
+  [...new Set(mondays)].sort().forEach(iso => {
     const opt = document.createElement('option');
     opt.value = iso;
     opt.textContent = fmtWeekOption(iso);
@@ -315,6 +631,27 @@ function applyFilters() {
   const search = activeFilters.search.toLowerCase().trim();
   const isCamp = activeCategory === 'camp';
 
+  let costBound = -1;
+  if (isCamp && activeFilters.maxCost !== '') {
+    getCostRank();
+    costBound = bisect(costWeekly, parseInt(activeFilters.maxCost, 10) * 100, true);
+  }
+
+  let wantWeek = null;
+  if (isCamp && activeFilters.week) {
+    const monday = parseDate(activeFilters.week);
+    if (monday) {
+      const w = isoWeekOf(monday);
+      wantWeek = { year: w.year, mask: weekBit(w.week) };
+    }
+  }
+
+  let covering = null;
+  if (activeFilters.hours) {
+    const [from, to] = activeFilters.hours.split('-').map(Number);
+    covering = programsCovering(from, to);
+  }
+
   return categoryPrograms().filter(p => {
     if (!activeFilters.showPast && isPast(p)) return false;
 
@@ -336,19 +673,19 @@ function applyFilters() {
     if (activeFilters.grades && !gradesOverlap(p.gradesMin, p.gradesMax, activeFilters.grades)) return false;
     if (activeFilters.city && p.city !== activeFilters.city) return false;
     if (activeFilters.subject && !(p.subjects || []).includes(activeFilters.subject)) return false;
+    // Programs without parsed hours stay visible, like unknown grades
+    if (covering && getScheduleIndex().timed.has(p.id) && !covering.has(p.id)) return false;
 
     if (isCamp) {
-      if (activeFilters.maxCost !== '') {
-        const max = parseInt(activeFilters.maxCost, 10);
-        if (p.cost !== 0 && normalizeCostToWeekly(p.cost, p.costPeriod) > max) return false;
+      if (costBound >= 0) {
+        const rank = costRank.get(p.id);
+        if (rank !== undefined && rank >= costBound) return false;
       }
       if (activeFilters.scholarship === 'yes' && !p.scholarshipAvailable) return false;
-      if (activeFilters.week) {
-        if (!p.startDate) return true;
-        const d = parseDate(p.startDate);
-        if (!d) return true;
-        const campMonday = toIso(getMondayOfWeek(d));
-        if (campMonday !== activeFilters.week) return false;
+      // Match every week a program runs, not just its first; undated programs stay
+      if (wantWeek) {
+        const info = weekInfo(p);
+        if (info && (info.year !== wantWeek.year || !masksOverlap(info.mask, wantWeek.mask))) return false;
       }
     } else {
       if (activeFilters.county && p.county !== activeFilters.county) return false;
@@ -469,21 +806,25 @@ function renderCalendar(programs) {
 
   const dayMap = {};
   const undated = [];
+  const monthStart = new Date(year, month, 1);
+  const monthEnd = new Date(year, month + 1, 0);
+  const monthMasks = {};
 
   programs.forEach(p => {
-    if (!p.startDate) {
+    const info = weekInfo(p);
+    if (!info) {
       undated.push(p);
       return;
     }
 
-    const start = parseDate(p.startDate);
-    const end = p.endDate ? parseDate(p.endDate) : start;
-    if (!start || !end) {
-      undated.push(p);
-      return;
+    // Skip programs with no week in this month without walking their days
+    if (!info.spills) {
+      if (!monthMasks[info.year]) monthMasks[info.year] = maskBetween(monthStart, monthEnd, info.year);
+      if (!masksOverlap(info.mask, monthMasks[info.year])) return;
     }
 
-    const cur = new Date(start);
+    const cur = new Date(Math.max(info.start, monthStart));
+    const end = info.end < monthEnd ? info.end : monthEnd;
     while (cur <= end) {
       const iso = toIso(cur);
       if (!dayMap[iso]) dayMap[iso] = [];
@@ -784,6 +1125,7 @@ function switchView(view) {
 
 function update() {
   lastFiltered = applyFilters();
+  updateFacetCounts();
   const total = categoryPrograms().length;
   resultsCount.innerHTML = `Showing <strong>${lastFiltered.length}</strong> of <strong>${total}</strong> ${categoryLabel(activeCategory)}`;
 
@@ -801,6 +1143,7 @@ function clearAllFilters() {
     city: '',
     subject: '',
     week: '',
+    hours: '',
     maxCost: '',
     scholarship: '',
     county: '',
@@ -814,6 +1157,7 @@ function clearAllFilters() {
   filterCity.value = '';
   filterSubject.value = '';
   filterWeek.value = '';
+  filterHours.value = '';
   filterMaxCost.value = '';
   filterScholarship.value = '';
   filterCounty.value = '';
@@ -830,6 +1174,7 @@ filterGrades.addEventListener('change', e => { activeFilters.grades = e.target.v
 filterCity.addEventListener('change', e => { activeFilters.city = e.target.value; update(); });
 filterSubject.addEventListener('change', e => { activeFilters.subject = e.target.value; update(); });
 filterWeek.addEventListener('change', e => { activeFilters.week = e.target.value; update(); });
+filterHours.addEventListener('change', e => { activeFilters.hours = e.target.value; update(); });
 filterMaxCost.addEventListener('change', e => { activeFilters.maxCost = e.target.value; update(); });
 filterScholarship.addEventListener('change', e => { activeFilters.scholarship = e.target.value; update(); });
 filterCounty.addEventListener('change', e => { activeFilters.county = e.target.value; update(); });
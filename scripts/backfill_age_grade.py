@@ -6,47 +6,57 @@ Only fills in blank values; never overwrites existing data.
 
 Run from project root:
   python scripts/backfill_age_grade.py
+  python scripts/backfill_age_grade.py --stream   # constant memory, row by row
 """
 
-import csv
+import argparse
 from pathlib import Path
 
+from column_table import ColumnTable
+from csv_io import read_csv, rewrite_csv_streaming
+
 PROGRAMS_PATH = Path("data/programs.csv")
 AGE_GRADE_PATH = Path("data/age_to_grade.csv")
+BOUND_COLUMNS = ("age_min", "age_max", "grades_min", "grades_max")
+
+
+def load_mapping():
+    """Return (start_age_to_grade, end_age_to_grade, grade_to_start_age, grade_to_end_age)."""
+    _, mapping_rows = read_csv(AGE_GRADE_PATH)
+
+    start_age_to_grade = {}
+    end_age_to_grade = {}
+    grade_to_start_age = {}
+    grade_to_end_age = {}
+
+    for row in mapping_rows:
+        start_age = (row.get("Start Age") or "").strip()
+        end_age = (row.get("End Age") or "").strip()
+        grade = (row.get("Grade") or "").strip().upper()
+
+        if start_age and grade:
+            start_age_to_grade[start_age] = grade
+            grade_to_start_age[grade] = start_age
+        if end_age and grade:
+            end_age_to_grade[end_age] = grade
+            grade_to_end_age[grade] = end_age
+
+    return start_age_to_grade, end_age_to_grade, grade_to_start_age, grade_to_end_age
+
+
+def new_changes() -> dict:
+    return {
+        "grades_min_from_age_min": 0,
+        "grades_max_from_age_max": 0,
+        "age_min_from_grades_min": 0,
+        "age_max_from_grades_max": 0,
+    }
+
+
+def backfill_row(row, mapping, changes: dict) -> None:
+    """Fill one row's blank age/grade bounds from the lookup tables."""
+    start_age_to_grade, end_age_to_grade, grade_to_start_age, grade_to_end_age = mapping
 
-with AGE_GRADE_PATH.open("r", encoding="utf-8-sig", newline="") as file:
-    mapping_rows = list(csv.DictReader(file))
-
-start_age_to_grade = {}
-end_age_to_grade = {}
-grade_to_start_age = {}
-grade_to_end_age = {}
-
-for row in mapping_rows:
-    start_age = (row.get("Start Age") or "").strip()
-    end_age = (row.get("End Age") or "").strip()
-    grade = (row.get("Grade") or "").strip().upper()
-
-    if start_age and grade:
-        start_age_to_grade[start_age] = grade
-        grade_to_start_age[grade] = start_age
-    if end_age and grade:
-        end_age_to_grade[end_age] = grade
-        grade_to_end_age[grade] = end_age
-
-with PROGRAMS_PATH.open("r", encoding="utf-8-sig", newline="") as file:
-    reader = csv.DictReader(file)
-    fieldnames = reader.fieldnames
-    rows = list(reader)
-
-changes = {
-    "grades_min_from_age_min": 0,
-    "grades_max_from_age_max": 0,
-    "age_min_from_grades_min": 0,
-    "age_max_from_grades_max": 0,
-}
-
-for row in rows:
     age_min   = (row.get("age_min") or "").strip()
     age_max   = (row.get("age_max") or "").strip()
     grade_min = (row.get("grades_min") or "").strip()
@@ -70,14 +80,72 @@ for row in rows:
         row["age_max"] = grade_to_end_age[grade_max.upper()]
         changes["age_max_from_grades_max"] += 1
 
-with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as file:
-    writer = csv.DictWriter(file, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(rows)
-
-print("Updated rows with mapping-based backfill:")
-for key, value in changes.items():
-    print(f"  {key}: {value}")
-print("Total fill operations:", sum(changes.values()))
-print("Rows processed:", len(rows))
-print("Next step: python scripts/build_data_js.py")
+
+def transform(table: ColumnTable, mapping=None) -> dict:
+    """Fill blank age/grade bounds in place; return fill counts.
+
+    A row's result depends only on its four bound values, so backfill_row
+    runs once per distinct combination of their dictionary codes and the
+    result is reused for every row with the same codes.
+    """
+    if mapping is None:
+        mapping = load_mapping()
+    changes = new_changes()
+    columns = [table.column(name) for name in BOUND_COLUMNS]
+    filled = {}  # codes -> (new codes, fill counts)
+    for i in range(len(table)):
+        codes = tuple(column.codes[i] for column in columns)
+        result = filled.get(codes)
+        if result is None:
+            row = {name: column.values[code]
+                   for name, column, code in zip(BOUND_COLUMNS, columns, codes)}
+            counts = new_changes()
+            backfill_row(row, mapping, counts)
+            new_codes = tuple(column.intern(row[name])
+                              for name, column in zip(BOUND_COLUMNS, columns))
+            result = filled[codes] = (new_codes, counts)
+        new_codes, counts = result
+        if new_codes != codes:
+            for column, code in zip(columns, new_codes):
+                column.codes[i] = code
+            for key, count in counts.items():
+                changes[key] += count
+    return changes
+
+
+def transform_stream(path: Path, mapping=None):
+    """Rewrite `path` row by row in constant memory; return (changes, rows)."""
+    if mapping is None:
+        mapping = load_mapping()
+    changes = new_changes()
+    rows = rewrite_csv_streaming(path, lambda row: backfill_row(row, mapping, changes))
+    return changes, rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill grades from ages and vice versa")
+    parser.add_argument("--stream", action="store_true",
+                        help="rewrite row by row in constant memory instead of loading the file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.stream:
+        changes, rows = transform_stream(PROGRAMS_PATH)
+    else:
+        table = ColumnTable.read(PROGRAMS_PATH)
+        changes = transform(table)
+        table.write(PROGRAMS_PATH)
+        rows = len(table)
+
+    print("Updated rows with mapping-based backfill:")
+    for key, value in changes.items():
+        print(f"  {key}: {value}")
+    print("Total fill operations:", sum(changes.values()))
+    print("Rows processed:", rows)
+    print("Next step: python scripts/build_data_js.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Compare dev_server.py's thread and async cores under many idle connections.
+
+For each core this starts `dev_server.py --server <mode> --no-rebuild` on
+a free port, then:
+
+  1. opens --connections live-reload streams (GET /__reload_events) and
+     waits for each one's first "version" event; they then sit idle, like
+     open browser tabs
+  2. reads the server's thread count and resident memory from /proc
+  3. times --requests fresh GET /__reload_version requests while those
+     streams stay open (p50 / p99 / max)
+  4. writes a file under data/.cache/ and times how long until every
+     stream has received the new version (then deletes it)
+
+The thread core parks one thread per stream; the async core holds them
+all on one event loop. Resident memory and thread counts come from
+/proc/<pid>/status, so this needs Linux. Each stream is a socket on both
+sides: raise `ulimit -n` above twice --connections first.
+
+Run from project root:
+    python scripts/bench_server.py
+    python scripts/bench_server.py --connections 2000 --modes async
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEV_SERVER = PROJECT_ROOT / "scripts/dev_server.py"
+TOUCH_DIR = PROJECT_ROOT / "data/.cache"
+STARTUP_TIMEOUT_SECONDS = 30.0
+EVENT_TIMEOUT_SECONDS = 60.0
+EVENTS_REQUEST = b"GET /__reload_events HTTP/1.1\r\nHost: localhost\r\n\r\n"
+VERSION_REQUEST = b"GET /__reload_version HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_status(pid: int) -> dict:
+    """Threads and VmRSS (kB) of a process."""
+    status = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in {"Threads", "VmRSS"}:
+                status[key] = int(value.split()[0])
+    return status
+
+
+def get_version(port: int) -> float:
+    """One request on a fresh connection; returns the latency in ms."""
+    started = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        s.sendall(VERSION_REQUEST)
+        while s.recv(65536):
+            pass
+    return (time.perf_counter() - started) * 1000
+
+
+def wait_until_up(port: int, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"dev_server.py exited with {server.returncode}")
+        try:
+            get_version(port)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("dev_server.py did not start")
+
+
+def read_events(streams: dict, count: int, timeout: float) -> None:
+    """Read until every stream has seen `count` "event: version" lines."""
+    selector = selectors.DefaultSelector()
+    waiting = 0
+    for sock, stream in streams.items():
+        if stream["events"] < count:
+            selector.register(sock, selectors.EVENT_READ)
+            waiting += 1
+    deadline = time.monotonic() + timeout
+    while waiting:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise SystemExit(f"{waiting} streams never got version event {count}")
+        for key, _ in selector.select(left):
+            stream = streams[key.fileobj]
+            data = key.fileobj.recv(65536)
+            if not data:
+                raise SystemExit("server closed an event stream")
+            text = stream["tail"] + data
+            stream["events"] += text.count(b"event: version")
+            stream["tail"] = text[-len(b"event: version"):]
+            if stream["events"] >= count:
+                selector.unregister(key.fileobj)
+                waiting -= 1
+    selector.close()
+
+
+def open_streams(port: int, connections: int) -> dict:
+    streams = {}
+    for _ in range(connections):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(EVENTS_REQUEST)
+        streams[sock] = {"events": 0, "tail": b""}
+    read_events(streams, 1, EVENT_TIMEOUT_SECONDS)
+    return streams
+
+
+def bench(mode: str, args: argparse.Namespace) -> dict:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, str(DEV_SERVER), "--server", mode, "--port", str(port)]
+        + ["--no-rebuild"],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    streams = {}
+    touch = TOUCH_DIR / f"bench-{os.getpid()}.json"
+    try:
+        wait_until_up(port, server)
+        idle = proc_status(server.pid)
+
+        started = time.perf_counter()
+        streams = open_streams(port, args.connections)
+        connect_s = time.perf_counter() - started
+        held = proc_status(server.pid)
+
+        latencies = sorted(get_version(port) for _ in range(args.requests))
+
+        TOUCH_DIR.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        touch.write_text("{}\n")
+        read_events(streams, 2, EVENT_TIMEOUT_SECONDS)
+        broadcast_s = time.perf_counter() - started
+    finally:
+        for sock in streams:
+            sock.close()
+        touch.unlink(missing_ok=True)
+        server.terminate()
+        server.wait()
+
+    return {
+        "mode": mode,
+        "threads": f"{idle['Threads']} -> {held['Threads']}",
+        "rss": f"{idle['VmRSS'] / 1024:.0f} -> {held['VmRSS'] / 1024:.0f} MB",
+        "connect": f"{connect_s:.2f} s",
+        "p50": f"{statistics.median(latencies):.2f} ms",
+        "p99": f"{latencies[int(len(latencies) * 0.99) - 1]:.2f} ms",
+        "max": f"{latencies[-1]:.2f} ms",
+        # includes the file watcher's debounce
+        "broadcast": f"{broadcast_s * 1000:.0f} ms",
+    }
+
+
+def print_table(rows: list) -> None:
+    columns = list(rows[0])
+    widths = {col: max(len(col), *(len(row[col]) for row in rows)) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(row[col].ljust(widths[col]) for col in columns))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark dev_server.py's thread and async cores with idle event streams"
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=1000,
+        help="Idle /__reload_events streams to hold open (default: 1000)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=500,
+        help="/__reload_version requests to time while they are open (default: 500)",
+    )
+    parser.add_argument(
+        "--modes",
+        default="thread,async",
+        help="Comma-separated server cores to run (default: thread,async)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rows = []
+    for mode in args.modes.split(","):
+        print(f"[bench] {mode}: {args.connections} streams, {args.requests} requests")
+        rows.append(bench(mode.strip(), args))
+    print()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,26 @@ Run from project root:
 Outputs data.js containing:
     const PROGRAMS = [...];       // all programs with org fields merged in
     const ORGANIZATIONS = [...];  // full org list for the "More from this org" modal
+    const SCHEDULE_INDEX = {...}; // program ids sorted by daily start / end minute
+    const COST_INDEX = {...};     // program ids sorted by weekly cost, plus a histogram
+    const WEEK_INDEX = {...};     // "YYYY-Www" ISO week -> ids of programs running that week
+    const FACET_INDEX = {...};    // per filter option, a bitset of the programs it keeps
 """
 
-import csv
+import base64
 import json
 import re
+import struct
 import subprocess
 import sys
-from datetime import datetime
+from bisect import bisect_right
+from datetime import date, datetime
 from pathlib import Path
 
+from cost_model import Cost
+from csv_io import atomic_text_writer
+from schema import Grade, Organization, Program, day_iso, load_records
+
 ROOT         = Path(__file__).parent.parent
 ORGS_CSV     = ROOT / "data/organizations.csv"
 PROGRAMS_CSV = ROOT / "data/programs.csv"
@@ -26,23 +36,22 @@ OUT_PATH     = ROOT / "data.js"
 VALIDATE     = ROOT / "scripts/validate_data.py"
 
 GRADE_ORDER = ["K","1","2","3","4","5","6","7","8","9","10","11","12"]
+# Upper edges (weekly cents) of the COST_INDEX histogram; matches the
+# "Max Cost" options in index.html
+COST_BUCKET_EDGES = [10000, 20000, 30000, 50000, 100000]
 
 
 # ── Normalization helpers (carried from csv_to_data_js.py) ───────────────────
 
-def normalize_grade(raw: str) -> str:
-    val = (raw or "").strip().upper()
-    if val in ("K", "KINDER", "KINDERGARTEN"):
-        return "K"
-    if val in GRADE_ORDER:
-        return val
-    return ""
+def grade_label(grade) -> str:
+    """"K".."12" for a Grade; blank for None and PK (not shown in the UI)."""
+    if grade is None or grade < Grade.K:
+        return ""
+    return grade.label
 
 
-def grade_from_age(age_str: str, is_start: bool) -> str:
-    try:
-        age = int((age_str or "").strip())
-    except (ValueError, AttributeError):
+def grade_from_age(age, is_start: bool) -> str:
+    if age is None:
         return ""
     grade_index = (age - 5) if is_start else (age - 6)
     if 0 <= grade_index < len(GRADE_ORDER):
@@ -50,33 +59,6 @@ def grade_from_age(age_str: str, is_start: bool) -> str:
     return ""
 
 
-def parse_cost(raw: str):
-    """Return (cost_int, period_str) from a messy cost string."""
-    if not raw:
-        return None, None
-    text = raw.lower()
-    if any(w in text for w in ("free", "no cost", "no charge", "federally")):
-        return 0, "session"
-    amounts = re.findall(r"\$([0-9,]+(?:\.[0-9]{1,2})?)", text)
-    if not amounts:
-        amounts = re.findall(r"(?<!\d)([0-9]{2,5})(?!\d)", text)
-    if not amounts:
-        return None, None
-    try:
-        cost = int(amounts[0].replace(",", "").split(".")[0])
-    except ValueError:
-        return None, None
-    if "per week" in text or "/week" in text or "week" in text:
-        period = "week"
-    elif "per day" in text or "/day" in text or "day" in text:
-        period = "day"
-    elif "per month" in text or "/month" in text or "month" in text:
-        period = "month"
-    else:
-        period = "session"
-    return cost, period
-
-
 def has_scholarship(cost_text: str, notes_text: str) -> bool:
     combined = ((cost_text or "") + " " + (notes_text or "")).lower()
     return any(kw in combined for kw in (
@@ -85,23 +67,30 @@ def has_scholarship(cost_text: str, notes_text: str) -> bool:
     ))
 
 
-def normalize_bool(v: str) -> bool:
-    return (v or "").strip().lower() in ("true", "yes", "1")
+def normalize_date(day, raw: str) -> str:
+    """ISO date for a parsed date ordinal, else the CSV text unchanged."""
+    return day_iso(day) if day is not None else raw
 
 
-def normalize_date(raw: str) -> str:
-    raw = (raw or "").strip()
-    if not raw:
-        return ""
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", raw):
-        return raw
-    m = re.match(r"(\d{1,2})/(\d{1,2})/(\d{2,4})$", raw)
-    if m:
-        month, day, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        if year < 100:
-            year += 2000
-        return f"{year:04d}-{month:02d}-{day:02d}"
-    return raw
+def week_mask(start_day, end_day):
+    """(ISO year, [lo, hi]) bitmask of the ISO weeks a date span covers.
+
+    Week w of the start date's ISO year is bit w-1: weeks 1-32 in lo, 33-53
+    in hi, so app.js can test them with 32-bit bitwise ops. Weeks that spill
+    into the next ISO year are dropped. None for undated programs.
+    """
+    if start_day is None:
+        return None
+    end_day = max(end_day or start_day, start_day)
+    year = date.fromordinal(start_day).isocalendar()[0]
+    bits = 0
+    monday = start_day - date.fromordinal(start_day).weekday()
+    for ordinal in range(monday, end_day + 1, 7):
+        iso_year, week, _ = date.fromordinal(ordinal).isocalendar()
+        if iso_year != year:
+            break
+        bits |= 1 << (week - 1)
+    return year, [bits & 0xFFFFFFFF, bits >> 32]
 
 
 def build_hours(start_time: str, end_time: str) -> str:
@@ -197,97 +186,70 @@ def build_fallback_description(org_name, prog_name, city, subjects, sg, eg, cost
 # ── Load data ────────────────────────────────────────────────────────────────
 
 def load_orgs() -> dict:
-    orgs = {}
-    with open(ORGS_CSV, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            oid = (row.get("org_id") or "").strip()
-            if oid:
-                orgs[oid] = {k: (v or "").strip() for k, v in row.items()}
-    return orgs
+    _, records = load_records(Organization, ORGS_CSV)
+    return {org.org_id: org for org in records if org.org_id}
 
 
 def load_programs() -> list:
-    with open(PROGRAMS_CSV, newline="", encoding="utf-8") as f:
-        return [{k: (v or "").strip() for k, v in row.items()}
-                for row in csv.DictReader(f)]
+    _, records = load_records(Program, PROGRAMS_CSV)
+    return records
 
 
 # ── Build JS program objects ─────────────────────────────────────────────────
 
-def build_program_obj(prog: dict, org: dict, uid: int) -> dict:
-    org_id      = prog.get("org_id", "")
-    prog_type   = prog.get("program_type", "camp")
-    is_free     = prog.get("cost_per_week") == "0" or prog.get("cost_raw", "").lower() == "free"
+def build_program_obj(prog: Program, org: Organization, uid: int) -> dict:
+    org_id      = prog.org_id
+    prog_type   = prog.program_type
+    is_free     = prog.cost_per_week == "0" or prog.cost_raw.lower() == "free"
 
     # City and address: program site overrides org
-    city    = prog.get("site_city") or org.get("city", "")
-    address = prog.get("site_address") or org.get("street_address", "")
-    county  = prog.get("site_county") or org.get("county", "")
+    city    = prog.site_city or org.city
+    address = prog.site_address or org.street_address
+    county  = prog.site_county or org.county
 
     # Grades
-    sg = normalize_grade(prog.get("grades_min", ""))
-    eg = normalize_grade(prog.get("grades_max", ""))
-    if not sg:
-        sg = grade_from_age(prog.get("age_min", ""), is_start=True)
-    if not eg:
-        eg = grade_from_age(prog.get("age_max", ""), is_start=False)
-
-    # Ages
-    try:
-        age_min = int(prog.get("age_min", ""))
-    except (ValueError, TypeError):
-        age_min = None
-    try:
-        age_max = int(prog.get("age_max", ""))
-    except (ValueError, TypeError):
-        age_max = None
+    sg = grade_label(prog.min_grade) or grade_from_age(prog.min_age, is_start=True)
+    eg = grade_label(prog.max_grade) or grade_from_age(prog.max_age, is_start=False)
 
     # Cost
-    cost_raw = prog.get("cost_raw", "")
-    cost_notes = prog.get("cost_notes", "")
-    if prog.get("cost_per_week"):
-        try:
-            cost_val  = int(float(prog["cost_per_week"]))
-            cost_period = "week"
-        except ValueError:
-            cost_val, cost_period = parse_cost(cost_raw)
-    else:
-        cost_val, cost_period = parse_cost(cost_raw)
-
-    if is_free:
-        cost_val   = 0
-        cost_period = "session"
+    cost_raw = prog.cost_raw
+    cost_notes = prog.cost_notes
+    cost = Cost(0, "session") if is_free else prog.cost
+    cost_val    = cost.amount_cents // 100 if cost else None
+    cost_period = cost.period if cost else None
 
     scholarship = (
-        normalize_bool(org.get("financial_aid_available", ""))
+        org.financial_aid
         or has_scholarship(cost_raw, cost_notes)
     )
 
     # Subjects
-    name = prog.get("program_name", "")
-    desc = prog.get("description", "")
-    subjects = extract_subjects(name, desc, prog.get("activities", ""))
+    name = prog.program_name
+    desc = prog.description
+    subjects = extract_subjects(name, desc, prog.activities)
 
     # Fallback description
     if not desc:
         desc = build_fallback_description(
-            org.get("org_name", org_id), name, city,
+            org.org_name, name, city,
             subjects, sg, eg, cost_val, cost_period or "session",
         )
 
     # Hours
-    hours = build_hours(prog.get("start_time", ""), prog.get("end_time", ""))
+    hours = build_hours(prog.start_time, prog.end_time)
+
+    weeks = week_mask(prog.start_day, prog.end_day)
 
     # Registration
-    reg_url = prog.get("registration_url", "") or org.get("website", "")
-    accepting = prog.get("confidence", "confirmed") != "inactive"
+    reg_url = prog.registration_url or org.website
+    accepting = prog.confidence != "inactive"
 
     # Type label
     if prog_type == "afterschool":
-        type_label = prog.get("funding_source", "") or "Afterschool"
+        type_label = prog.funding_source or "Afterschool"
         if "21" in type_label:
             type_label = "21CCLC Afterschool (Free)"
-    elif prog.get("pre_after_care", "").lower() in ("yes", "y", "true"):
+    elif prog.pre_after_care.lower() in ("yes", "y", "true"):
         type_label = "Both"
     else:
         type_label = "Summer Camp"
@@ -299,129 +261,360 @@ def build_program_obj(prog: dict, org: dict, uid: int) -> dict:
         "name":                 name,
         "type":                 type_label,
         "isFree":               is_free,
-        "organization":         org.get("org_name", org_id),
+        "organization":         org.org_name,
         "orgId":                org_id,
-        "orgName":              org.get("org_name", ""),
+        "orgName":              org.org_name,
         "address":              address,
         "city":                 city,
-        "state":                org.get("state", "VT"),
-        "zip":                  org.get("zip", ""),
+        "state":                org.state,
+        "zip":                  org.zip,
         "county":               county,
-        "phone":                org.get("phone", ""),
-        "email":                org.get("email", ""),
+        "phone":                org.phone,
+        "email":                org.email,
         "website":              reg_url,
         "gradesMin":            sg,
         "gradesMax":            eg,
-        "ageMin":               age_min,
-        "ageMax":               age_max,
+        "ageMin":               prog.min_age,
+        "ageMax":               prog.max_age,
         "cost":                 cost_val if cost_val is not None else 0,
         "costPeriod":           cost_period or "session",
+        "costWeeklyCents":      cost.weekly_cents if cost else None,
+        "costDailyCents":       cost.daily_cents if cost else None,
+        "costSessionCents":     cost.session_cents if cost else None,
+        "costNeedsReview":      cost.needs_review if cost else False,
         "scholarshipAvailable": scholarship,
         "hours":                hours,
-        "daysOffered":          prog.get("days_of_week", "Mon–Fri"),
-        "sessionType":          prog.get("schedule_type", "weekly").title(),
+        "startMinute":          prog.start_minute,
+        "endMinute":            prog.end_minute,
+        "coverStart":           prog.cover_start,
+        "coverEnd":             prog.cover_end,
+        "daysOffered":          prog.days_of_week,
+        "sessionType":          prog.schedule_type.title(),
         "subjects":             subjects,
         "description":          desc,
         "indoorOutdoor":        "Both",
-        "transportation":       normalize_bool(prog.get("transportation_provided", "")),
-        "mealsProvided":        normalize_bool(prog.get("meals_provided", "")),
+        "transportation":       prog.transportation,
+        "mealsProvided":        prog.meals,
         "acceptingRegistration": accepting,
-        "startDate":            normalize_date(prog.get("start_date", "")),
-        "endDate":              normalize_date(prog.get("end_date", "")),
-        "starsLevel":           org.get("stars_rating", ""),
+        "startDate":            normalize_date(prog.start_day, prog.start_date),
+        "endDate":              normalize_date(prog.end_day, prog.end_date),
+        "weekYear":             weeks[0] if weeks else None,
+        "weekMask":             weeks[1] if weeks else None,
+        "starsLevel":           org.get("stars_rating"),
         "referralStatus":       "Active" if accepting else "Inactive",
         "providerProgramType":  type_label,
         "programType":          prog_type,
-        "confidence":           prog.get("confidence", "confirmed"),
-        "fundingSource":        prog.get("funding_source", ""),
+        "confidence":           prog.confidence,
+        "fundingSource":        prog.funding_source,
         # Raw CSV pass-throughs for admin round-trip
-        "programId":      prog.get("program_id", ""),
-        "programYear":    prog.get("program_year", "2026"),
-        "registrationUrl": prog.get("registration_url", ""),
-        "registrationOpens":      prog.get("registration_opens", ""),
-        "registrationOpensEarly": prog.get("registration_opens_early", ""),
-        "registrationNotes":      prog.get("registration_notes", ""),
-        "startTime":      prog.get("start_time", ""),
-        "endTime":        prog.get("end_time", ""),
-        "sessionTypeCsv": prog.get("session_type", ""),
-        "scheduleTypeCsv": prog.get("schedule_type", "weekly"),
-        "preAfterCare":   prog.get("pre_after_care", ""),
-        "costRaw":        prog.get("cost_raw", ""),
-        "activitiesCsv":  prog.get("activities", ""),
-        "transportNotes": prog.get("transportation_notes", ""),
-        "verifiedDate":   prog.get("verified_date", ""),
-        "programNotes":   prog.get("notes", ""),
+        "programId":      prog.program_id,
+        "programYear":    prog.program_year,
+        "registrationUrl": prog.registration_url,
+        "registrationOpens":      prog.registration_opens,
+        "registrationOpensEarly": prog.registration_opens_early,
+        "registrationNotes":      prog.registration_notes,
+        "startTime":      prog.start_time,
+        "endTime":        prog.end_time,
+        "sessionTypeCsv": prog.session_type,
+        "scheduleTypeCsv": prog.schedule_type,
+        "preAfterCare":   prog.pre_after_care,
+        "costRaw":        prog.cost_raw,
+        "activitiesCsv":  prog.activities,
+        "transportNotes": prog.transportation_notes,
+        "verifiedDate":   prog.verified_date,
+        "programNotes":   prog.notes,
     }
 
 
-def build_org_obj(org: dict) -> dict:
+def build_org_obj(org: Organization) -> dict:
     return {
-        "orgId":   org.get("org_id", ""),
-        "name":    org.get("org_name", ""),
-        "type":    org.get("org_type", ""),
-        "website": org.get("website", ""),
-        "phone":   org.get("phone", ""),
-        "email":   org.get("email", ""),
-        "address": org.get("street_address", ""),
-        "city":    org.get("city", ""),
-        "county":  org.get("county", ""),
-        "state":   org.get("state", "VT"),
-        "zip":     org.get("zip", ""),
-        "financialAidAvailable": org.get("financial_aid_available", "").lower() in ("true","yes","1"),
-        "financialAidNotes":     org.get("financial_aid_notes", ""),
-        "confidence":            org.get("confidence", "likely"),
-        "registrationPolicy": org.get("registration_policy", ""),
-        "registrationOpens":  org.get("registration_opens", ""),
-        "verifiedDate":       org.get("verified_date", ""),
-        "notes":              org.get("notes", ""),
+        "orgId":   org.org_id,
+        "name":    org.org_name,
+        "type":    org.org_type,
+        "website": org.website,
+        "phone":   org.phone,
+        "email":   org.email,
+        "address": org.street_address,
+        "city":    org.city,
+        "county":  org.county,
+        "state":   org.state,
+        "zip":     org.zip,
+        "financialAidAvailable": org.financial_aid,
+        "financialAidNotes":     org.financial_aid_notes,
+        "confidence":            org.confidence,
+        "registrationPolicy": org.registration_policy,
+        "registrationOpens":  org.registration_opens,
+        "verifiedDate":       org.verified_date,
+        "notes":              org.notes,
     }
 
 
-def main():
-    # Run validation first — abort on errors
-    result = subprocess.run(
-        [sys.executable, str(VALIDATE)],
-        capture_output=True, text=True
-    )
-    if result.returncode != 0:
-        print("Validation failed — fix errors before building data.js:\n")
-        print(result.stdout)
-        sys.exit(1)
+def build_schedule_index(program_objs: list) -> dict:
+    """Ids sorted by covered-window start and by end, for "covers 8:00-17:30".
+
+    Programs starting by 8:00 are a prefix of byStart and programs ending at
+    or after 17:30 a suffix of byEnd; app.js finds both with binary search.
+    """
+    timed = [p for p in program_objs if p["coverStart"] is not None]
+    by_start = sorted(timed, key=lambda p: (p["coverStart"], p["id"]))
+    by_end = sorted(timed, key=lambda p: (p["coverEnd"], p["id"]))
+    return {
+        "starts":  [p["coverStart"] for p in by_start],
+        "byStart": [p["id"] for p in by_start],
+        "ends":    [p["coverEnd"] for p in by_end],
+        "byEnd":   [p["id"] for p in by_end],
+    }
+
+
+def build_cost_index(program_objs: list) -> dict:
+    """Ids of priced programs sorted by weekly cost, and a histogram of them.
+
+    "At most $X a week" is a prefix of byWeekly; app.js finds its length with
+    one binary search over `weekly`. counts[i] is the number of programs in
+    (edges[i-1], edges[i]]; the last count is everything above the top edge.
+    """
+    priced = [p for p in program_objs if p["costWeeklyCents"]]
+    priced.sort(key=lambda p: (p["costWeeklyCents"], p["id"]))
+    weekly = [p["costWeeklyCents"] for p in priced]
+    counts, lower = [], 0
+    for edge in COST_BUCKET_EDGES:
+        upper = bisect_right(weekly, edge)
+        counts.append(upper - lower)
+        lower = upper
+    counts.append(len(weekly) - lower)
+    return {
+        "weekly":   weekly,
+        "byWeekly": [p["id"] for p in priced],
+        "edges":    COST_BUCKET_EDGES,
+        "counts":   counts,
+        "free":     sum(1 for p in program_objs if p["costWeeklyCents"] == 0),
+    }
+
+
+def build_week_index(program_objs: list) -> dict:
+    """Posting lists: "YYYY-Www" -> ids of programs whose weekMask has that week."""
+    postings = {}
+    for p in program_objs:
+        if p["weekMask"] is None:
+            continue
+        lo, hi = p["weekMask"]
+        bits = lo | hi << 32
+        while bits:
+            week = (bits & -bits).bit_length()
+            postings.setdefault(f"{p['weekYear']}-W{week:02d}", []).append(p["id"])
+            bits &= bits - 1
+    return dict(sorted(postings.items()))
+
+
+def encode_bitset(positions, size: int) -> str:
+    """Base64 of little-endian uint32 words; bit i is PROGRAMS[i]."""
+    words = [0] * ((size + 31) // 32)
+    for i in positions:
+        words[i >> 5] |= 1 << (i & 31)
+    return base64.b64encode(struct.pack(f"<{len(words)}I", *words)).decode("ascii")
+
+
+def build_facet_index(program_objs: list) -> dict:
+    """For each filter option, the programs that pass when it is picked.
+
+    Same rules as applyFilters() in app.js: unknown grades, undated
+    programs and programs without a price pass the grade, week and cost
+    filters. app.js ANDs the bitsets of the active filters and counts the
+    bits left under every option, so no program is rescanned per change.
+    """
+    facets = {name: {} for name in (
+        "category", "type", "city", "county", "subject", "stars", "status",
+        "grade", "week", "maxCost", "scholarship",
+    )}
+
+    def add(facet, value, i):
+        if value not in (None, ""):
+            facets[facet].setdefault(str(value), []).append(i)
+
+    undated = []
+    for i, p in enumerate(program_objs):
+        add("category", p["category"], i)
+        add("type", p["providerProgramType"] or p["type"], i)
+        add("city", p["city"], i)
+        add("county", p["county"], i)
+        add("stars", p["starsLevel"], i)
+        add("status", p["referralStatus"], i)
+        for subject in p["subjects"] or []:
+            add("subject", subject, i)
+        if p["scholarshipAvailable"]:
+            add("scholarship", "yes", i)
+
+        lo = GRADE_ORDER.index(p["gradesMin"]) if p["gradesMin"] in GRADE_ORDER else -1
+        hi = GRADE_ORDER.index(p["gradesMax"]) if p["gradesMax"] in GRADE_ORDER else -1
+        for g, grade in enumerate(GRADE_ORDER):
+            if lo < 0 or hi < 0 or lo <= g <= hi:
+                add("grade", grade, i)
+
+        cents = p["costWeeklyCents"]
+        for edge in COST_BUCKET_EDGES:
+            if not cents or cents <= edge:
+                add("maxCost", edge // 100, i)
+
+        if p["weekMask"] is None:
+            undated.append(i)
+        else:
+            lo_bits, hi_bits = p["weekMask"]
+            bits = lo_bits | hi_bits << 32
+            while bits:
+                week = (bits & -bits).bit_length()
+                add("week", f"{p['weekYear']}-W{week:02d}", i)
+                bits &= bits - 1
+    for positions in facets["week"].values():
+        positions.extend(undated)
+
+    size = len(program_objs)
+    return {
+        "size": size,
+        **{
+            name: {value: encode_bitset(positions, size)
+                   for value, positions in sorted(values.items())}
+            for name, values in facets.items()
+        },
+    }
 
-    orgs     = load_orgs()
-    programs = load_programs()
 
+def build_objects(orgs: dict, programs: list, previous: dict = None):
+    """Return (program_objs, org_objs, reused).
+
+    `previous` maps row_key() to program objects from an earlier build; a
+    program whose row and org are unchanged reuses its object instead of
+    being rebuilt. The map is updated in place with this build's objects.
+    """
     program_objs = []
+    reused = 0
+    current = {}
     uid = 1
     for prog in programs:
-        org_id = prog.get("org_id", "")
-        org    = orgs.get(org_id, {"org_id": org_id, "org_name": org_id})
+        org_id = prog.org_id
+        org    = orgs.get(org_id) or Organization(org_id=org_id, org_name=org_id, state="VT")
         # Skip inactive programs
-        if prog.get("confidence") == "inactive":
+        if prog.confidence == "inactive":
             continue
-        obj = build_program_obj(prog, org, uid)
+        key = row_key(prog, org)
+        obj = previous.get(key) if previous is not None else None
+        if obj is None:
+            obj = build_program_obj(prog, org, uid)
+        else:
+            reused += 1
+            if obj["id"] != uid:
+                obj = {**obj, "id": uid, "uid": f"{obj['category']}-{uid}"}
+        current[key] = obj
         program_objs.append(obj)
         uid += 1
 
+    if previous is not None:
+        previous.clear()
+        previous.update(current)
+
     org_objs = [build_org_obj(o) for o in orgs.values()
-                if o.get("confidence") != "inactive"]
+                if o.confidence != "inactive"]
+    return program_objs, org_objs, reused
 
-    # Stats
+
+def row_key(prog: Program, org: Organization) -> tuple:
+    """Everything build_program_obj reads: the program's and its org's cells."""
+    return (
+        tuple(getattr(prog, name) for name in Program.COLUMNS),
+        tuple(getattr(org, name) for name in Organization.COLUMNS),
+        tuple(sorted((org.extra or {}).items())),
+    )
+
+
+def render_data_js(program_objs: list, org_objs: list) -> str:
     camps       = [p for p in program_objs if p["category"] == "camp"]
     afterschool = [p for p in program_objs if p["category"] == "afterschool"]
     now_str     = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
     programs_js = json.dumps(program_objs, indent=2, ensure_ascii=False)
     orgs_js     = json.dumps(org_objs, indent=2, ensure_ascii=False)
+    schedule_js = json.dumps(build_schedule_index(program_objs), separators=(",", ":"))
+    cost_js     = json.dumps(build_cost_index(program_objs), separators=(",", ":"))
+    weeks_js    = json.dumps(build_week_index(program_objs), separators=(",", ":"))
+    facets_js   = json.dumps(build_facet_index(program_objs), separators=(",", ":"))
 
-    output = (
+    return (
         f"// Auto-generated by scripts/build_data_js.py — do not edit directly\n"
         f"// Generated: {now_str} | Orgs: {len(org_objs)} | Programs: {len(program_objs)}"
         f" | Camps: {len(camps)} | Afterschool: {len(afterschool)}\n\n"
         f"const PROGRAMS = {programs_js};\n\n"
-        f"const ORGANIZATIONS = {orgs_js};\n"
+        f"const ORGANIZATIONS = {orgs_js};\n\n"
+        f"const SCHEDULE_INDEX = {schedule_js};\n\n"
+        f"const COST_INDEX = {cost_js};\n\n"
+        f"const WEEK_INDEX = {weeks_js};\n\n"
+        f"const FACET_INDEX = {facets_js};\n"
+    )
+
+
+def _without_timestamp(text: str) -> str:
+    return re.sub(r"^// Generated: \S+", "// Generated:", text, count=1, flags=re.M)
+
+
+class IncrementalBuild:
+    """Rebuild data.js in-process, for dev_server.py's background worker.
+
+    Program objects are kept between runs and reused for rows whose
+    program and org cells did not change, and data.js is only rewritten
+    when its content (ignoring the Generated timestamp) differs.
+    """
+
+    def __init__(self, out_path: Path = OUT_PATH) -> None:
+        self.out_path = out_path
+        self._objects = {}
+        self.program_objs = []
+        self.org_objs = []
+
+    def load(self) -> int:
+        """Build program_objs/org_objs from the CSVs; returns how many were reused."""
+        orgs     = load_orgs()
+        programs = load_programs()
+        self.program_objs, self.org_objs, reused = build_objects(orgs, programs, self._objects)
+        return reused
+
+    def run(self) -> dict:
+        reused = self.load()
+        program_objs, org_objs = self.program_objs, self.org_objs
+        output = render_data_js(program_objs, org_objs)
+        try:
+            old = self.out_path.read_text(encoding="utf-8")
+        except OSError:
+            old = ""
+        written = _without_timestamp(old) != _without_timestamp(output)
+        if written:
+            with atomic_text_writer(self.out_path) as f:
+                f.write(output)
+        return {
+            "organizations": len(org_objs),
+            "programs": len(program_objs),
+            "reused": reused,
+            "written": written,
+        }
+
+
+def main():
+    # Run validation first — abort on errors
+    result = subprocess.run(
+        [sys.executable, str(VALIDATE)],
+        capture_output=True, text=True
     )
-    OUT_PATH.write_text(output, encoding="utf-8")
+    if result.returncode != 0:
+        print("Validation failed — fix errors before building data.js:\n")
+        print(result.stdout)
+        sys.exit(1)
+
+    orgs     = load_orgs()
+    programs = load_programs()
+
+    program_objs, org_objs, _ = build_objects(orgs, programs)
+    OUT_PATH.write_text(render_data_js(program_objs, org_objs), encoding="utf-8")
+
+    # Stats
+    camps       = [p for p in program_objs if p["category"] == "camp"]
+    afterschool = [p for p in program_objs if p["category"] == "afterschool"]
 
     print(f"data.js written")
     print(f"  Organizations: {len(org_objs)}")
@@ -431,11 +624,15 @@ def main():
     with_grades  = sum(1 for p in program_objs if p["gradesMin"] and p["gradesMax"])
     with_cost    = sum(1 for p in program_objs if p["cost"] > 0)
     with_dates   = sum(1 for p in program_objs if p["startDate"])
+    to_review    = sum(1 for p in program_objs if p["costNeedsReview"])
+    with_hours   = sum(1 for p in program_objs if p["coverStart"] is not None)
     with_subjects = sum(1 for p in program_objs if p["subjects"])
     print(f"  city present:   {with_city}/{len(program_objs)}")
     print(f"  grades present: {with_grades}/{len(program_objs)}")
     print(f"  cost > 0:       {with_cost}/{len(program_objs)}")
+    print(f"  cost to review: {to_review}/{len(program_objs)}")
     print(f"  dates present:  {with_dates}/{len(program_objs)}")
+    print(f"  hours parsed:   {with_hours}/{len(program_objs)}")
     print(f"  subjects found: {with_subjects}/{len(program_objs)}")
 
 
@@ -0,0 +1,157 @@
+"""Background validate + rebuild of data.js for dev_server.py.
+
+BuildWorker runs in one thread. request() marks a rebuild as wanted and
+returns a sequence number; the worker waits until no new request has
+arrived for `debounce` seconds (so saving both CSVs, or several saves in
+a row, costs one build), then runs validate_data.run_validation() and
+build_data_js.IncrementalBuild in-process. The result is kept for
+status() and handed to `publish` (dev_server sends it to open event
+streams).
+
+Status dict:
+    state          "idle", "pending", "running", "ok" or "failed"
+    result         "ok" or "failed" for the last finished build
+    requested      sequence number of the newest request
+    completed      newest request covered by a finished build
+    reasons        what triggered the build that last ran
+    started / finished / duration_ms
+    errors         validation errors (the build is skipped if any)
+    warnings       first MAX_WARNINGS validation warnings
+    warning_count
+    stats          IncrementalBuild.run() result on success
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Callable
+
+from build_data_js import IncrementalBuild
+from validate_data import run_validation
+
+DEFAULT_DEBOUNCE_SECONDS = 0.75
+MAX_WARNINGS = 40
+
+
+def validate_and_build(builder: IncrementalBuild) -> dict:
+    """One build: validation first, data.js only if there are no errors."""
+    errors, warnings = run_validation()
+    result = {
+        "errors": errors,
+        "warnings": warnings[:MAX_WARNINGS],
+        "warning_count": len(warnings),
+        "stats": None,
+    }
+    if not errors:
+        result["stats"] = builder.run()
+    return result
+
+
+class BuildWorker:
+    def __init__(
+        self,
+        build: Callable[[], dict],
+        publish: Callable[[dict], None] = lambda status: None,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    ) -> None:
+        self.build = build
+        self.publish = publish
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._deadline = 0.0
+        self._reasons: list[str] = []
+        self._stopping = False
+        self._status = {"state": "idle", "requested": 0, "completed": 0}
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "BuildWorker":
+        self._thread = threading.Thread(target=self._run, name="BuildWorker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def request(self, reason: str) -> int:
+        """Ask for a rebuild; returns the sequence number to wait for."""
+        with self._cond:
+            self._requested += 1
+            self._deadline = time.monotonic() + self.debounce
+            self._reasons.append(reason)
+            if self._status["state"] != "running":
+                self._status = {**self._status, "state": "pending"}
+            self._status["requested"] = self._requested
+            self._cond.notify_all()
+            return self._requested
+
+    def status(self) -> dict:
+        with self._cond:
+            return dict(self._status)
+
+    def _next_batch(self):
+        """Wait for requests and a quiet period; return (seq, reasons) or None."""
+        with self._cond:
+            while not self._stopping:
+                if self._requested > self._completed:
+                    wait = self._deadline - time.monotonic()
+                    if wait <= 0:
+                        reasons, self._reasons = self._reasons, []
+                        self._status = {**self._status, "state": "running"}
+                        return self._requested, reasons
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            seq, reasons = batch
+            started = time.perf_counter()
+            started_at = datetime.now().isoformat(timespec="seconds")
+            try:
+                result = self.build()
+                state = "failed" if result["errors"] else "ok"
+            except Exception as e:
+                result = {
+                    "errors": [f"  ERROR: build crashed: {e!r}"],
+                    "warnings": [],
+                    "warning_count": 0,
+                    "stats": None,
+                    "traceback": traceback.format_exc(),
+                }
+                state = "failed"
+
+            with self._cond:
+                self._completed = seq
+                pending = self._requested > seq
+                self._status = {
+                    **result,
+                    "state": "pending" if pending else state,
+                    "result": state,
+                    "requested": self._requested,
+                    "completed": seq,
+                    "reasons": reasons,
+                    "started": started_at,
+                    "finished": datetime.now().isoformat(timespec="seconds"),
+                    "duration_ms": round((time.perf_counter() - started) * 1000),
+                }
+                status = dict(self._status)
+            print(f"[build] {state} in {status['duration_ms']} ms ({', '.join(reasons)})")
+            try:
+                self.publish(status)
+            except Exception as e:
+                print(f"[build] publish failed: {e}")
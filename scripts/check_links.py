@@ -0,0 +1,220 @@
+"""
+Check registration_url (programs.csv) and website (organizations.csv) links.
+
+validate_data.py only checks URL syntax. This script actually requests
+each distinct URL (many programs share one registration page, so URLs
+are deduplicated across both files) and reports:
+
+    status      final HTTP status, or blank if the request failed
+    final_url   where redirects ended up
+    latency_ms  time to response headers
+    error       network / HTTP error text, if any
+
+Requests go through scripts/fetch_engine.py: HEAD first, falling back to
+GET for servers that reject HEAD, at most PER_HOST in flight per site.
+Results are cached in data/.cache/link_check.json and reused for
+--max-age hours, so re-running the report is instant.
+
+With --write-canonical, URLs that only went through permanent redirects
+(301/308) to a working page are rewritten to their final URL in both
+CSVs.
+
+Run from the project root:
+    python scripts/check_links.py
+    python scripts/check_links.py --max-age 0 --report link_report.csv
+    python scripts/check_links.py --write-canonical
+"""
+
+import argparse
+import csv
+import json
+import sys
+import urllib.error
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fetch_engine import FetchEngine
+from schema import Organization, Program, load_records, write_records
+
+PROGRAMS_PATH = Path("data/programs.csv")
+ORGS_PATH     = Path("data/organizations.csv")
+CACHE_PATH    = Path("data/.cache/link_check.json")
+
+USER_AGENT = "CampFinderLinkChecker/1.0 (local research tool)"
+DEFAULT_MAX_AGE_HOURS = 24
+PER_HOST = 2
+HEAD_FALLBACK_STATUS = {400, 403, 405, 501}
+PERMANENT_REDIRECTS = {301, 308}
+
+ENGINE = FetchEngine(
+    USER_AGENT, rate=8.0, burst=8.0, workers=16, per_host=PER_HOST,
+    host_interval=0.3, timeout=15,
+)
+
+# (path, record type, column) triples that hold links
+LINK_COLUMNS = [
+    (PROGRAMS_PATH, Program, "registration_url"),
+    (ORGS_PATH, Organization, "website"),
+]
+
+
+def first_url(value: str) -> str:
+    return next(iter((value or "").split()), "")
+
+
+def head_then_get(url: str, engine: FetchEngine = ENGINE) -> dict:
+    """Request `url` and describe the outcome; never raises for HTTP errors."""
+    result = {"status": "", "final_url": "", "latency_ms": "", "error": "",
+              "permanent": False}
+    for method in ("HEAD", "GET"):
+        try:
+            with engine.open(url, method=method) as resp:
+                codes = [code for code, _ in resp.redirects]
+                result.update(
+                    status=resp.status,
+                    final_url=resp.geturl(),
+                    latency_ms=round(resp.elapsed * 1000),
+                    error="",
+                    permanent=bool(codes) and all(c in PERMANENT_REDIRECTS for c in codes),
+                )
+                return result
+        except urllib.error.HTTPError as e:
+            result.update(status=e.code, final_url=e.geturl() or url, error=str(e))
+            if method == "HEAD" and e.code in HEAD_FALLBACK_STATUS:
+                continue
+            return result
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            result.update(status="", error=str(getattr(e, "reason", e)))
+            return result
+    return result
+
+
+def is_ok(result: dict) -> bool:
+    return isinstance(result.get("status"), int) and 200 <= result["status"] < 400
+
+
+def rewrite_canonical(path: Path, column: str, fieldnames, records, canonical: dict) -> int:
+    """Point `column` at the canonical URL where it has one; returns rows changed.
+
+    The file is rewritten only if something changed, keeping its line ending.
+    """
+    changed = 0
+    for record in records:
+        value = record.get(column)
+        url = first_url(value)
+        if url in canonical:
+            record.set(column, value.replace(url, canonical[url], 1))
+            changed += 1
+    if changed:
+        write_records(path, fieldnames, records)
+    return changed
+
+
+# -- cache ---------------------------------------------------------------------
+
+
+def load_cache() -> dict:
+    try:
+        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict) -> None:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(CACHE_PATH)
+
+
+def is_fresh(entry: dict, max_age: timedelta) -> bool:
+    try:
+        checked = datetime.fromisoformat(entry.get("checked_at", ""))
+    except ValueError:
+        return False
+    return datetime.now() - checked < max_age
+
+
+# -- main --------------------------------------------------------------------
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check registration and website links")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE_HOURS,
+                        help="reuse cached results younger than this many hours "
+                             f"(default: {DEFAULT_MAX_AGE_HOURS}; 0 re-checks everything)")
+    parser.add_argument("--report", help="also write the full report to this CSV path")
+    parser.add_argument("--write-canonical", action="store_true",
+                        help="rewrite permanently redirected URLs in the CSVs")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    tables = {path: load_records(cls, path) for path, cls, _ in LINK_COLUMNS}
+    refs = {}  # url -> number of rows that use it
+    for path, _, column in LINK_COLUMNS:
+        for record in tables[path][1]:
+            url = first_url(record.get(column))
+            if url.startswith(("http://", "https://")):
+                refs[url] = refs.get(url, 0) + 1
+
+    cache = load_cache()
+    max_age = timedelta(hours=args.max_age)
+    stale = [url for url in refs if not is_fresh(cache.get(url, {}), max_age)]
+
+    print(f"Distinct URLs: {len(refs)}  |  Cached: {len(refs) - len(stale)}  |  To check: {len(stale)}")
+
+    try:
+        for n, (url, result, error) in enumerate(ENGINE.run(head_then_get, stale), 1):
+            if error is not None:
+                result = {"status": "", "final_url": "", "latency_ms": "",
+                          "error": str(error), "permanent": False}
+            result["checked_at"] = datetime.now().isoformat(timespec="seconds")
+            cache[url] = result
+            state = result["status"] or "ERR"
+            print(f"[{n}/{len(stale)}] {state!s:>4}  {url[:90]}", flush=True)
+    finally:
+        save_cache(cache)
+
+    report = []
+    for url, count in refs.items():
+        entry = cache.get(url, {})
+        report.append({"url": url, "rows": count, **{
+            k: entry.get(k, "") for k in ("status", "final_url", "latency_ms", "error")
+        }, "permanent_redirect": entry.get("permanent", False)})
+    broken = [r for r in report if not is_ok(r)]
+    redirected = [r for r in report if is_ok(r) and r["final_url"] and r["final_url"] != r["url"]]
+
+    print()
+    print(f"OK: {len(report) - len(broken)}  |  Broken: {len(broken)}  |  Redirected: {len(redirected)}")
+    if broken:
+        print("\nBroken links:")
+        for r in sorted(broken, key=lambda r: -r["rows"]):
+            print(f"  {r['status'] or 'ERR':>4}  {r['rows']:>3} rows  {r['url']}\n        {r['error']}")
+    if redirected:
+        print("\nRedirected links:")
+        for r in redirected:
+            kind = "permanent" if r["permanent_redirect"] else "temporary"
+            print(f"  {r['url']}\n    -> {r['final_url']}  ({kind})")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(report[0]) if report else ["url"])
+            writer.writeheader()
+            writer.writerows(report)
+        print(f"\nReport written to {args.report}")
+
+    if args.write_canonical:
+        canonical = {r["url"]: r["final_url"] for r in redirected if r["permanent_redirect"]}
+        for path, _, column in LINK_COLUMNS:
+            changed = rewrite_canonical(path, column, *tables[path], canonical)
+            print(f"{path}: {changed} {column} values rewritten to canonical URLs")
+        print("Next step: python scripts/build_data_js.py")
+
+    sys.exit(1 if broken else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Append-only JSONL checkpoint journal for long-running enrichment scripts.
+
+Each finished row is appended as one JSON line as soon as its result
+arrives:
+
+    {"key": "<program_id>", "values": {"description": "..."}}
+
+On restart the script replays the journal, skips keys it already has and
+merges everything into the CSV once at the end. A torn final line (from a
+crash mid-append) is ignored on replay.
+
+Journals live under data/.checkpoints/ and are deleted after a successful
+merge. A journal can also serve as a long-lived per-key log (see
+reverify.py), in which case compact() keeps it to one line per key.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+CHECKPOINT_DIR = Path("data/.checkpoints")
+
+
+class Journal:
+    def __init__(self, name: str, directory: Path = CHECKPOINT_DIR) -> None:
+        self.path = Path(directory) / f"{name}.jsonl"
+        self._file = None
+
+    def replay(self) -> dict:
+        """Return {key: values} for every complete record; later records win."""
+        done = {}
+        if not self.path.exists():
+            return done
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                key = record.get("key")
+                if key:
+                    done[key] = record.get("values") or {}
+        return done
+
+    def append(self, key: str, values: dict) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+            # Terminate a torn last line so the next record starts clean
+            if self._file.tell() and not self.path.read_bytes().endswith(b"\n"):
+                self._file.write("\n")
+        line = json.dumps({"key": key, "values": values}, ensure_ascii=False)
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def compact(self, records: dict) -> None:
+        """Atomically replace the journal with one line per key."""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for key, values in records.items():
+                f.write(json.dumps({"key": key, "values": values}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def discard(self) -> None:
+        """Delete the journal once its results are safely merged."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
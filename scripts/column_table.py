@@ -0,0 +1,190 @@
+"""
+Dictionary-encoded, column-oriented CSV table for the transform scripts.
+
+Values repeat heavily down a column (the same start_time, cost_raw or
+site_city on dozens of rows), so each Column keeps one list of distinct
+values and an array of small integer codes, one per row. A transform that
+only depends on a cell's value can then run once per distinct value and
+the results are broadcast back to every row:
+
+    table = ColumnTable.read(Path("data/programs.csv"))
+    changed = table.map("start_time", normalize_start_time)
+    table.write(Path("data/programs.csv"))
+
+Iterating a table yields Row views that behave like the csv.DictReader
+rows the scripts used before (row.get("x"), row["x"] = ...), for the
+transforms that need several columns at once.
+
+A Column's dictionary only ever grows, so a code always means the same
+value; comparing two copies of `codes` shows which rows changed.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import csv
+from array import array
+from pathlib import Path
+
+from csv_io import detect_lineterminator, write_csv_atomic
+
+
+class Column:
+    __slots__ = ("values", "codes", "_index")
+
+    def __init__(self) -> None:
+        self.values = []          # distinct values, indexed by code
+        self.codes = array("I")   # one code per row
+        self._index = {}          # value -> code
+
+    def intern(self, value: str) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.intern(value))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.values[self.codes[i]]
+
+    def __setitem__(self, i: int, value: str) -> None:
+        self.codes[i] = self.intern(value)
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def distinct(self) -> list:
+        """Distinct values actually in use, in first-seen order."""
+        used = dict.fromkeys(self.codes)
+        return [self.values[code] for code in used]
+
+    def memo(self, fn):
+        """A function of a code that calls fn(value) once per distinct value.
+
+        For transforms that read a column without rewriting it:
+        county_of = table.column("site_city").memo(town_county.get), then
+        county_of(column.codes[i]) for each row.
+        """
+        results = {}
+        values = self.values
+
+        def lookup(code: int):
+            try:
+                return results[code]
+            except KeyError:
+                result = results[code] = fn(values[code])
+                return result
+
+        return lookup
+
+    def map(self, fn) -> int:
+        """Replace every value with fn(value), calling fn once per distinct value.
+
+        Returns the number of rows whose value changed.
+        """
+        translate = {code: self.intern(fn(self.values[code])) for code in dict.fromkeys(self.codes)}
+        changed = 0
+        codes = self.codes
+        for i, code in enumerate(codes):
+            new = translate[code]
+            if new != code:
+                codes[i] = new
+                changed += 1
+        return changed
+
+
+class Row:
+    """Dict-like view of one table row; reads and writes go to the columns."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "ColumnTable", i: int) -> None:
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, name: str) -> str:
+        return self._table.columns[name][self._i]
+
+    def __setitem__(self, name: str, value: str) -> None:
+        self._table.columns[name][self._i] = value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._table.columns
+
+    def get(self, name: str, default=None):
+        column = self._table.columns.get(name)
+        return default if column is None else column[self._i]
+
+    def keys(self):
+        return list(self._table.fieldnames)
+
+    def to_dict(self) -> dict:
+        return {name: self[name] for name in self._table.fieldnames}
+
+
+class ColumnTable:
+    def __init__(self, fieldnames) -> None:
+        self.fieldnames = list(fieldnames)
+        self.columns = {name: Column() for name in self.fieldnames}
+        self._length = 0
+
+    @classmethod
+    def read(cls, path: Path) -> "ColumnTable":
+        """Load a CSV (utf-8, optional BOM) straight into columns."""
+        with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            table = cls(next(reader, []))
+            for record in reader:
+                if record:
+                    table.append(record)
+        return table
+
+    @classmethod
+    def from_rows(cls, fieldnames, rows) -> "ColumnTable":
+        table = cls(fieldnames)
+        for row in rows:
+            table.append([row.get(name) or "" for name in table.fieldnames])
+        return table
+
+    def append(self, values) -> None:
+        """Add a row given as a list of values in fieldnames order."""
+        columns = [self.columns[name] for name in self.fieldnames]
+        for i, column in enumerate(columns):
+            column.append(values[i] if i < len(values) else "")
+        self._length += 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return (Row(self, i) for i in range(self._length))
+
+    def __getitem__(self, i: int) -> Row:
+        if not -self._length <= i < self._length:
+            raise IndexError(i)
+        return Row(self, i % self._length)
+
+    def column(self, name: str) -> Column:
+        return self.columns[name]
+
+    def map(self, name: str, fn) -> int:
+        """Apply fn to each distinct value of column `name`; return rows changed."""
+        return self.columns[name].map(fn)
+
+    def records(self):
+        """Yield each row as a plain dict (for csv.DictWriter and JSON)."""
+        columns = [(name, self.columns[name]) for name in self.fieldnames]
+        for i in range(self._length):
+            yield {name: column[i] for name, column in columns}
+
+    def write(self, path: Path) -> None:
+        write_csv_atomic(path, self.fieldnames, self.records(),
+                         lineterminator=detect_lineterminator(path))
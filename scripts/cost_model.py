@@ -0,0 +1,164 @@
+"""
+One cost engine for parse_costs.py and build_data_js.py.
+
+parse_cost_text() reads a messy cost_raw string; program_cost() also takes
+the curated cost_per_week column into account (it wins when present).
+Both return a Cost, or None when no price can be read:
+
+    Cost.amount_cents    the price as quoted, in `period` units
+    Cost.period          "week", "day", "month" or "session"
+    Cost.weekly_cents    normalized to one week
+    Cost.daily_cents     normalized to one day of a DAYS_PER_WEEK week
+    Cost.session_cents   the session price (a session is assumed to be a
+                         week unless priced per session)
+    Cost.needs_review    the weekly figure is an assumption
+
+Parsing rules:
+  - "free" / "no cost" / "no charge" / "federally funded" -> 0
+  - "sliding scale" / "contact" / "varies" ...            -> None (manual)
+  - "$X/hour"                                             -> None (too ambiguous)
+  - "$X/day"     -> weekly X * DAYS_PER_WEEK                (review)
+  - "$X/week"    -> weekly X
+  - "$X/month"   -> weekly X / WEEKS_PER_MONTH              (review)
+  - "$X/session" or a bare "$X" -> session X, weekly X      (review)
+  - ranges and tier lists use the lowest amount; when amounts are quoted
+    in different units, each takes the unit written after it and the
+    weekly price wins (then day, month, session, hour)
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+
+DAYS_PER_WEEK = 5
+WEEKS_PER_MONTH = 4
+PARSE_CACHE_SIZE = 1024
+
+FREE_RE = re.compile(r"\bfree\b|\bno cost\b|\bno charge\b|\bfederally\b|\$0\b")
+AMBIGUOUS_RE = re.compile(
+    r"sliding scale|contact|call us|see website|varies|variable|tbd|n/a|upon request"
+)
+DOLLAR_RE = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)")
+NUMBER_RE = re.compile(r"(?<![\d.])(\d{2,5}(?:\.\d{1,2})?)(?![\d:])")
+# In order of preference when a price list quotes several units
+PERIOD_RES = [
+    ("week",    re.compile(r"/\s*w(?:ee)?ks?\b|per\s+week|weekly|a week")),
+    ("day",     re.compile(r"/\s*days?\b|per\s+day|daily")),
+    ("month",   re.compile(r"/\s*mo(?:nth)?s?\b|per\s+month|monthly")),
+    ("session", re.compile(r"/\s*sessions?|per\s+session")),
+    ("hour",    re.compile(r"/\s*h(?:ou)?rs?\b|per\s+hour|hourly")),
+]
+PERIOD_ORDER = [period for period, _ in PERIOD_RES]
+
+
+class Cost:
+    __slots__ = ("amount_cents", "period", "weekly_cents", "daily_cents",
+                 "session_cents", "needs_review")
+
+    def __init__(self, amount_cents: int, period: str, needs_review: bool = False) -> None:
+        self.amount_cents = amount_cents
+        self.period = period
+        self.needs_review = needs_review
+        if period == "day":
+            weekly = amount_cents * DAYS_PER_WEEK
+        elif period == "month":
+            weekly = amount_cents / WEEKS_PER_MONTH
+        else:
+            weekly = amount_cents
+        self.weekly_cents = round(weekly)
+        self.daily_cents = amount_cents if period == "day" else round(weekly / DAYS_PER_WEEK)
+        self.session_cents = amount_cents if period == "session" else self.weekly_cents
+
+    @property
+    def free(self) -> bool:
+        return self.amount_cents == 0
+
+    def __repr__(self) -> str:
+        flag = " review" if self.needs_review else ""
+        return f"<Cost {self.amount_cents / 100:.2f}/{self.period}{flag}>"
+
+
+def to_cents(amount: str):
+    try:
+        value = float(amount.replace(",", ""))
+    except ValueError:
+        return None
+    return round(value * 100) if math.isfinite(value) else None
+
+
+def detect_period(text: str) -> str:
+    for period, pattern in PERIOD_RES:
+        if pattern.search(text):
+            return period
+    return ""
+
+
+def first_period(text: str) -> str:
+    """The unit that appears first in `text`, e.g. right after an amount."""
+    found = [(m.start(), period) for period, pattern in PERIOD_RES
+             for m in [pattern.search(text)] if m]
+    return min(found)[1] if found else ""
+
+
+def priced_amounts(text: str) -> list:
+    """[cents, period] for each amount, with the unit written after it.
+
+    A bare amount takes the unit of the next amount that has one
+    ("$300-$350/week"), else the unit found anywhere in the text.
+    """
+    matches = list(DOLLAR_RE.finditer(text)) or list(NUMBER_RE.finditer(text))
+    priced = []
+    for i, m in enumerate(matches):
+        cents = to_cents(m.group(1))
+        if cents is None:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        priced.append([cents, first_period(text[m.end():end])])
+    following = detect_period(text)
+    for pair in reversed(priced):
+        if pair[1]:
+            following = pair[1]
+        else:
+            pair[1] = following
+    return priced
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_cost_text(raw: str):
+    """Cost for a cost_raw string, or None. Results are shared; don't mutate."""
+    text = (raw or "").strip().lower()
+    if not text:
+        return None
+    if FREE_RE.search(text):
+        return Cost(0, "session")
+    if AMBIGUOUS_RE.search(text):
+        return None
+
+    priced = priced_amounts(text)
+    if not priced:
+        return None
+    # "$390/week ... $6/day extended care" is a weekly price with an add-on
+    quoted = {period for _, period in priced}
+    period = next((p for p in PERIOD_ORDER if p in quoted), "")
+    lowest = min(cents for cents, p in priced if p == period)
+
+    if period == "hour":
+        return None
+    if period == "week":
+        return Cost(lowest, "week")
+    # Day and month rates are converted; bare amounts are assumed to be a
+    # one-week session. Either way the weekly figure is a guess.
+    return Cost(lowest, period or "session", needs_review=True)
+
+
+def program_cost(cost_raw: str, cost_per_week: str = ""):
+    """Cost for a programs.csv row: cost_per_week if filled in, else cost_raw."""
+    if (cost_per_week or "").strip():
+        cents = to_cents(cost_per_week.strip())
+        if cents is not None:
+            return Cost(cents, "week")
+    return parse_cost_text(cost_raw or "")
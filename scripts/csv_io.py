@@ -0,0 +1,117 @@
+"""
+CSV read/write helpers shared by the data scripts.
+
+write_csv_atomic() writes to a temp file next to the target, fsyncs it and
+renames it into place, so a crash mid-write never leaves a truncated
+programs.csv behind. The rewritten file keeps the original's permissions.
+
+rewrite_csv_streaming() does the same for row-local fix-ups, reading,
+transforming and writing one row at a time so memory use does not grow
+with the file.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def read_csv(path: Path):
+    """Return (fieldnames, rows) for a CSV file."""
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def detect_lineterminator(path: Path, default: str = "\r\n") -> str:
+    """Return the line ending used by an existing CSV, so a rewrite keeps it."""
+    try:
+        with Path(path).open("rb") as f:
+            head = f.read(65536)
+    except FileNotFoundError:
+        return default
+    end = head.find(b"\n")
+    if end < 0:
+        return default
+    return "\r\n" if end and head[end - 1:end] == b"\r" else "\n"
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import: os.umask() can only be queried by setting it, which
+# would race with other threads creating files.
+DEFAULT_FILE_MODE = 0o666 & ~_umask()
+
+
+def _file_mode(path: Path) -> int:
+    """Permissions a rewrite of `path` should keep (mkstemp creates 0600)."""
+    try:
+        return path.stat().st_mode & 0o7777
+    except OSError:
+        return DEFAULT_FILE_MODE
+
+
+@contextmanager
+def atomic_text_writer(path: Path):
+    """Yield a file next to `path` that replaces it, fsynced, on success.
+
+    The replacement keeps the old file's permissions; a new file gets the
+    usual 0666 minus umask.
+    """
+    path = Path(path)
+    mode = _file_mode(path)
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            yield f
+            f.flush()
+            if os.chmod in os.supports_fd:
+                os.chmod(f.fileno(), mode)
+            os.fsync(f.fileno())
+        if os.chmod not in os.supports_fd:
+            os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def write_csv_atomic(path: Path, fieldnames, rows, lineterminator: str = "\r\n") -> None:
+    with atomic_text_writer(path) as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator=lineterminator)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def rewrite_csv_streaming(path: Path, fn) -> int:
+    """Apply fn(row) to each row of a CSV in place, one row in memory at a time.
+
+    `fn` mutates the row dict. The file's line ending is kept. Returns the
+    number of rows processed; on any error the original file is untouched.
+    """
+    path = Path(path)
+    lineterminator = detect_lineterminator(path)
+    count = 0
+    with path.open("r", encoding="utf-8-sig", newline="") as src, \
+            atomic_text_writer(path) as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=reader.fieldnames or [],
+                                lineterminator=lineterminator)
+        writer.writeheader()
+        for row in reader:
+            fn(row)
+            writer.writerow(row)
+            count += 1
+    return count
@@ -1,8 +1,37 @@
 #!/usr/bin/env python3
 """Local dev server with lightweight live-reload for static files.
 
+File changes come from scripts/file_watcher.py: inotify on Linux (no work
+while idle), otherwise a poller that only re-lists directories whose mtime
+changed. Bursts of saves are debounced into one reload.
+
+Responses are gzip (or brotli, if installed) compressed, carry strong
+ETags and answer If-None-Match with 304; see scripts/static_files.py.
+Compressed copies are kept in data/.cache/static/.
+
+The admin page saves changed rows only, with PATCH /__rows/<table> and
+an If-Match ETag (scripts/row_store.py); /__save_csv still replaces a
+whole file. Both take a per-file lock and write atomically. CSV saves
+queue a background validate +
+rebuild of data.js (scripts/build_worker.py); its status is at
+/__build_status and is pushed to event streams as a "build" event.
+
+/api/programs and /api/facets answer filtered queries from in-memory
+indexes (scripts/program_index.py) built at startup and replaced after
+each successful rebuild.
+
+--production serves the same files for small on-site deployments:
+HTTP/1.1 keep-alive, sendfile() bodies and Range requests, with no
+live reload, save endpoints or background rebuilds.
+
+--server async serves the same routes from one asyncio event loop
+(AsyncServer) instead of a thread per connection; each open tab's event
+stream is then a coroutine rather than a parked thread. Either mode can
+use it. scripts/bench_server.py compares the two.
+
 Run from project root:
     python scripts/dev_server.py
+    python scripts/dev_server.py --server async
 
 Then open:
     http://localhost:8000
@@ -11,178 +40,512 @@ Then open:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import io
 import json
+import mimetypes
 import os
+import posixpath
+import sys
 import threading
 import time
+from email.utils import formatdate
 from functools import partial
+from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, unquote, urlparse
 
+from build_data_js import IncrementalBuild
+from build_worker import BuildWorker, validate_and_build
+from file_watcher import DEFAULT_DEBOUNCE_SECONDS, SKIP_DIRS, make_watcher
+from program_index import ProgramIndex, QueryError
+from row_store import TABLES, CsvTable, RowConflict, RowError, write_text_locked
+from static_files import (
+    MIN_COMPRESS_BYTES,
+    RangeNotSatisfiable,
+    StaticFiles,
+    cache_control,
+    choose_encoding,
+    compress,
+    etag_matches,
+    parse_range,
+    strong_etag,
+)
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 WATCH_EXTENSIONS = {".html", ".css", ".js", ".json", ".csv"}
+STATIC_CACHE_DIR = PROJECT_ROOT / "data/.cache/static"
 POLL_INTERVAL_SECONDS = 1.0
+# Comment line sent on idle event streams so dead connections get noticed
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_RETRY_MS = 1000
+KEEPALIVE_TIMEOUT_SECONDS = 15.0
+# socketserver listens with a backlog of 5, which drops SYNs when many
+# tabs reconnect at once after a restart
+LISTEN_BACKLOG = 1024
+MAX_HEADER_BYTES = 64 * 1024
+SERVER_NAME = "dev_server (asyncio)"
 
 
 LIVE_RELOAD_SNIPPET = """
 <script>
 (function () {
   var current = null;
+  var polling = false;
+
+  function seen(version) {
+    if (current === null) {
+      current = version;
+    } else if (version !== current) {
+      location.reload();
+    }
+  }
 
   function check() {
     fetch('/__reload_version', { cache: 'no-store' })
       .then(function (r) { return r.json(); })
-      .then(function (data) {
-        if (current === null) {
-          current = data.version;
-          return;
-        }
-        if (data.version !== current) {
-          location.reload();
-        }
-      })
+      .then(function (data) { seen(data.version); })
       .catch(function () {
         // Keep polling even if the endpoint is briefly unavailable.
       });
   }
 
-  check();
-  setInterval(check, 1000);
+  function poll() {
+    if (polling) return;
+    polling = true;
+    check();
+    setInterval(check, 1000);
+  }
+
+  if (!window.EventSource) {
+    poll();
+    return;
+  }
+  // One held connection per tab; the server pushes only when files change.
+  // EventSource reconnects by itself after a dropped connection, but gives
+  // up (CLOSED) when the endpoint is missing, so fall back to polling then.
+  var events = new EventSource('/__reload_events');
+  events.addEventListener('version', function (e) {
+    seen(JSON.parse(e.data).version);
+  });
+  events.onerror = function () {
+    if (events.readyState === EventSource.CLOSED) poll();
+  };
 })();
 </script>
 """.strip()
 
 
 class VersionTracker:
-    """Tracks the newest file modification timestamp in the workspace."""
+    """Holds the workspace version string and the latest build status.
+
+    The version changes whenever a watched file does. Every change to
+    either bumps `seq`, which is what event streams wait on.
+    """
 
     def __init__(self, root: Path) -> None:
         self.root = root
-        self._lock = threading.Lock()
+        self._changed = threading.Condition()
         self._version = "0"
+        self._build = None
+        self._seq = 0
+        self._listeners: list = []
+
+    def add_listener(self, callback) -> None:
+        """Call `callback()` after every change, on the thread that made it."""
+        self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in list(self._listeners):
+            callback()
+
+    def snapshot(self):
+        """(seq, version, build status) without waiting."""
+        with self._changed:
+            return self._seq, self._version, self._build
 
     def get(self) -> str:
-        with self._lock:
+        with self._changed:
             return self._version
 
     def set(self, value: str) -> None:
-        with self._lock:
+        with self._changed:
             self._version = value
+            self._seq += 1
+            self._changed.notify_all()
+        self._notify()
 
+    def publish_build(self, status: dict) -> None:
+        with self._changed:
+            self._build = status
+            self._seq += 1
+            self._changed.notify_all()
+        self._notify()
 
-def compute_workspace_version(root: Path) -> str:
-    latest_mtime = 0.0
-    latest_file = ""
+    def wait_for_change(self, seen_seq: int, timeout: float):
+        """Block until seq moves past `seen_seq` or `timeout` passes.
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        # Skip VCS/cache folders for speed.
-        dirnames[:] = [
-            d
-            for d in dirnames
-            if d not in {".git", "__pycache__", ".venv", "venv"}
-        ]
+        Returns (seq, version, build status).
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq != seen_seq, timeout)
+            return self._seq, self._version, self._build
 
-        for filename in filenames:
-            path = Path(dirpath) / filename
-            if path.suffix.lower() not in WATCH_EXTENSIONS:
-                continue
 
-            try:
-                stat = path.stat()
-            except OSError:
-                continue
+def on_files_changed(tracker: VersionTracker, pages: "InjectedPages", paths: set) -> None:
+    pages.invalidate(paths)
+    # Include a file name so the version changes even within one timestamp.
+    first = min(paths) if paths else ""
+    version = f"{time.time():.6f}:{first}"
+    tracker.set(version)
+    more = f" (+{len(paths) - 1} more)" if len(paths) > 1 else ""
+    print(f"[reload] {version}{more}")
+
+
+class ProgramApi:
+    """The current ProgramIndex; replaced whole, so readers never see a half-built one."""
+
+    def __init__(self) -> None:
+        self.index = ProgramIndex([])
+        self._builds = 0
+
+    def refresh(self, program_objs: list) -> None:
+        self._builds += 1
+        self.index = ProgramIndex(program_objs, version=f"{self._builds}:{time.time():.0f}")
+
+
+def on_build_finished(
+    tracker: VersionTracker, api: ProgramApi, build: IncrementalBuild, status: dict
+) -> None:
+    if status.get("stats"):
+        api.refresh(build.program_objs)
+    tracker.publish_build(status)
+
+
+def inject_live_reload(html: str) -> str:
+    if "__reload_version" in html:
+        return html
+    lower = html.lower()
+    if "</body>" in lower:
+        idx = lower.rfind("</body>")
+        return html[:idx] + "\n" + LIVE_RELOAD_SNIPPET + "\n" + html[idx:]
+    return html + "\n" + LIVE_RELOAD_SNIPPET + "\n"
+
+
+class Page:
+    """An HTML file with the live-reload snippet injected, ready to send."""
+
+    __slots__ = ("signature", "body", "etag", "_compressed", "_lock")
+
+    def __init__(self, signature, body: bytes) -> None:
+        self.signature = signature  # (st_mtime_ns, st_size) of the source
+        self.body = body
+        self.etag = strong_etag(body)
+        self._compressed = {}       # encoding -> (encoding, etag, bytes)
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str):
+        """(encoding, etag, bytes) to send, compressing at most once per encoding."""
+        if not encoding or len(self.body) < MIN_COMPRESS_BYTES:
+            return "", self.etag, self.body
+        with self._lock:
+            if encoding not in self._compressed:
+                self._compressed[encoding] = (
+                    encoding,
+                    strong_etag(self.body, encoding),
+                    compress(self.body, encoding),
+                )
+            return self._compressed[encoding]
+
+
+class InjectedPages:
+    """Injected HTML per file, reused while the file's (mtime, size) holds.
+
+    The watcher also drops entries as soon as a page changes on disk.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._pages: dict[str, Page] = {}
+        self._lock = threading.Lock()
+
+    def get(self, target: Path):
+        """Page for `target`, or None if it isn't a UTF-8 file we can read."""
+        key = str(target)
+        try:
+            st = target.stat()
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            page = self._pages.get(key)
+        if page is not None and page.signature == signature:
+            return page
+        try:
+            html = target.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        page = Page(signature, inject_live_reload(html).encode("utf-8"))
+        with self._lock:
+            self._pages[key] = page
+        return page
+
+    def invalidate(self, rel_paths) -> None:
+        with self._lock:
+            if "" in rel_paths:  # the watcher lost events; forget everything
+                self._pages.clear()
+                return
+            for rel in rel_paths:
+                self._pages.pop(str(self.root / rel), None)
+
+
+# -- routes shared by the threaded handlers and the asyncio server ------------
+# Each returns (status, JSON-able body, ETag or "").
+
+
+def api_route(api: ProgramApi, path: str, query: str):
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    index = api.index
+    try:
+        if path == "/api/programs":
+            return 200, index.query(params), ""
+        return 200, index.facets(params), ""
+    except QueryError as e:
+        return 400, {"error": str(e)}, ""
+
+
+def _row_table(root: Path, path: str):
+    name = path[len("/__rows/"):].strip("/")
+    if name not in TABLES:
+        return None
+    return CsvTable(root, name)
 
-            if stat.st_mtime > latest_mtime:
-                latest_mtime = stat.st_mtime
-                latest_file = str(path.relative_to(root)).replace("\\", "/")
 
-    # Include file name so multiple files saved in same timestamp still update.
-    return f"{latest_mtime:.6f}:{latest_file}"
+def rows_get_route(root: Path, path: str, query: str):
+    table = _row_table(root, path)
+    if table is None:
+        return 404, {"error": "unknown table"}, ""
+    try:
+        result = table.get(parse_qs(query).get("id"))
+    except OSError as e:
+        return 500, {"error": str(e)}, ""
+    return 200, result, result["etag"]
+
+
+def rows_patch_route(root: Path, builder, path: str, if_match: str, body: bytes):
+    table = _row_table(root, path)
+    if table is None:
+        return 404, {"error": "unknown table"}, ""
+    if not if_match:
+        return 428, {"error": "If-Match header required"}, ""
+    try:
+        data = json.loads(body.decode("utf-8") or "null")
+        if not isinstance(data, dict):
+            raise RowError("body must be a JSON object")
+        result = table.patch(if_match, data.get("upsert"), data.get("delete"))
+    except RowConflict as e:
+        return 412, {"error": "conflict", "etag": e.etag}, e.etag
+    except (json.JSONDecodeError, UnicodeDecodeError, RowError) as e:
+        return 400, {"error": str(e)}, ""
+    except OSError as e:
+        return 500, {"error": str(e)}, ""
+
+    changed = result["updated"] + result["inserted"] + result["deleted"]
+    if builder and changed:
+        result["build"] = builder.request(f"patched {table.path.name}")
+    return 200, result, result["etag"]
+
+
+def save_csv_route(root: Path, builder, body: bytes):
+    try:
+        data = json.loads(body.decode("utf-8"))
+        file_path = data.get("path", "")
+        csv_content = data.get("content", "")
+
+        # Prevent path traversal attacks
+        if ".." in file_path or file_path.startswith("/"):
+            return 400, {"error": "Invalid path"}, ""
+
+        # Resolve path relative to project root
+        target_path = root / file_path
+        etag = write_text_locked(target_path, csv_content)
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, OSError) as e:
+        return 400, {"error": str(e)}, ""
+
+    result = {"success": True, "etag": etag}
+    if builder and target_path.suffix.lower() == ".csv":
+        result["build"] = builder.request(f"saved {file_path}")
+    return 200, result, ""
+
+
+def sse_event(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def requested_range(range_header: str, if_range: str, identity, last_modified: str):
+    """(first, last) to answer with a 206, or None to send the whole file.
+
+    Raises RangeNotSatisfiable. A stale If-Range means the whole file.
+    """
+    if not range_header:
+        return None
+    if if_range and if_range not in {identity.etag, last_modified}:
+        return None
+    return parse_range(range_header, identity.size)
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    """Static files (compressed variants, ETags, 304s) and the JSON API."""
+
+    static: StaticFiles
+    api: ProgramApi
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+
+        if parsed.path in {"/api/programs", "/api/facets"}:
+            self.send_json(*api_route(self.api, parsed.path, parsed.query))
+            return
+
+        return super().do_GET()
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
 
+    def send_json(self, code: int, data, etag: str = "") -> None:
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and urlparse(self.path).path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if os.path.isfile(path):
+            variant = self.static.lookup(path, self.headers.get("Accept-Encoding", ""))
+            if variant is not None:
+                return self.send_variant(path, variant)
+
+        return super().send_head()
+
+    def send_cache_headers(self, path: str, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control(path))
+        self.send_header("Vary", "Accept-Encoding")
+
+    def not_modified(self, path: str, etag: str) -> bool:
+        """Send a 304 and return True if the client already has `etag`."""
+        if not etag_matches(self.headers.get("If-None-Match", ""), etag):
+            return False
+        self.send_response(304)
+        self.send_cache_headers(path, etag)
+        self.end_headers()
+        return True
 
-def start_watcher(tracker: VersionTracker, interval: float) -> None:
-    while True:
-        version = compute_workspace_version(tracker.root)
-        if version != tracker.get():
-            tracker.set(version)
-            print(f"[reload] {version}")
-        time.sleep(interval)
+    def send_variant(self, path: str, variant):
+        """Headers for a file (or its compressed sidecar); returns the body to copy."""
+        if self.not_modified(path, variant.etag):
+            return None
+        try:
+            body = open(variant.path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        if variant.encoding:
+            self.send_header("Content-Encoding", variant.encoding)
+        self.send_header("Content-Length", str(variant.size))
+        self.send_header("Last-Modified", self.date_time_string(variant.mtime))
+        self.send_cache_headers(path, variant.etag)
+        self.end_headers()
+        return body
 
 
-class LiveReloadHandler(SimpleHTTPRequestHandler):
+class LiveReloadHandler(StaticHandler):
     tracker: VersionTracker
+    pages: InjectedPages
+    builder: BuildWorker | None = None
 
     def do_GET(self) -> None:
         parsed = urlparse(self.path)
 
+        if parsed.path == "/__reload_events":
+            self.stream_reload_events()
+            return
+
+        if parsed.path == "/__build_status":
+            self.send_json(200, self.builder.status() if self.builder else {"state": "disabled"})
+            return
+
         if parsed.path == "/__reload_version":
-            payload = json.dumps(
-                {"version": self.tracker.get()}
-            ).encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Content-Length", str(len(payload)))
-            self.end_headers()
-            self.wfile.write(payload)
+            self.send_json(200, {"version": self.tracker.get()})
+            return
+
+        if parsed.path.startswith("/__rows/"):
+            self.send_json(*rows_get_route(Path(self.directory), parsed.path, parsed.query))
             return
 
         return super().do_GET()
 
-    def do_POST(self) -> None:
+    def do_PATCH(self) -> None:
         parsed = urlparse(self.path)
+        if not parsed.path.startswith("/__rows/"):
+            self.send_json(404, {"error": "not found"})
+            return
+        self.send_json(*rows_patch_route(
+            Path(self.directory),
+            self.builder,
+            parsed.path,
+            self.headers.get("If-Match", ""),
+            self.read_body(),
+        ))
 
-        if parsed.path == "/__save_csv":
-            content_length = int(
-                self.headers.get("Content-Length", 0)
-            )
-            body = self.rfile.read(content_length).decode("utf-8")
+    def stream_reload_events(self) -> None:
+        """Server-sent events: one "version" event now and on every change."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        self.close_connection = True
 
-            try:
-                data = json.loads(body)
-                file_path = data.get("path", "")
-                csv_content = data.get("content", "")
-
-                # Prevent path traversal attacks
-                if ".." in file_path or file_path.startswith("/"):
-                    self.send_response(400)
-                    self.send_header("Content-Type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps(
-                            {"error": "Invalid path"}
-                        ).encode("utf-8")
-                    )
-                    return
+        seq, sent_version, sent_build = -1, None, None
+        try:
+            self.wfile.write(f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8"))
+            while True:
+                new_seq, version, build = self.tracker.wait_for_change(seq, SSE_KEEPALIVE_SECONDS)
+                if new_seq == seq:
+                    self.wfile.write(b": keepalive\n\n")
+                if version != sent_version:
+                    self.send_event("version", {"version": version})
+                    sent_version = version
+                if build is not sent_build:
+                    self.send_event("build", build)
+                    sent_build = build
+                seq = new_seq
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # tab closed or reloaded
+
+    def send_event(self, event: str, data) -> None:
+        self.wfile.write(sse_event(event, data))
+
+    def do_POST(self) -> None:
+        parsed = urlparse(self.path)
 
-                # Resolve path relative to project root
-                target_path = Path(self.directory) / file_path
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                target_path.write_text(csv_content, encoding="utf-8")
-
-                response = json.dumps(
-                    {"success": True}
-                ).encode("utf-8")
-                self.send_response(200)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Content-Length", str(len(response)))
-                self.end_headers()
-                self.wfile.write(response)
-            except (json.JSONDecodeError, KeyError, OSError) as e:
-                error_msg = json.dumps(
-                    {"error": str(e)}
-                ).encode("utf-8")
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Content-Length", str(len(error_msg)))
-                self.end_headers()
-                self.wfile.write(error_msg)
+        if parsed.path == "/__save_csv":
+            self.send_json(*save_csv_route(Path(self.directory), self.builder, self.read_body()))
             return
 
-        self.send_response(404)
-        self.end_headers()
+        self.send_json(404, {"error": "not found"})
 
     def send_head(self):
         parsed = urlparse(self.path)
@@ -190,38 +553,464 @@ class LiveReloadHandler(SimpleHTTPRequestHandler):
         if parsed.path.endswith(".html") or parsed.path in {"", "/"}:
             local = parsed.path.lstrip("/") or "index.html"
             target = Path(self.directory) / local
-            if target.exists() and target.is_file():
-                try:
-                    html = target.read_text(encoding="utf-8")
-                except UnicodeDecodeError:
+            if target.is_file():
+                page = self.pages.get(target)
+                if page is None:
                     # Fallback to normal behavior for non-UTF8 files.
                     return super().send_head()
+                return self.send_page(page, str(target))
+
+        return super().send_head()
+
+    def send_page(self, page: Page, path: str):
+        """Like send_variant for an injected page held in memory."""
+        encoding = choose_encoding(self.headers.get("Accept-Encoding", ""), path)
+        encoding, etag, body = page.variant(encoding)
+        if self.not_modified(path, etag):
+            return None
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_cache_headers(path, etag)
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+class ProductionHandler(StaticHandler):
+    """Static files and the JSON API only: no live reload, no save endpoints.
+
+    Connections stay open between requests (HTTP/1.1), file bodies are
+    sent with socket.sendfile() (os.sendfile where the OS has it), and
+    single byte ranges of the uncompressed file are answered with 206.
+    """
 
-                if "__reload_version" not in html:
-                    lower = html.lower()
-                    if "</body>" in lower:
-                        idx = lower.rfind("</body>")
-                        html = (
-                            html[:idx]
-                            + "\n"
-                            + LIVE_RELOAD_SNIPPET
-                            + "\n"
-                            + html[idx:]
-                        )
-                    else:
-                        html = html + "\n" + LIVE_RELOAD_SNIPPET + "\n"
-
-                body = html.encode("utf-8")
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                self.send_header("Cache-Control", "no-store")
-                self.send_header("Content-Length", str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
-                return None
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT_SECONDS  # close idle keep-alive connections
+    disable_nagle_algorithm = True
+    byte_range = None  # (offset, count) for copyfile, set by send_variant
 
+    def send_head(self):
+        self.byte_range = None
         return super().send_head()
 
+    def send_cache_headers(self, path: str, etag: str) -> None:
+        super().send_cache_headers(path, etag)
+        self.send_header("Accept-Ranges", "bytes")
+
+    def send_variant(self, path: str, variant):
+        header = self.headers.get("Range", "")
+        if not header:
+            return super().send_variant(path, variant)
+        # Ranges are served from the identity bytes, never a compressed copy
+        identity = variant if not variant.encoding else self.static.lookup(path, "")
+        if identity is None:
+            self.send_error(404, "File not found")
+            return None
+        try:
+            byte_range = requested_range(
+                header,
+                self.headers.get("If-Range", "").strip(),
+                identity,
+                self.date_time_string(identity.mtime),
+            )
+        except RangeNotSatisfiable:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{identity.size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        if byte_range is None:
+            return super().send_variant(path, variant)
+        if self.not_modified(path, identity.etag):
+            return None
+        try:
+            body = open(identity.path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+        first, last = byte_range
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {first}-{last}/{identity.size}")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("Last-Modified", self.date_time_string(identity.mtime))
+        self.send_cache_headers(path, identity.etag)
+        self.end_headers()
+        self.byte_range = (first, last - first + 1)
+        return body
+
+    def copyfile(self, source, outputfile) -> None:
+        try:
+            source.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            return super().copyfile(source, outputfile)
+        offset, count = self.byte_range or (0, None)
+        self.connection.sendfile(source, offset, count)
+
+    def reject_write(self) -> None:
+        self.close_connection = True  # the request body was not read
+        self.send_error(405, "Read-only server (--production)")
+
+    do_POST = do_PATCH = do_PUT = do_DELETE = reject_write
+
+
+# -- asyncio server core -------------------------------------------------------
+
+
+def translate_path(root: Path, url_path: str) -> str:
+    """Like SimpleHTTPRequestHandler.translate_path: no way out of `root`."""
+    parts = posixpath.normpath(unquote(url_path)).split("/")
+    parts = [part for part in parts if part not in {"", ".", ".."} and os.sep not in part]
+    return os.path.join(str(root), *parts)
+
+
+BAD_REQUEST = b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "version", "headers", "line", "body")
+
+    def __init__(self, head: bytes) -> None:
+        lines = head.decode("latin-1").split("\r\n")
+        self.line = lines[0]
+        try:
+            self.method, target, self.version = self.line.split(" ")
+        except ValueError:
+            raise ValueError(f"bad request line {self.line!r}") from None
+        parsed = urlparse(target)
+        self.path, self.query = parsed.path, parsed.query
+        self.headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                self.headers[name.strip().lower()] = value.strip()
+        self.body = b""
+
+    def header(self, name: str) -> str:
+        return self.headers.get(name, "")
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.header("connection").lower()
+        if self.version == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+
+class AsyncServer:
+    """The same routes on one asyncio event loop instead of a thread per connection.
+
+    A tab holding /__reload_events open is a suspended coroutine and a
+    socket rather than a parked thread, so a thousand of them cost a few
+    megabytes. Blocking work (CSV writes, a file's first compression, API
+    queries) runs in the default thread pool so the loop keeps serving.
+    With production=True it serves like ProductionHandler: no live
+    reload or save endpoints, and Range requests are honoured.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        static: StaticFiles,
+        api: ProgramApi,
+        tracker: VersionTracker | None = None,
+        pages: InjectedPages | None = None,
+        builder: BuildWorker | None = None,
+        production: bool = False,
+    ) -> None:
+        self.root = root
+        self.static = static
+        self.api = api
+        self.tracker = tracker
+        self.pages = pages
+        self.builder = builder
+        self.production = production
+        self._changed: asyncio.Event | None = None
+
+    async def serve_forever(self, host: str, port: int) -> None:
+        loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        if self.tracker is not None:
+            self.tracker.add_listener(lambda: loop.call_soon_threadsafe(self._wake))
+        server = await asyncio.start_server(
+            self.handle, host, port, limit=MAX_HEADER_BYTES, backlog=LISTEN_BACKLOG
+        )
+        async with server:
+            await server.serve_forever()
+
+    def _wake(self) -> None:
+        """Release every event stream waiting on the current Event."""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        client = peer[0] if peer else "-"
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT_SECONDS
+                    )
+                except (
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                    asyncio.TimeoutError,
+                ):
+                    return  # closed, idle too long, or headers too large
+                try:
+                    req = Request(head)
+                except ValueError:
+                    writer.write(BAD_REQUEST)
+                    await writer.drain()
+                    return
+                keep_alive = await self.respond(req, reader, writer, client)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            pass  # client went away
+        except ValueError:
+            pass  # bad Content-Length; drop the connection
+        finally:
+            writer.close()
+
+    async def respond(self, req: Request, reader, writer, client: str) -> bool:
+        method, path = req.method, req.path
+        dev = not self.production
+
+        if method in {"POST", "PATCH", "PUT", "DELETE"}:
+            if not dev:
+                return await self.send(writer, req, client, 405, [], b"", keep_alive=False)
+            req.body = await reader.readexactly(int(req.header("content-length") or 0))
+
+        if dev and path == "/__reload_events" and method == "GET":
+            await self.stream_events(writer, req, client)
+            return False
+        if dev and path == "/__reload_version":
+            return await self.send_json(writer, req, client, 200, {"version": self.tracker.get()})
+        if dev and path == "/__build_status":
+            status = self.builder.status() if self.builder else {"state": "disabled"}
+            return await self.send_json(writer, req, client, 200, status)
+        if dev and path.startswith("/__rows/") and method == "GET":
+            result = await asyncio.to_thread(rows_get_route, self.root, path, req.query)
+            return await self.send_json(writer, req, client, *result)
+        if dev and path.startswith("/__rows/") and method == "PATCH":
+            result = await asyncio.to_thread(
+                rows_patch_route, self.root, self.builder, path, req.header("if-match"), req.body
+            )
+            return await self.send_json(writer, req, client, *result)
+        if dev and path == "/__save_csv" and method == "POST":
+            result = await asyncio.to_thread(save_csv_route, self.root, self.builder, req.body)
+            return await self.send_json(writer, req, client, *result)
+        if path in {"/api/programs", "/api/facets"} and method in {"GET", "HEAD"}:
+            result = await asyncio.to_thread(api_route, self.api, path, req.query)
+            return await self.send_json(writer, req, client, *result)
+
+        if method in {"GET", "HEAD"}:
+            return await self.serve_file(writer, req, client)
+        if method in {"POST", "PATCH"}:
+            return await self.send_json(writer, req, client, 404, {"error": "not found"})
+        return await self.send(writer, req, client, 501, [], b"", keep_alive=False)
+
+    async def send(
+        self, writer, req: Request, client: str, code: int, headers: list, body: bytes,
+        length: int | None = None, keep_alive: bool = True,
+    ) -> bool:
+        """Write a response head (and `body`, unless HEAD); returns keep-alive."""
+        keep_alive = keep_alive and req.keep_alive
+        if length is None:
+            length = len(body)
+        lines = [
+            f"HTTP/1.1 {code} {HTTPStatus(code).phrase}",
+            f"Server: {SERVER_NAME}",
+            f"Date: {formatdate(usegmt=True)}",
+            *(f"{name}: {value}" for name, value in headers),
+        ]
+        if code != 304:
+            lines.append(f"Content-Length: {length}")
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body and req.method != "HEAD":
+            writer.write(body)
+        await writer.drain()
+        self.log(client, req, code, length if code != 304 else "-")
+        return keep_alive
+
+    async def send_json(
+        self, writer, req: Request, client: str, code: int, data, etag: str = ""
+    ) -> bool:
+        headers = [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("Cache-Control", "no-store"),
+        ]
+        if etag:
+            headers.append(("ETag", etag))
+        body = json.dumps(data).encode("utf-8")
+        return await self.send(writer, req, client, code, headers, body)
+
+    def cache_headers(self, path: str, etag: str) -> list:
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", cache_control(path)),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if self.production:
+            headers.append(("Accept-Ranges", "bytes"))
+        return headers
+
+    async def serve_file(self, writer, req: Request, client: str) -> bool:
+        path = translate_path(self.root, req.path)
+        if os.path.isdir(path):
+            if not req.path.endswith("/"):
+                location = req.path + "/" + (f"?{req.query}" if req.query else "")
+                return await self.send(writer, req, client, 301, [("Location", location)], b"")
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return await self.send(writer, req, client, 404, [], b"File not found")
+        accept = req.header("accept-encoding")
+
+        injectable = req.path.endswith(".html") or req.path in {"", "/"}
+        if self.pages is not None and not self.production and injectable:
+            page = await asyncio.to_thread(self.pages.get, Path(path))
+            if page is not None:
+                encoding, etag, body = await asyncio.to_thread(
+                    page.variant, choose_encoding(accept, path)
+                )
+                headers = self.cache_headers(path, etag)
+                if etag_matches(req.header("if-none-match"), etag):
+                    return await self.send(writer, req, client, 304, headers, b"")
+                headers.insert(0, ("Content-Type", "text/html; charset=utf-8"))
+                if encoding:
+                    headers.insert(1, ("Content-Encoding", encoding))
+                return await self.send(writer, req, client, 200, headers, body)
+
+        variant = await asyncio.to_thread(self.static.lookup, path, accept)
+        if variant is None:
+            return await self.send(writer, req, client, 404, [], b"File not found")
+        code, first, length = 200, 0, variant.size
+        content_range = None
+        if self.production and req.header("range"):
+            identity = variant if not variant.encoding else await asyncio.to_thread(
+                self.static.lookup, path, ""
+            )
+            if identity is None:
+                return await self.send(writer, req, client, 404, [], b"File not found")
+            try:
+                byte_range = requested_range(
+                    req.header("range"), req.header("if-range"), identity,
+                    formatdate(identity.mtime, usegmt=True),
+                )
+            except RangeNotSatisfiable:
+                headers = [("Content-Range", f"bytes */{identity.size}")]
+                return await self.send(writer, req, client, 416, headers, b"")
+            if byte_range is not None:
+                variant = identity
+                first, last = byte_range
+                code, length = 206, last - first + 1
+                content_range = f"bytes {first}-{last}/{variant.size}"
+
+        headers = self.cache_headers(path, variant.etag)
+        if etag_matches(req.header("if-none-match"), variant.etag):
+            return await self.send(writer, req, client, 304, headers, b"")
+        headers[:0] = [
+            ("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream"),
+            ("Last-Modified", formatdate(variant.mtime, usegmt=True)),
+        ]
+        if variant.encoding:
+            headers.append(("Content-Encoding", variant.encoding))
+        if content_range:
+            headers.append(("Content-Range", content_range))
+        try:
+            body = open(variant.path, "rb")
+        except OSError:
+            return await self.send(writer, req, client, 404, [], b"File not found")
+        with body:
+            keep_alive = await self.send(writer, req, client, code, headers, b"", length=length)
+            if req.method != "HEAD" and length:
+                loop = asyncio.get_running_loop()
+                await loop.sendfile(writer.transport, body, first, length)
+        return keep_alive
+
+    async def stream_events(self, writer, req: Request, client: str) -> None:
+        """Server-sent events, as LiveReloadHandler.stream_reload_events."""
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            f"Server: {SERVER_NAME}\r\n"
+            "Content-Type: text/event-stream; charset=utf-8\r\n"
+            "Cache-Control: no-store\r\n"
+            "X-Accel-Buffering: no\r\n"
+            "Connection: close\r\n\r\n"
+            f"retry: {SSE_RETRY_MS}\n\n"
+        ).encode("utf-8"))
+        self.log(client, req, 200, "-")
+        sent_version, sent_build = None, None
+        while True:
+            changed = self._changed  # taken before the snapshot, so no change is missed
+            _seq, version, build = self.tracker.snapshot()
+            if version != sent_version:
+                writer.write(sse_event("version", {"version": version}))
+                sent_version = version
+            if build is not sent_build:
+                writer.write(sse_event("build", build))
+                sent_build = build
+            await writer.drain()
+            try:
+                await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                writer.write(b": keepalive\n\n")
+
+    def log(self, client: str, req: Request, code: int, size) -> None:
+        sys.stderr.write(
+            f'{client} - - [{time.strftime("%d/%b/%Y %H:%M:%S")}] "{req.line}" {code} {size}\n'
+        )
+
+
+class DevHTTPServer(ThreadingHTTPServer):
+    request_queue_size = LISTEN_BACKLOG
+
+
+def run_async(server: AsyncServer, args: argparse.Namespace) -> None:
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+
+
+def run_threaded(handler_cls, args: argparse.Namespace) -> None:
+    server = DevHTTPServer((args.host, args.port), handler_cls)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+
+
+def load_program_api(build: IncrementalBuild) -> ProgramApi:
+    api = ProgramApi()
+    try:
+        build.load()
+        api.refresh(build.program_objs)
+    except Exception as e:  # serve the site anyway; the API stays empty
+        print(f"[api] could not load programs: {e}")
+    return api
+
+
+def serve_production(args: argparse.Namespace) -> None:
+    static = StaticFiles(PROJECT_ROOT, STATIC_CACHE_DIR)
+    api = load_program_api(IncrementalBuild())
+
+    print(f"Serving {PROJECT_ROOT} (production: no live reload, read-only)")
+    print(f"URL: http://{args.host}:{args.port} ({args.server} server)")
+    if args.server == "async":
+        run_async(AsyncServer(PROJECT_ROOT, static, api, production=True), args)
+        return
+    ProductionHandler.static = static
+    ProductionHandler.api = api
+    run_threaded(partial(ProductionHandler, directory=str(PROJECT_ROOT)), args)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -238,44 +1027,107 @@ def parse_args() -> argparse.Namespace:
         type=float,
         default=POLL_INTERVAL_SECONDS,
         help=(
-            "File watch interval in seconds "
+            "Poll interval in seconds when inotify is unavailable "
             f"(default: {POLL_INTERVAL_SECONDS})"
         ),
     )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE_SECONDS,
+        help=(
+            "Wait this long after the last change before reloading "
+            f"(default: {DEFAULT_DEBOUNCE_SECONDS})"
+        ),
+    )
+    parser.add_argument(
+        "--no-rebuild",
+        action="store_true",
+        help="Don't rebuild data.js in the background after CSV saves",
+    )
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help=(
+            "Serve files only: HTTP/1.1 keep-alive, sendfile and Range "
+            "requests; no live reload, save endpoints or rebuilds"
+        ),
+    )
+    parser.add_argument(
+        "--server",
+        choices=["thread", "async"],
+        default="thread",
+        help=(
+            "thread: a thread per connection (default); async: one asyncio "
+            "event loop, cheaper with many open tabs"
+        ),
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Use the polling watcher even where inotify is available",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    if args.production:
+        serve_production(args)
+        return
 
     tracker = VersionTracker(PROJECT_ROOT)
-    tracker.set(compute_workspace_version(PROJECT_ROOT))
+    tracker.set(f"{time.time():.6f}:")
+    LiveReloadHandler.tracker = tracker
+    LiveReloadHandler.static = StaticFiles(PROJECT_ROOT, STATIC_CACHE_DIR)
+    LiveReloadHandler.pages = InjectedPages(PROJECT_ROOT)
 
-    watcher = threading.Thread(
-        target=start_watcher,
-        args=(tracker, args.interval),
-        daemon=True,
-    )
-    watcher.start()
+    watcher = make_watcher(
+        PROJECT_ROOT,
+        partial(on_files_changed, tracker, LiveReloadHandler.pages),
+        WATCH_EXTENSIONS,
+        skip_dirs=SKIP_DIRS,
+        debounce=args.debounce,
+        poll_interval=args.interval,
+        force_poll=args.poll,
+    ).start()
 
-    handler_cls = partial(LiveReloadHandler, directory=str(PROJECT_ROOT))
-    handler_cls.tracker = tracker
+    build = IncrementalBuild()
+    LiveReloadHandler.api = load_program_api(build)
 
-    server = ThreadingHTTPServer((args.host, args.port), handler_cls)
+    if not args.no_rebuild:
+        LiveReloadHandler.builder = BuildWorker(
+            partial(validate_and_build, build),
+            publish=partial(on_build_finished, tracker, LiveReloadHandler.api, build),
+        ).start()
 
     print(f"Serving {PROJECT_ROOT}")
-    print(f"URL: http://{args.host}:{args.port}")
+    print(f"URL: http://{args.host}:{args.port} ({args.server} server)")
     print(
         "Live reload is enabled. Save a file and the browser refreshes "
         "automatically."
     )
+    print(f"Watching files with {type(watcher).__name__}")
 
     try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\nShutting down.")
+        if args.server == "async":
+            run_async(
+                AsyncServer(
+                    PROJECT_ROOT,
+                    LiveReloadHandler.static,
+                    LiveReloadHandler.api,
+                    tracker=tracker,
+                    pages=LiveReloadHandler.pages,
+                    builder=LiveReloadHandler.builder,
+                ),
+                args,
+            )
+        else:
+            run_threaded(partial(LiveReloadHandler, directory=str(PROJECT_ROOT)), args)
     finally:
-        server.server_close()
+        watcher.stop()
+        if LiveReloadHandler.builder:
+            LiveReloadHandler.builder.stop()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,30 @@
-import csv
 import json
 import re
-import time
 import urllib.parse
-import urllib.request
 from pathlib import Path
 
+from checkpoint import Journal
+from fetch_engine import FetchEngine
+from schema import Program, load_orgs, load_programs, write_records
+
 PROGRAMS_PATH = Path("data/programs.csv")
 ORGS_PATH     = Path("data/organizations.csv")
 
 USER_AGENT = "CampFinderAddressEnricher/1.0 (local use)"
-REQUEST_DELAY_SECONDS = 0.7
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+# Nominatim usage policy: at most 1 request per second, no parallel requests.
+REQUESTS_PER_SECOND = 1.0
+WORKERS = 4  # rows prepared in parallel; the rate limit still serializes calls
+TIMEOUT = 20
+
+ENGINE = FetchEngine(
+    USER_AGENT,
+    rate=REQUESTS_PER_SECOND,
+    burst=1,
+    workers=WORKERS,
+    per_host=1,
+    timeout=TIMEOUT,
+)
 
 STREET_HINT_RE = re.compile(
     (
@@ -40,9 +54,8 @@ def normalize_city(value: str) -> str:
     return re.sub(r"\s+", " ", (value or "").strip().lower())
 
 
-def fetch_nominatim(query: str):
-    base_url = "https://nominatim.openstreetmap.org/search?"
-    url = base_url + urllib.parse.urlencode(
+def fetch_nominatim(query: str, engine: FetchEngine = ENGINE):
+    url = NOMINATIM_URL + "?" + urllib.parse.urlencode(
         {
             "q": query,
             "format": "jsonv2",
@@ -51,8 +64,7 @@ def fetch_nominatim(query: str):
             "countrycodes": "us",
         }
     )
-    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(request, timeout=20) as response:
+    with engine.open(url) as response:
         payload = response.read().decode("utf-8")
     return json.loads(payload)
 
@@ -130,9 +142,9 @@ def choose_result(results, expected_city: str):
     return fallback
 
 
-def enrich_row(row, org_name):
-    location = (row.get("site_address") or "").strip()
-    city = (row.get("site_city") or "").strip()
+def enrich_row(program: Program, org_name):
+    location = program.site_address
+    city = program.site_city
 
     if looks_street_address(location):
         return None
@@ -148,18 +160,22 @@ def enrich_row(row, org_name):
     seen = set()
     deduped_queries = [q for q in queries if not (q.lower() in seen or seen.add(q.lower()))]
 
+    error = None
     for query in deduped_queries:
         try:
             results = fetch_nominatim(query)
-        except Exception:
-            time.sleep(REQUEST_DELAY_SECONDS)
+        except Exception as e:
+            error = e
             continue
 
         full_address = choose_result(results, city)
-        time.sleep(REQUEST_DELAY_SECONDS)
         if full_address:
             return full_address
 
+    # A failed lookup is not "no address": raise so the row isn't journaled
+    # and a resumed run tries it again.
+    if error is not None:
+        raise error
     return None
 
 
@@ -167,47 +183,59 @@ def main():
     # Load org name lookup
     org_names = {}
     if ORGS_PATH.exists():
-        with ORGS_PATH.open("r", encoding="utf-8", newline="") as f:
-            for r in csv.DictReader(f):
-                org_id = (r.get("org_id") or "").strip()
-                name   = (r.get("org_name") or "").strip()
-                if org_id:
-                    org_names[org_id] = name
-
-    with PROGRAMS_PATH.open("r", encoding="utf-8", newline="") as file:
-        reader = csv.DictReader(file)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+        org_names = {org.org_id: org.org_name for org in load_orgs(ORGS_PATH)[1] if org.org_id}
+
+    fieldnames, rows = load_programs(PROGRAMS_PATH)
+
+    # Geocodes from an interrupted run are replayed instead of re-queried
+    journal = Journal("enrich_locations")
+    done = journal.replay()
 
     checked = 0
     updated = 0
+    resumed = 0
     standardized_existing = 0
+    pending = []
 
     for row in rows:
-        location = (row.get("site_address") or "").strip()
-        city = (row.get("site_city") or "").strip()
-        org_id = (row.get("org_id") or "").strip()
-        org_name = org_names.get(org_id, "")
+        program_id = row.program_id
+        if program_id in done:
+            full_address = done[program_id].get("site_address")
+            if full_address:
+                row.site_address = full_address
+                updated += 1
+            resumed += 1
+            continue
+
+        location = row.site_address
+        city = row.site_city
+        org_name = org_names.get(row.org_id, "")
 
         if looks_street_address(location):
             if city and not location_has_city_or_state(location, city):
-                row["site_address"] = f"{location}, {city}, VT"
+                row.site_address = f"{location}, {city}, VT"
                 standardized_existing += 1
             continue
         if not city or (not location and not org_name):
             continue
 
         checked += 1
-        full_address = enrich_row(row, org_name)
-        if full_address:
-            row["site_address"] = full_address
-            updated += 1
-
-    with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
+        pending.append((row, org_name))
+
+    with journal:
+        for (row, _), full_address, error in ENGINE.run(lambda job: enrich_row(*job), pending):
+            program_id = row.program_id
+            if program_id and error is None:
+                journal.append(program_id, {"site_address": full_address or ""})
+            if full_address:
+                row.site_address = full_address
+                updated += 1
+
+    write_records(PROGRAMS_PATH, fieldnames, rows)
+    journal.discard()
+
+    if resumed:
+        print("Rows resumed from journal:", resumed)
     print("Rows considered:", checked)
     print("Locations updated:", updated)
     print("Street rows standardized:", standardized_existing)
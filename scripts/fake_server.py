@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Local stand-in HTTP server for exercising the network scripts offline.
+
+Simulates slow hosts, HTTP errors and dropped connections so the fetch
+engine, link checker and retry logic can be tried without touching real
+camp websites or Nominatim.
+
+Every path accepts query parameters that shape the response:
+
+    ?delay=2.5        sleep this many seconds before answering
+    ?status=503       respond with this status code
+    ?drop=1           close the connection without a response
+    ?redirect=/page   302 to the given path (with &status=301, 307 or 308
+                      to use that redirect code instead)
+    ?no_head=1        answer HEAD with 405, as some servers do
+    ?fail=2           answer 503 to the first 2 hits on this exact URL
+    ?retry_after=1    add a Retry-After header to error responses
+
+Routes whose headers include an ETag answer a matching If-None-Match
+with 304 Not Modified.
+
+Canned routes can also be registered in code:
+
+    with FakeServer({"/camp": (200, {"Content-Type": "text/html"}, b"...")}) as srv:
+        fetch_description(srv.url("/camp?delay=0.5"))
+
+Run standalone to poke at it by hand:
+    python scripts/fake_server.py --port 8765
+
+or run the offline checks against it (exits non-zero on failure):
+FetchEngine's retries and circuit breaker, and check_links.py's
+HEAD/GET fallback, redirect classification and canonical rewrite:
+    python scripts/fake_server.py --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+DEFAULT_PAGE = b"""<!doctype html>
+<html><head>
+<meta property="og:description" content="A week of canoeing, hiking and campfire songs on the shores of Lake Champlain for curious kids.">
+<title>Fake Camp</title>
+</head><body><p>Placeholder body text.</p></body></html>
+"""
+
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+
+DEFAULT_ROUTES = {
+    "/": (200, {"Content-Type": "text/html; charset=utf-8", "ETag": '"fake-v1"'},
+          DEFAULT_PAGE),
+    "/search": (200, {"Content-Type": "application/json"}, b"[]"),
+}
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    server_version = "FakeCampServer/1.0"
+
+    def log_message(self, format, *args):  # quiet unless verbose
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, include_body: bool) -> None:
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        with self.server.lock:
+            self.server.hits.append(self.path)
+
+        delay = float(params.get("delay", 0) or 0)
+        if delay:
+            time.sleep(delay)
+
+        if params.get("drop"):
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        if params.get("fail"):
+            with self.server.lock:
+                seen = self.server.fail_counts.get(self.path, 0)
+                self.server.fail_counts[self.path] = seen + 1
+            if seen < int(params["fail"]):
+                params.setdefault("status", "503")
+
+        if params.get("redirect"):
+            status = int(params.get("status", 302))
+            self.send_response(status if status in REDIRECT_STATUS else 302)
+            self.send_header("Location", params["redirect"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        status, headers, body = self.server.routes.get(
+            parsed.path, (404, {"Content-Type": "text/plain"}, b"not found")
+        )
+        if "status" in params:
+            status = int(params["status"])
+        elif headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+            self.send_response(304)
+            self.send_header("ETag", headers["ETag"])
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status >= 400 and params.get("retry_after"):
+            self.send_header("Retry-After", params["retry_after"])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        self._respond(include_body=True)
+
+    def do_HEAD(self) -> None:
+        if "no_head=1" in self.path:
+            with self.server.lock:
+                self.server.hits.append(f"HEAD {self.path}")
+            self.send_response(405)
+            self.send_header("Allow", "GET")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._respond(include_body=False)
+
+
+class FakeServer:
+    """Context manager that runs a fake HTTP server on a background thread."""
+
+    def __init__(self, routes: dict | None = None, host: str = "127.0.0.1",
+                 port: int = 0, verbose: bool = False) -> None:
+        self.httpd = ThreadingHTTPServer((host, port), _FakeHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.routes = dict(DEFAULT_ROUTES)
+        self.httpd.routes.update(routes or {})
+        self.httpd.hits = []
+        self.httpd.fail_counts = {}
+        self.httpd.lock = threading.Lock()
+        self.httpd.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def hits(self) -> list:
+        """Request paths received so far, in arrival order."""
+        with self.httpd.lock:
+            return list(self.httpd.hits)
+
+    def url(self, path: str = "/") -> str:
+        return self.base_url + path
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def check_engine() -> list:
+    """Failed FetchEngine checks, as messages (empty if all passed)."""
+    import urllib.error
+
+    from fetch_engine import FetchEngine
+    from retry_policy import CircuitOpenError, RetryPolicy
+
+    def fetch(engine: FetchEngine, url: str):
+        try:
+            with engine.open(url) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except CircuitOpenError:
+            return "circuit open"
+
+    failures = []
+    with FakeServer() as server:
+        # One page that keeps failing is that page's problem, not the host's
+        engine = FetchEngine("check", rate=0, retry=RetryPolicy(base_delay=0.01))
+        for _ in range(2):
+            got = fetch(engine, server.url("/broken?status=503"))
+            if got != 503:
+                failures.append(f"broken page: expected 503, got {got}")
+        got = fetch(engine, server.url("/"))
+        if got != 200:
+            failures.append(f"one bad URL tripped the breaker: / gave {got}")
+
+        # Distinct failing pages still open it
+        engine = FetchEngine("check", rate=0, retry=RetryPolicy(max_attempts=1))
+        for i in range(engine.breaker_threshold):
+            fetch(engine, server.url(f"/down{i}?status=503"))
+        got = fetch(engine, server.url("/"))
+        if got != "circuit open":
+            failures.append(f"breaker did not open after distinct 5xx pages: / gave {got}")
+
+        # A retried request that finally succeeds counts as a success
+        engine = FetchEngine("check", rate=0, retry=RetryPolicy(base_delay=0.01))
+        got = fetch(engine, server.url("/?fail=2"))
+        if got != 200:
+            failures.append(f"retry: expected 200 after two 503s, got {got}")
+    return failures
+
+
+def check_link_checker() -> list:
+    """Failed check_links.py checks, as messages (empty if all passed)."""
+    import tempfile
+    from pathlib import Path
+
+    from check_links import head_then_get, rewrite_canonical
+    from fetch_engine import FetchEngine
+    from schema import Organization, load_records
+
+    failures = []
+    engine = FetchEngine("check", rate=0)
+    with FakeServer() as server:
+        home = server.url("/")
+        expected = {
+            "/": (200, home, False),
+            "/?redirect=/&status=301": (200, home, True),
+            "/?redirect=/&status=308": (200, home, True),
+            "/?redirect=/": (200, home, False),
+            "/?no_head=1": (200, server.url("/?no_head=1"), False),
+            "/missing": (404, server.url("/missing"), False),
+        }
+        results = {}
+        for path, want in expected.items():
+            result = results[path] = head_then_get(server.url(path), engine)
+            got = (result["status"], result["final_url"], result["permanent"])
+            if got != want:
+                failures.append(f"head_then_get {path}: expected {want}, got {got}")
+        if [hit for hit in server.hits if "no_head" in hit] != [
+            "HEAD /?no_head=1", "/?no_head=1"
+        ]:
+            failures.append("HEAD 405 did not fall back to GET")
+
+    # --write-canonical edits only the redirected cells, keeping the file's bytes
+    moved = server.url("/?redirect=/&status=301")
+    canonical = {
+        server.url(path): r["final_url"] for path, r in results.items() if r["permanent"]
+    }
+    original = (
+        "org_id,org_name,website\n"
+        f"a,Alpha,{moved}\n"
+        f'b,"Beta, Inc.",{home}\n'
+        f"c,Gamma,{moved} {home}\n"
+        f"d, Delta ,{home}\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "organizations.csv"
+        path.write_bytes(original.encode("utf-8"))
+        changed = rewrite_canonical(path, "website", *load_records(Organization, path), canonical)
+        want = original.replace(moved, home).encode("utf-8")
+        if changed != 2:
+            failures.append(f"rewrite_canonical: expected 2 rows changed, got {changed}")
+        if path.read_bytes() != want:
+            failures.append("rewrite_canonical changed bytes outside the edited cells")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake HTTP server for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Run the FetchEngine and check_links checks instead of serving",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        failed = False
+        for name, check in [("FetchEngine", check_engine), ("check_links", check_link_checker)]:
+            failures = check()
+            for failure in failures:
+                print(f"FAIL: {failure}")
+            print(f"{name} checks: " + ("failed" if failures else "ok"))
+            failed = failed or bool(failures)
+        raise SystemExit(1 if failed else 0)
+
+    server = FakeServer(host=args.host, port=args.port, verbose=True)
+    print(f"Fake server at {server.base_url}  (try /?delay=2, /?status=503, /?drop=1)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,38 +10,100 @@ Run from the project root:
 
 Only rows with a registration_url and a blank description are processed.
 Existing descriptions are never overwritten.
+
+Results are appended to data/.checkpoints/fetch_descriptions.jsonl as they
+arrive. If the run is interrupted, the next run replays that journal and
+only fetches the rows that are still missing.
+
+Fetched pages are kept in a compressed, size-bounded cache under
+data/.cache/http/. Later runs send If-None-Match / If-Modified-Since, so
+unchanged pages come back as 304 and are parsed from the cache.
+
+The same fetch also reads schema.org Event/Offer data (JSON-LD or
+microdata) when a page has it. Proposed start_date, end_date, cost_raw,
+age_min/age_max and site_address values are written to
+data/structured_candidates.csv for review; programs.csv is not changed.
+
+Pages are fetched concurrently through scripts/fetch_engine.py: at most
+PER_HOST requests in flight per site, spaced REQUEST_DELAY apart, and no
+more than REQUESTS_PER_SECOND overall.
 """
 
-import csv
+import codecs
 import re
 import sys
-import time
 import urllib.error
-import urllib.parse
-import urllib.request
 from html.parser import HTMLParser
 from pathlib import Path
 
+from checkpoint import Journal
+from csv_io import read_csv, write_csv_atomic
+from fetch_engine import FetchEngine
+from http_cache import ResponseCache
+from schema import Program, load_orgs, load_programs, write_records
+from structured_data import (
+    CANDIDATE_FIELDS,
+    MICRODATA_PROPS,
+    events_from_jsonld,
+    extract_candidates,
+)
+
 PROGRAMS_PATH = Path("data/programs.csv")
 ORGS_PATH     = Path("data/organizations.csv")
+CANDIDATES_PATH = Path("data/structured_candidates.csv")
 
 USER_AGENT = "CampFinderDescriptionFetcher/1.0 (local research tool)"
-REQUEST_DELAY = 0.8  # seconds between requests
+REQUEST_DELAY = 0.8  # seconds between requests to the same host
+REQUESTS_PER_SECOND = 4.0  # global cap across all hosts
+PER_HOST = 1  # concurrent requests per host
+WORKERS = 8
 TIMEOUT = 15  # seconds per request
 MIN_DESC_LEN = 40  # ignore descriptions shorter than this
 MAX_DESC_LEN = 500  # truncate descriptions longer than this
+CHUNK_SIZE = 8192  # bytes per socket read
+MAX_PAGE_BYTES = 200_000  # never read more than this per page
+STRUCTURED_SCAN_BYTES = 64_000  # keep reading this far for Event data
+
+META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I
+)
+HEADER_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([^\s;"']+)""", re.I)
+
+# Tags that separate words in itemprop text: "12<br>Main St" is "12 Main St"
+BREAK_TAGS = {"br", "div", "p", "li", "td"}
+# Elements that never have an end tag, so can't hold itemprop text
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
 
 
 # -- HTML parser -------------------------------------------------------------
 
 
 class MetaDescParser(HTMLParser):
-    """Extracts meta description / og:description and first body paragraphs."""
+    """Extracts meta description / og:description and first body paragraphs.
+
+    Also collects schema.org Event data (JSON-LD blocks and microdata
+    itemprops) so the same fetch can propose dates, prices, ages and an
+    address; see structured().
+
+    Microdata is kept as one {itemprop: value} dict per item, in page
+    order. Each Event itemscope starts a new item; properties of scopes
+    nested in it (its Place, PostalAddress, Offer) go to that Event.
+    """
 
     def __init__(self):
         super().__init__()
         self.og_desc = ""
         self.meta_desc = ""
+        self.ld_events = []
+        self.microdata = []  # one {itemprop: value} per item
+        self._in_ldjson = False
+        self._ld_buf = []
+        self._scopes = []     # open itemscopes: [tag, open count, props]
+        self._itemprops = []  # open itemprops: [tag, open count, prop, text parts, props]
+        self._loose_props = None  # itemprops outside any itemscope
         self._in_body = False
         self._in_p = False
         self._p_texts = []
@@ -53,6 +115,12 @@ class MetaDescParser(HTMLParser):
     def handle_starttag(self, tag, attrs):
         attr_dict = dict(attrs)
 
+        # Structured data is collected even inside skipped regions
+        if tag == "script" and (attr_dict.get("type") or "").lower() == "application/ld+json":
+            self._in_ldjson = True
+            self._ld_buf = []
+        self._open_microdata(tag, attr_dict)
+
         if tag == "body":
             self._in_body = True
 
@@ -86,6 +154,12 @@ class MetaDescParser(HTMLParser):
     def handle_endtag(self, tag):
         self._depth -= 1
 
+        if tag == "script" and self._in_ldjson:
+            self._in_ldjson = False
+            self.ld_events.extend(events_from_jsonld("".join(self._ld_buf)))
+
+        self._close_microdata(tag)
+
         if self._skip_depth is not None and self._depth < self._skip_depth:
             self._skip_depth = None
 
@@ -101,11 +175,92 @@ class MetaDescParser(HTMLParser):
             self._cur_p = []
 
     def handle_data(self, data):
+        if self._in_ldjson:
+            self._ld_buf.append(data)
+            return
+        for capture in self._itemprops:
+            capture[3].append(data)
         if self._skip_depth is not None:
             return
         if self._in_p:
             self._cur_p.append(data.strip())
 
+    # An element is closed when the end tags of its name balance the start
+    # tags seen since it opened, so <span itemprop="price"><span>$</span>
+    # 350</span> keeps the whole value.
+
+    def _open_microdata(self, tag, attr_dict):
+        for entry in self._scopes + self._itemprops:
+            if entry[0] == tag:
+                entry[1] += 1
+        if tag in BREAK_TAGS:
+            for capture in self._itemprops:
+                capture[3].append(" ")
+
+        props = self._scopes[-1][2] if self._scopes else None
+        itemprop = attr_dict.get("itemprop")
+        if itemprop in MICRODATA_PROPS:
+            if props is None:
+                props = self._page_props()
+            if itemprop not in props:
+                value = (attr_dict.get("content") or attr_dict.get("datetime") or "").strip()
+                if value:
+                    props[itemprop] = value
+                elif tag not in VOID_ELEMENTS:
+                    self._itemprops.append([tag, 1, itemprop, [], props])
+
+        if "itemscope" in attr_dict and tag not in VOID_ELEMENTS:
+            itemtype = (attr_dict.get("itemtype") or "").rstrip("/")
+            if props is None or itemtype.endswith("Event"):
+                props = {}
+                self.microdata.append(props)
+            self._scopes.append([tag, 1, props])
+
+    def _close_microdata(self, tag):
+        for capture in list(self._itemprops):
+            if capture[0] != tag:
+                continue
+            capture[1] -= 1
+            if capture[1] == 0:
+                self._itemprops.remove(capture)
+                _, _, itemprop, parts, props = capture
+                text = re.sub(r"\s+", " ", "".join(parts)).strip()
+                if text:
+                    props.setdefault(itemprop, text)
+        for scope in list(self._scopes):
+            if scope[0] == tag:
+                scope[1] -= 1
+                if scope[1] == 0:
+                    self._scopes.remove(scope)
+
+    def _page_props(self) -> dict:
+        if self._loose_props is None:
+            self._loose_props = {}
+            self.microdata.append(self._loose_props)
+        return self._loose_props
+
+    @property
+    def done(self) -> bool:
+        """True once reading more of the page cannot change best_description()."""
+        if len(self.og_desc.strip()) >= MIN_DESC_LEN:
+            return True
+        if not self._in_body:
+            return False
+        # <meta> tags live in <head>, so once the body starts they are final
+        if len(self.meta_desc.strip()) >= MIN_DESC_LEN:
+            return True
+        return sum(len(t) for t in self._p_texts) >= MAX_DESC_LEN
+
+    @property
+    def has_event(self) -> bool:
+        return bool(self.ld_events) or any(
+            props.get("startDate") or props.get("endDate") for props in self.microdata
+        )
+
+    def structured(self) -> dict:
+        """Candidate programs.csv values from schema.org Event data on the page."""
+        return extract_candidates(self.ld_events, self.microdata)
+
     def best_description(self) -> str:
         for candidate in [self.og_desc, self.meta_desc] + self._p_texts:
             text = candidate.strip()
@@ -121,36 +276,157 @@ class MetaDescParser(HTMLParser):
         return ""
 
 
-def fetch_description(url: str) -> str:
+ENGINE = FetchEngine(
+    USER_AGENT,
+    rate=REQUESTS_PER_SECOND,
+    burst=REQUESTS_PER_SECOND,
+    workers=WORKERS,
+    per_host=PER_HOST,
+    host_interval=REQUEST_DELAY,
+    timeout=TIMEOUT,
+)
+
+
+def sniff_charset(head: bytes, content_type: str) -> str:
+    """Pick the page encoding: HTTP header, then <meta charset>, then UTF-8."""
+    candidates = []
+    m = HEADER_CHARSET_RE.search(content_type or "")
+    if m:
+        candidates.append(m.group(1))
+    m = META_CHARSET_RE.search(head[:4096])
+    if m:
+        candidates.append(m.group(1).decode("ascii", errors="ignore"))
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def parse_stream(chunks, content_type: str):
+    """Feed byte chunks to MetaDescParser until it has what it needs.
+
+    Returns (parser, consumed_bytes). Stops pulling chunks once the
+    description is settled and either Event data was found or
+    STRUCTURED_SCAN_BYTES have been read, and never reads past
+    MAX_PAGE_BYTES.
+    """
+    parser = MetaDescParser()
+    consumed = []
+    total = 0
+    decoder = None
+    try:
+        for chunk in chunks:
+            consumed.append(chunk)
+            total += len(chunk)
+            if decoder is None:
+                encoding = sniff_charset(chunk, content_type)
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            parser.feed(decoder.decode(chunk))
+            if total >= MAX_PAGE_BYTES:
+                break
+            if parser.done and (parser.has_event or total >= STRUCTURED_SCAN_BYTES):
+                break
+        if decoder is not None:
+            parser.feed(decoder.decode(b"", final=True))
+    except Exception:
+        pass
+    return parser, b"".join(consumed)
+
+
+def _read_chunks(resp):
+    while True:
+        chunk = resp.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def fetch_description(url: str, engine: FetchEngine = ENGINE,
+                      cache: ResponseCache | None = None) -> str:
     """Fetch a URL and return the best description string, or '' on failure."""
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
+    return fetch_page(url, engine, cache)[0]
+
+
+def fetch_page(url: str, engine: FetchEngine = ENGINE,
+               cache: ResponseCache | None = None):
+    """Fetch a URL and return (description, structured candidates).
 
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    Returns ("", {}) on failure; see fetch_page_or_raise().
+    """
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-            # Only process HTML responses
-            content_type = resp.headers.get("Content-Type", "")
-            if "html" not in content_type.lower():
-                return ""
-            raw = resp.read(200_000)  # cap at ~200 KB
+        return fetch_page_or_raise(url, engine, cache)
     except (urllib.error.URLError, OSError, ValueError) as e:
         print(f"Warning: could not fetch {url}: {e}", file=sys.stderr)
-        return ""
+        return "", {}
 
-    # Decode — try UTF-8 then latin-1 fallback
-    try:
-        html = raw.decode("utf-8", errors="replace")
-    except Exception:
-        html = raw.decode("latin-1", errors="replace")
 
-    parser = MetaDescParser()
+def fetch_page_or_raise(url: str, engine: FetchEngine = ENGINE,
+                        cache: ResponseCache | None = None):
+    """fetch_page(), but a failed fetch raises instead of returning ("", {}).
+
+    ("", {}) then means the page was fetched and had nothing to offer. The
+    body is parsed as it streams in and the connection is dropped as soon
+    as nothing more is needed. With a cache, the request is conditional
+    and a 304 re-parses the stored bytes.
+    """
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+
+    for conditional in (True, False):
+        headers = cache.conditional_headers(url) if cache and conditional else {}
+        try:
+            with engine.open(url, headers=headers) as resp:
+                # Only process HTML responses
+                content_type = resp.headers.get("Content-Type", "")
+                if "html" not in content_type.lower():
+                    return "", {}
+                parser, raw = parse_stream(_read_chunks(resp), content_type)
+                if cache:
+                    cache.put(url, resp.geturl(), raw, resp.headers)
+            break
+        except urllib.error.HTTPError as e:
+            cached = cache.get(url) if cache and e.code == 304 else None
+            if cached is not None:
+                _, content_type, raw = cached
+                parser = parse_stream([raw], content_type)[0]
+                break
+            if e.code != 304 or not headers:
+                raise
+            # 304 but the cached body is gone (get() dropped the entry): ask again
+
+    # Structured data is a bonus: malformed markup must not cost the description
     try:
-        parser.feed(html)
-    except Exception:
-        pass
+        structured = parser.structured()
+    except Exception as e:
+        print(f"Warning: could not read structured data from {url}: {e!r}", file=sys.stderr)
+        structured = {}
+    return parser.best_description(), structured
+
 
-    return parser.best_description()
+# -- structured candidates -----------------------------------------------------
+
+CANDIDATE_COLUMNS = ["program_id", "registration_url"] + CANDIDATE_FIELDS + ["fills_blank"]
+
+
+def candidate_row(program: Program, structured: dict) -> dict:
+    """One review row; fills_blank lists the fields that are blank in programs.csv."""
+    out = {"program_id": program.program_id,
+           "registration_url": program.registration_url}
+    out.update({f: structured.get(f, "") for f in CANDIDATE_FIELDS})
+    out["fills_blank"] = " ".join(
+        f for f in CANDIDATE_FIELDS
+        if structured.get(f) and not program.get(f)
+    )
+    return out
+
+
+def load_candidates() -> dict:
+    """Existing review rows keyed by program_id, so earlier runs are kept."""
+    if not CANDIDATES_PATH.exists():
+        return {}
+    return {r["program_id"]: r for r in read_csv(CANDIDATES_PATH)[1] if r.get("program_id")}
 
 
 # -- main --------------------------------------------------------------------
@@ -160,74 +436,92 @@ def main():
     # Load org name lookup for display only
     org_names = {}
     if ORGS_PATH.exists():
-        with ORGS_PATH.open("r", encoding="utf-8", newline="") as f:
-            for r in csv.DictReader(f):
-                oid = (r.get("org_id") or "").strip()
-                if oid:
-                    org_names[oid] = (r.get("org_name") or "").strip()
-
-    with PROGRAMS_PATH.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+        org_names = {org.org_id: org.org_name for org in load_orgs(ORGS_PATH)[1] if org.org_id}
+
+    fieldnames, rows = load_programs(PROGRAMS_PATH)
+
+    # Replay results from an interrupted run before deciding what to fetch
+    journal = Journal("fetch_descriptions")
+    done = journal.replay()
+    resumed = 0
+    candidates = load_candidates()
+    for r in rows:
+        pid = r.program_id
+        values = done.get(pid)
+        if values and values.get("description") and not r.description:
+            r.description = values["description"]
+            resumed += 1
+        if values and values.get("structured"):
+            candidates[pid] = candidate_row(r, values["structured"])
 
     # Identify rows that need a description
     targets = [
         i for i, r in enumerate(rows)
-        if not (r.get("description") or "").strip()
-        and (r.get("registration_url") or "").strip()
+        if not r.description and r.registration_url and r.program_id not in done
     ]
 
-    already_have_desc = sum(
-        1 for r in rows if (r.get("description") or "").strip()
-    )
+    already_have_desc = sum(1 for r in rows if r.description)
 
     print(f"Rows total:          {len(rows)}")
     print(f"Already have desc:   {already_have_desc}")
+    if done:
+        print(f"Resumed from journal: {len(done)} ({resumed} descriptions)")
     print(f"Will attempt to fetch: {len(targets)}")
     print()
 
-    updated = 0
+    updated = resumed
     failed = 0
 
-    for n, idx in enumerate(targets, 1):
-        row = rows[idx]
-        url = (row.get("registration_url") or "").strip().split()[0]
-        org = org_names.get((row.get("org_id") or "").strip(), (row.get("program_name") or ""))
-
-        prefix = f"[{n}/{len(targets)}] {org[:50]:<50}  {url[:60]}"
-        print(prefix, end="  ", flush=True)
-
-        desc = fetch_description(url)
-        time.sleep(REQUEST_DELAY)
+    def target_url(idx):
+        return rows[idx].registration_url.split()[0]
 
-        if desc:
-            rows[idx]["description"] = desc
-            updated += 1
-            print(f"ok ({len(desc)} chars)")
-        else:
-            failed += 1
-            print("no description found")
-
-        # Save progress every 25 rows so a Ctrl-C doesn't lose everything
-        if n % 25 == 0:
-            _write_csv(PROGRAMS_PATH, fieldnames, rows)
-            print(f"  -- progress saved ({updated} updated so far) --")
-
-    # Final save
-    _write_csv(PROGRAMS_PATH, fieldnames, rows)
+    # Each result is journaled as it arrives, so a Ctrl-C loses nothing;
+    # the CSV itself is written once at the end. Failed fetches raise and
+    # are not journaled, so a resumed run retries them.
+    cache = ResponseCache()
+    results = ENGINE.run(
+        lambda idx: fetch_page_or_raise(target_url(idx), cache=cache), targets
+    )
+    try:
+        with journal:
+            for n, (idx, result, error) in enumerate(results, 1):
+                desc, structured = result or ("", {})
+                row = rows[idx]
+                url = target_url(idx)
+                org = org_names.get(row.org_id, row.program_name)
+
+                prefix = f"[{n}/{len(targets)}] {org[:50]:<50}  {url[:60]}"
+
+                pid = row.program_id
+                if pid and error is None:
+                    journal.append(pid, {"description": desc, "structured": structured})
+                if pid and structured:
+                    candidates[pid] = candidate_row(row, structured)
+
+                extra = f"  +{len(structured)} structured" if structured else ""
+                if desc:
+                    row.description = desc
+                    updated += 1
+                    print(f"{prefix}  ok ({len(desc)} chars){extra}")
+                else:
+                    failed += 1
+                    reason = f"error: {error}" if error else "no description found"
+                    print(f"{prefix}  {reason}{extra}")
+
+    finally:
+        cache.save()
+
+    write_records(PROGRAMS_PATH, fieldnames, rows)
+    if candidates:
+        write_csv_atomic(CANDIDATES_PATH, CANDIDATE_COLUMNS, candidates.values())
+    journal.discard()
 
     print()
     print(f"Done.  Updated: {updated}  |  No description found: {failed}")
+    if candidates:
+        print(f"Structured data candidates for review: {len(candidates)} rows -> {CANDIDATES_PATH}")
     print("Next step: python scripts/build_data_js.py")
 
 
-def _write_csv(path: Path, fieldnames, rows):
-    with path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,218 @@
+"""
+Shared concurrent fetch engine for the network enrichment scripts.
+
+Used by enrich_locations.py and fetch_descriptions.py. Requests run on a
+thread pool, but every request first passes two politeness gates:
+
+  - a global token bucket (requests per second across all hosts), and
+  - a per-host concurrency cap plus an optional minimum gap between
+    requests to the same host.
+
+A slow or dead host therefore only ties up its own slots instead of
+stalling the whole run for TIMEOUT seconds per row. Transient failures
+are retried with backoff and each host has a circuit breaker; see
+scripts/retry_policy.py.
+
+Not meant to be run directly. See scripts/fake_server.py for a local
+stand-in server that simulates latency and errors.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from retry_policy import CircuitBreaker, RetryPolicy, is_host_failure
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _HostGate:
+    """Concurrency cap and minimum request spacing for one host."""
+
+    def __init__(self, max_concurrent: int, min_interval: float) -> None:
+        self.slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self.min_interval = min_interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def wait_turn(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._last + self.min_interval)
+            self._last = start
+        if start > now:
+            time.sleep(start - now)
+
+
+class _RedirectRecorder(urllib.request.HTTPRedirectHandler):
+    """Keeps HEAD as HEAD across redirects and records each (code, url) hop."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        new = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if new is not None:
+            if req.get_method() == "HEAD":
+                new.method = "HEAD"
+            new.redirects = getattr(req, "redirects", [])
+            new.redirects.append((code, newurl))
+        return new
+
+
+def host_of(url: str) -> str:
+    return (urllib.parse.urlsplit(url).hostname or "").lower()
+
+
+class FetchEngine:
+    """Thread-pool fetcher with a global rate limit and per-host caps."""
+
+    def __init__(
+        self,
+        user_agent: str,
+        rate: float = 4.0,
+        burst: float = 4.0,
+        workers: int = 8,
+        per_host: int = 2,
+        host_interval: float = 0.0,
+        timeout: float = 15.0,
+        retry: RetryPolicy | None = None,
+        breaker_threshold: int = 3,
+        breaker_reset: float = 300.0,
+    ) -> None:
+        self.user_agent = user_agent
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = max(1, workers)
+        self.per_host = per_host
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._opener = urllib.request.build_opener(_RedirectRecorder)
+        self._gates: dict[str, _HostGate] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._gates_lock = threading.Lock()
+
+    def _gate(self, host: str) -> _HostGate:
+        with self._gates_lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                gate = _HostGate(self.per_host, self.host_interval)
+                self._gates[host] = gate
+            return gate
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._gates_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+                self._breakers[host] = breaker
+            return breaker
+
+    @contextmanager
+    def open(self, url: str, headers: dict | None = None, method: str = "GET"):
+        """Open `url` once both politeness gates allow it; yields the response.
+
+        The host slot is held until the caller finishes reading the body.
+        The response also carries `redirects` (list of (code, url) hops) and
+        `elapsed` (seconds from sending the request to receiving headers).
+        Transient errors are retried per the RetryPolicy (the slot is
+        released while backing off); the last error propagates unchanged
+        and counts as one failure for the host's breaker (an HTTP 5xx
+        only once per URL). An open circuit raises CircuitOpenError
+        without touching the network.
+        """
+        all_headers = {"User-Agent": self.user_agent}
+        all_headers.update(headers or {})
+        request = urllib.request.Request(url, headers=all_headers, method=method)
+
+        host = host_of(url)
+        gate = self._gate(host)
+        breaker = self.breaker(host)
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempt == 1:
+                breaker.before_request(host)
+            with gate.slots:
+                gate.wait_turn()
+                self.bucket.acquire()
+                request.redirects = []
+                started = time.monotonic()
+                try:
+                    response = self._opener.open(request, timeout=self.timeout)
+                except Exception as e:
+                    error = e
+                else:
+                    breaker.record_success()
+                    response.redirects = request.redirects
+                    response.elapsed = time.monotonic() - started
+                    with response:
+                        yield response
+                    return
+
+            wait = self.retry.delay(attempt, error)
+            if wait is None or breaker.is_open:
+                if not is_host_failure(error):
+                    breaker.record_success()  # the host answered, just not with 2xx
+                elif isinstance(error, urllib.error.HTTPError):
+                    breaker.record_failure(url)  # may be this page, not the host
+                else:
+                    breaker.record_failure()
+                raise error
+            time.sleep(wait)
+
+    def run(self, fn, items):
+        """Call fn(item) for every item on the pool.
+
+        Yields (item, result, error) tuples in completion order; exactly one
+        of result/error is meaningful. Exceptions never escape the pool.
+        If the caller stops early (Ctrl-C, or closing the generator), items
+        not yet started are cancelled; only those in flight are waited for.
+        """
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            try:
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,343 @@
+"""File change watchers for dev_server.py.
+
+InotifyWatcher uses Linux inotify through ctypes: the thread sleeps in
+select() until the kernel reports a change, so an idle server does no
+disk work at all. PollingWatcher is the fallback everywhere else (and when
+inotify runs out of watches): it caches each directory's mtime and the
+watched files inside it, re-lists only directories whose mtime moved, and
+stats only files with a watched extension.
+
+Both collect changes until `debounce` seconds pass without a new one, then
+call on_change(paths) once with the set of changed paths (relative to the
+root, "/"-separated), so an editor's burst of writes or a build rewriting
+several files triggers a single reload.
+
+    watcher = make_watcher(root, on_change, extensions={".html", ".js"})
+    watcher.start()
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv"}
+DEFAULT_DEBOUNCE_SECONDS = 0.2
+DEFAULT_POLL_INTERVAL_SECONDS = 1.0
+IDLE_WAKEUP_SECONDS = 1.0  # how often an idle thread checks for stop()
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# CLOSE_WRITE rather than MODIFY: report a file once it has been fully
+# written, not on every write() while a large file is being saved.
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+READ_SIZE = 64 * 1024
+
+
+class FileWatcher:
+    """Base class: debouncing loop around a subclass's _wait()."""
+
+    def __init__(
+        self,
+        root: Path,
+        on_change: Callable[[set], None],
+        extensions: Iterable[str],
+        skip_dirs: Iterable[str] = SKIP_DIRS,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    ) -> None:
+        self.root = Path(root)
+        self.on_change = on_change
+        self.extensions = {ext.lower() for ext in extensions}
+        self.skip_dirs = set(skip_dirs)
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "FileWatcher":
+        self._thread = threading.Thread(
+            target=self._run, name=type(self).__name__, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.close()
+
+    def close(self) -> None:
+        """Release OS resources (subclasses)."""
+
+    def wanted(self, rel_path: str) -> bool:
+        parts = rel_path.split("/")
+        if any(part in self.skip_dirs for part in parts[:-1]):
+            return False
+        return os.path.splitext(parts[-1])[1].lower() in self.extensions
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _wait(self, timeout: float) -> set:
+        """Block for up to `timeout` seconds; return changed relative paths."""
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        pending: set = set()
+        deadline = None
+        while not self._stop.is_set():
+            timeout = IDLE_WAKEUP_SECONDS
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+            changed = self._wait(timeout)
+            if changed:
+                pending |= changed
+                deadline = time.monotonic() + self.debounce
+            elif deadline is not None and time.monotonic() >= deadline:
+                batch, pending, deadline = pending, set(), None
+                try:
+                    self.on_change(batch)
+                except Exception as e:  # keep watching after a bad callback
+                    print(f"[watch] on_change failed: {e}", file=sys.stderr)
+
+
+# -- inotify -------------------------------------------------------------------
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyWatcher(FileWatcher):
+    """One inotify watch per directory under root; new directories are added live."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: dict[int, str] = {}  # watch descriptor -> absolute dir
+        try:
+            self._add_tree(str(self.root))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_watch(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return  # vanished before we got to it
+            raise OSError(err, f"inotify_add_watch({path}): {os.strerror(err)}")
+        self._dirs[wd] = path
+
+    def _add_tree(self, top: str) -> set:
+        """Watch `top` and its subdirectories; return the wanted files found."""
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in self.skip_dirs]
+            self._add_watch(dirpath)
+            for name in filenames:
+                rel = self.relative(os.path.join(dirpath, name))
+                if self.wanted(rel):
+                    found.add(rel)
+        return found
+
+    def _wait(self, timeout: float) -> set:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add("")  # events were lost; report an unnamed change
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if name in self.skip_dirs:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land in a new directory before its watch exists
+                    try:
+                        changed |= self._add_tree(path)
+                    except OSError as e:
+                        print(f"[watch] {e}", file=sys.stderr)
+                continue
+            rel = self.relative(path)
+            if self.wanted(rel):
+                changed.add(rel)
+        return changed
+
+
+# -- polling fallback ----------------------------------------------------------
+
+
+class PollingWatcher(FileWatcher):
+    """Stat directories each interval; re-list only the ones that changed."""
+
+    def __init__(self, *args, interval: float = DEFAULT_POLL_INTERVAL_SECONDS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+        self._dir_mtimes: dict[str, int] = {}     # dir -> st_mtime_ns
+        self._subdirs: dict[str, list] = {}       # dir -> child dirs
+        self._files: dict[str, dict] = {}         # dir -> {wanted file: (mtime_ns, size)}
+        self._list_dir(str(self.root))
+
+    def _list_dir(self, path: str) -> set:
+        """(Re)scan one directory; return wanted files that appeared or vanished."""
+        try:
+            st = os.stat(path)
+            entries = list(os.scandir(path))
+        except OSError:
+            return self._forget(path)
+        self._dir_mtimes[path] = st.st_mtime_ns
+        old_files = self._files.get(path, {})
+        files, subdirs, changed = {}, [], set()
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.skip_dirs:
+                        subdirs.append(entry.path)
+                    continue
+                rel = self.relative(entry.path)
+                if not self.wanted(rel):
+                    continue
+                est = entry.stat()
+            except OSError:
+                continue
+            files[entry.path] = (est.st_mtime_ns, est.st_size)
+            if old_files.get(entry.path) != files[entry.path]:
+                changed.add(rel)
+        changed |= {self.relative(p) for p in old_files.keys() - files.keys()}
+        self._files[path] = files
+        for sub in set(self._subdirs.get(path, [])) - set(subdirs):
+            changed |= self._forget(sub)
+        self._subdirs[path] = subdirs
+        for sub in subdirs:
+            if sub not in self._dir_mtimes:
+                changed |= self._list_dir(sub)
+        return changed
+
+    def _forget(self, path: str) -> set:
+        gone = {self.relative(p) for p in self._files.pop(path, {})}
+        self._dir_mtimes.pop(path, None)
+        for sub in self._subdirs.pop(path, []):
+            gone |= self._forget(sub)
+        return gone
+
+    def scan(self) -> set:
+        changed = set()
+        for path in list(self._dir_mtimes):
+            if path not in self._dir_mtimes:
+                continue  # removed while handling a parent
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                changed |= self._forget(path)
+                continue
+            if mtime != self._dir_mtimes[path]:
+                changed |= self._list_dir(path)
+                continue
+            # Same listing: only in-place edits are possible, so stat the
+            # known watched files and nothing else.
+            files = self._files[path]
+            for file_path, sig in files.items():
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    changed.add(self.relative(file_path))
+                    continue
+                if (st.st_mtime_ns, st.st_size) != sig:
+                    files[file_path] = (st.st_mtime_ns, st.st_size)
+                    changed.add(self.relative(file_path))
+        return changed
+
+    def _wait(self, timeout: float) -> set:
+        if self._stop.wait(min(timeout, self.interval)):
+            return set()
+        return self.scan()
+
+
+def make_watcher(
+    root: Path,
+    on_change: Callable[[set], None],
+    extensions: Iterable[str],
+    skip_dirs: Iterable[str] = SKIP_DIRS,
+    debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    force_poll: bool = False,
+) -> FileWatcher:
+    """InotifyWatcher where possible, else PollingWatcher."""
+    if not force_poll:
+        try:
+            return InotifyWatcher(root, on_change, extensions, skip_dirs, debounce)
+        except OSError as e:
+            print(f"[watch] inotify unavailable ({e}); polling every {poll_interval}s")
+    return PollingWatcher(
+        root, on_change, extensions, skip_dirs, debounce, interval=poll_interval
+    )
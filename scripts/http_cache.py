@@ -0,0 +1,191 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Used by fetch_descriptions.py so repeated crawls only re-download pages
+that actually changed. Entries are keyed by the final (post-redirect) URL
+and store:
+
+    body           gzip-compressed, one file per URL under data/.cache/http/
+                   (only the prefix the parser actually read)
+    etag           sent back as If-None-Match
+    last_modified  sent back as If-Modified-Since
+    fetched_at     when the body was last downloaded (ISO timestamp)
+
+The requested URL is remembered as an alias of the final URL, so the next
+run can revalidate before following the redirect again. Bodies are
+written to a temp file and renamed into place; an entry whose body can't
+be read is dropped by get(), and callers should then repeat the request
+without conditional headers rather than trust a 304. The cache is
+bounded by MAX_CACHE_BYTES of compressed bodies; the least recently used
+entries are evicted first.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+CACHE_DIR = Path("data/.cache/http")
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # compressed bodies on disk
+
+
+def _body_name(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest() + ".gz"
+
+
+class ResponseCache:
+    def __init__(self, directory: Path = CACHE_DIR,
+                 max_bytes: int = MAX_CACHE_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._aliases: dict[str, str] = {}
+        self._dirty = False
+        self._load_index()
+
+    # -- index ---------------------------------------------------------------
+
+    @property
+    def _index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    def _load_index(self) -> None:
+        try:
+            data = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        # Stored least- to most-recently used
+        for url, entry in data.get("entries", []):
+            if (self.directory / entry.get("file", "")).exists():
+                self._entries[url] = entry
+        self._aliases = {
+            k: v for k, v in data.get("aliases", {}).items() if v in self._entries
+        }
+
+    def save(self) -> None:
+        """Persist the index atomically. Bodies are already on disk."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(
+                {"entries": list(self._entries.items()), "aliases": self._aliases},
+                ensure_ascii=False,
+            )
+            self._dirty = False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_name, self._index_path)
+
+    # -- lookups -------------------------------------------------------------
+
+    def _resolve(self, url: str) -> str | None:
+        if url in self._entries:
+            return url
+        return self._aliases.get(url)
+
+    def conditional_headers(self, url: str) -> dict:
+        """Headers that let the server answer 304 if the cached copy is current."""
+        with self._lock:
+            key = self._resolve(url)
+            entry = self._entries.get(key) if key else None
+            if not entry:
+                return {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return headers
+
+    def get(self, url: str):
+        """Return (final_url, content_type, body) for a cached URL, or None."""
+        with self._lock:
+            key = self._resolve(url)
+            entry = self._entries.get(key) if key else None
+            if not entry:
+                return None
+            self._entries.move_to_end(key)
+            entry["revalidated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._dirty = True
+        try:
+            data = (self.directory / entry["file"]).read_bytes()
+            if len(data) != entry.get("size", len(data)):
+                raise EOFError("truncated body")  # a header-only gzip decompresses to b""
+            body = gzip.decompress(data)
+        except (OSError, EOFError, gzip.BadGzipFile):
+            self.discard(key)  # its validators would keep earning useless 304s
+            return None
+        return key, entry.get("content_type", ""), body
+
+    def discard(self, url: str) -> None:
+        """Forget a URL (and its aliases) so the next request is unconditional."""
+        with self._lock:
+            key = self._resolve(url)
+            entry = self._entries.pop(key, None) if key else None
+            if entry is None:
+                return
+            self._aliases = {k: v for k, v in self._aliases.items() if v != key}
+            self._dirty = True
+
+    # -- writes --------------------------------------------------------------
+
+    def put(self, url: str, final_url: str, body: bytes, headers) -> None:
+        """Store a freshly downloaded body plus its validators."""
+        compressed = gzip.compress(body, compresslevel=6)
+        name = _body_name(final_url)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Two URLs can share a final URL (and file): never leave a half-written body
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_name, self.directory / name)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        entry = {
+            "file": name,
+            "size": len(compressed),
+            "content_type": headers.get("Content-Type", ""),
+            "etag": headers.get("ETag", ""),
+            "last_modified": headers.get("Last-Modified", ""),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self._entries[final_url] = entry
+            self._entries.move_to_end(final_url)
+            if url != final_url:
+                self._aliases[url] = final_url
+            self._dirty = True
+            evicted = self._evict_locked()
+        for file_name in evicted:
+            try:
+                (self.directory / file_name).unlink()
+            except OSError:
+                pass
+
+    def _evict_locked(self) -> list:
+        total = sum(e.get("size", 0) for e in self._entries.values())
+        evicted = []
+        while total > self.max_bytes and len(self._entries) > 1:
+            url, entry = self._entries.popitem(last=False)
+            total -= entry.get("size", 0)
+            evicted.append(entry["file"])
+            self._aliases = {k: v for k, v in self._aliases.items() if v != url}
+        return evicted
@@ -6,13 +6,18 @@ Uses the canonical tag list from validate_data.py.
 
 Run from the project root:
     python scripts/infer_activities.py
+    python scripts/infer_activities.py --stream   # constant memory, row by row
 """
 
-import csv
+import argparse
 import re
 from pathlib import Path
 
+from column_table import ColumnTable
+from csv_io import rewrite_csv_streaming
+
 PROGRAMS_PATH = Path("data/programs.csv")
+COUNT_KEYS = ("filled", "existing", "no_tags")
 
 # Canonical tag -> keyword patterns (matched against description + program_name, case-insensitive)
 TAG_PATTERNS = {
@@ -140,43 +145,61 @@ def infer_tags(text: str) -> list:
     return found
 
 
+def fill_activities(row, counts: dict) -> None:
+    """Fill one row's blank activities from its name and description."""
+    if (row.get("activities") or "").strip():
+        counts["existing"] += 1
+        return
+
+    # Build text corpus from name + description
+    text = " ".join([
+        row.get("program_name") or "",
+        row.get("description") or "",
+    ])
+
+    tags = infer_tags(text)
+
+    if tags:
+        row["activities"] = ", ".join(tags)
+        counts["filled"] += 1
+    else:
+        counts["no_tags"] += 1
+
+
+def transform(table: ColumnTable) -> dict:
+    """Fill blank activities values in place; return counts."""
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    for row in table:
+        fill_activities(row, counts)
+    return counts
+
+
+def transform_stream(path: Path):
+    """Rewrite `path` row by row in constant memory; return (counts, rows)."""
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    rows = rewrite_csv_streaming(path, lambda row: fill_activities(row, counts))
+    return counts, rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Infer activities tags in programs.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="rewrite row by row in constant memory instead of loading the file")
+    return parser.parse_args()
+
+
 def main():
-    with PROGRAMS_PATH.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-
-    filled = 0
-    skipped_existing = 0
-    skipped_no_text = 0
-
-    for row in rows:
-        if (row.get("activities") or "").strip():
-            skipped_existing += 1
-            continue
-
-        # Build text corpus from name + description
-        text = " ".join([
-            row.get("program_name", ""),
-            row.get("description", ""),
-        ])
-
-        tags = infer_tags(text)
-
-        if tags:
-            row["activities"] = ", ".join(tags)
-            filled += 1
-        else:
-            skipped_no_text += 1
-
-    print(f"activities inferred:   {filled}")
-    print(f"already had activities: {skipped_existing}")
-    print(f"no tags found:          {skipped_no_text}")
-
-    with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    args = parse_args()
+    if args.stream:
+        counts, _ = transform_stream(PROGRAMS_PATH)
+    else:
+        table = ColumnTable.read(PROGRAMS_PATH)
+        counts = transform(table)
+        table.write(PROGRAMS_PATH)
+
+    print(f"activities inferred:   {counts['filled']}")
+    print(f"already had activities: {counts['existing']}")
+    print(f"no tags found:          {counts['no_tags']}")
 
     print("Next step: python scripts/build_data_js.py")
 
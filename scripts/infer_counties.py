@@ -14,11 +14,12 @@ IMPORTANT: site_city values must match town names in the GeoJSON exactly.
 See data/Vermont_Town_GEOID_RPC_County.geojson for the canonical list.
 """
 
-import csv
 import json
 from pathlib import Path
 from collections import Counter
 
+from column_table import ColumnTable
+
 PROGRAMS_PATH = Path("data/programs.csv")
 ORGS_PATH = Path("data/organizations.csv")
 GEOJSON_PATH = Path("data/Vermont_Town_GEOID_RPC_County.geojson")
@@ -49,84 +50,83 @@ def load_town_county_map():
     return mapping
 
 
-def main():
-    town_county = load_town_county_map()
-
-    # Load orgs
-    with ORGS_PATH.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        o_fieldnames = reader.fieldnames
-        o_rows = list(reader)
-    org_by_id = {r["org_id"]: r for r in o_rows}
-
-    # Load programs
-    with PROGRAMS_PATH.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        p_fieldnames = reader.fieldnames
-        p_rows = list(reader)
-
-    city_filled = 0
-    county_filled = 0
+def transform(programs: ColumnTable, orgs: ColumnTable, town_county=None) -> dict:
+    """Fill program city/county and org city/county in place; return counts."""
+    if town_county is None:
+        town_county = load_town_county_map()
+    org_city = {r["org_id"]: (r.get("city") or "").strip() for r in orgs}
+
+    counts = {"city_filled": 0, "county_filled": 0,
+              "org_city_filled": 0, "org_county_filled": 0}
     city_no_match = set()
 
-    for row in p_rows:
+    # Every lookup runs once per distinct value (dictionary code), not per row
+    org_ids = programs.column("org_id")
+    cities = programs.column("site_city")
+    counties = programs.column("site_county")
+    city_of_org = org_ids.memo(lambda oid: org_city.get(oid, ""))
+    city_name = cities.memo(str.strip)
+    county_name = counties.memo(str.strip)
+    county_of_city = cities.memo(lambda city: town_county.get(city.strip()))
+
+    for i in range(len(programs)):
         # Step 2: fill blank site_city from org city
-        if not row["site_city"].strip():
-            org = org_by_id.get(row["org_id"])
-            if org and org.get("city", "").strip():
-                row["site_city"] = org["city"].strip()
-                city_filled += 1
+        if not city_name(cities.codes[i]):
+            city = city_of_org(org_ids.codes[i])
+            if city:
+                cities[i] = city
+                counts["city_filled"] += 1
 
         # Step 3: fill site_county from town→county map
-        city = row["site_city"].strip()
-        if city and not row["site_county"].strip():
-            county = town_county.get(city)
+        city_code = cities.codes[i]
+        if city_name(city_code) and not county_name(counties.codes[i]):
+            county = county_of_city(city_code)
             if county:
-                row["site_county"] = county
-                county_filled += 1
+                counties[i] = county
+                counts["county_filled"] += 1
             else:
-                city_no_match.add(city)
-
-    print(f"site_city filled from org:   {city_filled}")
-    print(f"site_county filled from map: {county_filled}")
-    if city_no_match:
-        print(f"Cities with no county match: {sorted(city_no_match)}")
-
-    with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=p_fieldnames)
-        writer.writeheader()
-        writer.writerows(p_rows)
+                city_no_match.add(city_name(city_code))
 
     # Step 4: backfill org city/county from their programs
     org_cities = {}
     org_counties = {}
-    for row in p_rows:
-        oid = row["org_id"]
-        city = row["site_city"].strip()
-        county = row["site_county"].strip()
+    for i in range(len(programs)):
+        oid = org_ids[i]
+        city = city_name(cities.codes[i])
+        county = county_name(counties.codes[i])
         if city:
             org_cities.setdefault(oid, Counter())[city] += 1
         if county:
             org_counties.setdefault(oid, Counter())[county] += 1
 
-    org_city_filled = 0
-    org_county_filled = 0
-    for row in o_rows:
+    for row in orgs:
         oid = row["org_id"]
         if not row["city"].strip() and oid in org_cities:
             row["city"] = org_cities[oid].most_common(1)[0][0]
-            org_city_filled += 1
+            counts["org_city_filled"] += 1
         if not row["county"].strip() and oid in org_counties:
             row["county"] = org_counties[oid].most_common(1)[0][0]
-            org_county_filled += 1
+            counts["org_county_filled"] += 1
+
+    counts["city_no_match"] = sorted(city_no_match)
+    return counts
+
+
+def main():
+    orgs = ColumnTable.read(ORGS_PATH)
+    programs = ColumnTable.read(PROGRAMS_PATH)
+
+    counts = transform(programs, orgs)
 
-    print(f"Org city filled from programs:   {org_city_filled}")
-    print(f"Org county filled from programs: {org_county_filled}")
+    print(f"site_city filled from org:   {counts['city_filled']}")
+    print(f"site_county filled from map: {counts['county_filled']}")
+    if counts["city_no_match"]:
+        print(f"Cities with no county match: {counts['city_no_match']}")
+    programs.write(PROGRAMS_PATH)
 
-    with ORGS_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=o_fieldnames)
-        writer.writeheader()
-        writer.writerows(o_rows)
+    print(f"Org city filled from programs:   {counts['org_city_filled']}")
+    print(f"Org county filled from programs: {counts['org_county_filled']}")
+    orgs.write(ORGS_PATH)
 
     print("Next step: python scripts/build_data_js.py")
 
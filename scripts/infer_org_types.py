@@ -8,10 +8,12 @@ Run from the project root:
     python scripts/infer_org_types.py
 """
 
-import csv
 import re
+from collections import Counter
 from pathlib import Path
 
+from column_table import ColumnTable
+
 ORGS_PATH = Path("data/organizations.csv")
 
 RULES = [
@@ -56,36 +58,33 @@ def infer_type(org_name: str) -> str:
     return "private"
 
 
-def main():
-    with ORGS_PATH.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-
-    filled = 0
-    skipped = 0
+def transform(table: ColumnTable) -> dict:
+    """Fill blank org_type values in place; return counts."""
+    counts = {"filled": 0, "existing": 0}
 
-    for row in rows:
+    for row in table:
         if row.get("org_type", "").strip():
-            skipped += 1
+            counts["existing"] += 1
             continue
-        inferred = infer_type(row["org_name"])
-        row["org_type"] = inferred
-        filled += 1
+        row["org_type"] = infer_type(row["org_name"])
+        counts["filled"] += 1
+
+    return counts
+
+
+def main():
+    table = ColumnTable.read(ORGS_PATH)
+    counts = transform(table)
 
-    print(f"org_type inferred: {filled}")
-    print(f"org_type already set (skipped): {skipped}")
+    print(f"org_type inferred: {counts['filled']}")
+    print(f"org_type already set (skipped): {counts['existing']}")
 
     # Show distribution
-    from collections import Counter
-    dist = Counter(r["org_type"] for r in rows)
+    dist = Counter(table.column("org_type"))
     for k, v in sorted(dist.items(), key=lambda x: -x[1]):
         print(f"  {k}: {v}")
 
-    with ORGS_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    table.write(ORGS_PATH)
 
     print("Next step: python scripts/build_data_js.py")
 
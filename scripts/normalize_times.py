@@ -1,10 +1,20 @@
-import csv
+import argparse
 import re
+from functools import lru_cache
 from pathlib import Path
 
+from column_table import ColumnTable
+from csv_io import rewrite_csv_streaming
+
 PROGRAMS_PATH = Path("data/programs.csv")
 
+STREAM_CACHE_SIZE = 1024
+
 TIME_RE = re.compile(r"^\s*(\d{1,3})\s*:\s*(\d{2})\s*([AaPp][Mm])?\s*$")
+CLOCK_RE = re.compile(r"^(\d{1,2}):(\d{2}) ([AP]M)$")
+# "7:30 AM - 5:30 PM", "7am-6pm", "7:30 a.m. to 5 p.m." in pre_after_care
+CARE_TIME = r"(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?\s*[Mm]\.?"
+CARE_RANGE_RE = re.compile(CARE_TIME + r"\s*(?:-|–|to)\s*" + CARE_TIME)
 
 
 def coerce_hour(hour: int) -> int:
@@ -128,37 +138,111 @@ def normalize_end_time(value: str):
     return raw
 
 
+# -- minutes since midnight ----------------------------------------------------
+
+
+def to_minutes(value: str):
+    """Minutes since midnight for a normalized "HH:MM AM" string, else None."""
+    m = CLOCK_RE.match((value or "").strip())
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2))
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    return (hour % 12 + (12 if m.group(3) == "PM" else 0)) * 60 + minute
+
+
+def start_minutes(value: str):
+    return to_minutes(normalize_start_time(value))
+
+
+def end_minutes(value: str):
+    return to_minutes(normalize_end_time(value))
+
+
+def care_window(value: str):
+    """(start, end) minutes for a pre_after_care value holding a time range.
+
+    Plain "Yes" means care exists but its hours are unknown; returns None.
+    """
+    m = CARE_RANGE_RE.search(value or "")
+    if not m:
+        return None
+    bounds = []
+    for hour, minute, meridiem in (m.group(1, 2, 3), m.group(4, 5, 6)):
+        hour, minute = int(hour), int(minute or 0)
+        if not 1 <= hour <= 12 or minute > 59:
+            return None
+        bounds.append((hour % 12 + (12 if meridiem.upper() == "P" else 0)) * 60 + minute)
+    start, end = bounds
+    return (start, end) if start < end else None
+
+
+def covered_window(start_time: str, end_time: str, pre_after_care: str):
+    """(start, end) minutes a family can rely on, widened by known care hours."""
+    start, end = start_minutes(start_time), end_minutes(end_time)
+    if start is None or end is None:
+        return None
+    care = care_window(pre_after_care)
+    if care:
+        start, end = min(start, care[0]), max(end, care[1])
+    return start, end
+
+
+# -- transform -----------------------------------------------------------------
+
+
+def transform(table: ColumnTable) -> dict:
+    """Normalize start_time/end_time in place; return change counts.
+
+    Each distinct time string is normalized once.
+    """
+    return {
+        "start_time": table.map("start_time", normalize_start_time),
+        "end_time": table.map("end_time", normalize_end_time),
+    }
+
+
+def transform_stream(path: Path):
+    """Rewrite `path` row by row in constant memory; return (counts, rows)."""
+    fixers = {
+        "start_time": lru_cache(maxsize=STREAM_CACHE_SIZE)(normalize_start_time),
+        "end_time": lru_cache(maxsize=STREAM_CACHE_SIZE)(normalize_end_time),
+    }
+    counts = dict.fromkeys(fixers, 0)
+
+    def fix(row):
+        for column, normalize in fixers.items():
+            old = row.get(column) or ""
+            new = normalize(old)
+            if new != old:
+                row[column] = new
+                counts[column] += 1
+
+    rows = rewrite_csv_streaming(path, fix)
+    return counts, rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Normalize start_time/end_time in programs.csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="rewrite row by row in constant memory instead of loading the file")
+    return parser.parse_args()
+
+
 def main():
-    with PROGRAMS_PATH.open("r", encoding="utf-8-sig", newline="") as file:
-        reader = csv.DictReader(file)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-
-    start_changed = 0
-    end_changed = 0
-
-    for row in rows:
-        old_start = (row.get("start_time") or "")
-        old_end = (row.get("end_time") or "")
-
-        new_start = normalize_start_time(old_start)
-        new_end = normalize_end_time(old_end)
-
-        if new_start != old_start:
-            row["start_time"] = new_start
-            start_changed += 1
-        if new_end != old_end:
-            row["end_time"] = new_end
-            end_changed += 1
-
-    with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-    print("start_time updated:", start_changed)
-    print("end_time updated:", end_changed)
-    print("Rows processed:", len(rows))
+    args = parse_args()
+    if args.stream:
+        counts, rows = transform_stream(PROGRAMS_PATH)
+    else:
+        table = ColumnTable.read(PROGRAMS_PATH)
+        counts = transform(table)
+        table.write(PROGRAMS_PATH)
+        rows = len(table)
+
+    print("start_time updated:", counts["start_time"])
+    print("end_time updated:", counts["end_time"])
+    print("Rows processed:", rows)
     print("Next step: python scripts/build_data_js.py")
 
 
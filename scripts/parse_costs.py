@@ -5,117 +5,100 @@ Fills blank cost_per_week fields only — never overwrites existing non-zero val
 Many camp costs are variable or ambiguous; this script makes a best-effort parse.
 Manual review of the output is expected.
 
-Parsing rules:
-  - "free" / "no cost" / "no charge" -> 0
-  - "$X/week" or "$X per week"        -> X
-  - "$X/day" or "$X per day"          -> X * 5  (assumes 5-day week)
-  - "$X/session"                      -> X  (treated as per-week)
-  - "$X" bare dollar amount           -> X  (assumed weekly; flag for review)
-  - "$X-$Y" range                     -> midpoint
-  - "sliding scale" / "contact"       -> blank (leave for manual)
+The parsing rules live in scripts/cost_model.py, shared with
+build_data_js.py. Day and month rates, per-session prices and bare dollar
+amounts are converted to a weekly figure and flagged for review.
 
 Run from the project root:
     python scripts/parse_costs.py
+    python scripts/parse_costs.py --stream   # constant memory, row by row
 """
 
-import csv
-import re
+import argparse
+from functools import lru_cache
 from pathlib import Path
 
+from column_table import ColumnTable
+from cost_model import parse_cost_text
+from csv_io import rewrite_csv_streaming
+
 PROGRAMS_PATH = Path("data/programs.csv")
+STREAM_CACHE_SIZE = 1024
+COUNT_KEYS = ("filled", "flagged", "existing", "no_parse")
 
 
 def parse_cost(raw: str):
     """Return (cost_per_week: float|None, needs_review: bool)."""
-    text = (raw or "").strip().lower()
-    if not text:
+    cost = parse_cost_text(raw or "")
+    if cost is None:
         return None, False
+    return cost.weekly_cents / 100, cost.needs_review
 
-    # Explicit free
-    if re.search(r"\bfree\b|\bno cost\b|\bno charge\b|\$0\b", text):
-        return 0.0, False
 
-    # Ambiguous / contact-required
-    if re.search(r"sliding scale|contact|call us|see website|varies|variable|tbd|n/a|upon request", text):
-        return None, False
+def fill_cost(row, counts: dict, parse=parse_cost) -> None:
+    """Fill one row's blank cost_per_week from cost_raw, updating counts."""
+    existing = (row.get("cost_per_week") or "").strip()
+    # Skip if already has a non-blank value (including "0" for free programs)
+    if existing != "":
+        counts["existing"] += 1
+        return
 
-    # Extract all dollar amounts in order
-    amounts = [float(m.replace(",", "")) for m in re.findall(r"\$?(\d[\d,]*(?:\.\d+)?)", text)]
-    if not amounts:
-        return None, False
+    cost, needs_review = parse(row.get("cost_raw") or "")
 
-    # Per-day pricing
-    if re.search(r"/\s*day\b|per\s+day", text):
-        # Use first (lowest) amount, multiply by 5
-        cost = min(amounts) * 5
-        return round(cost, 2), True  # flag: daily rate conversion is approximate
+    if cost is None:
+        counts["no_parse"] += 1
+        return
 
-    # Per-hour pricing — skip, too ambiguous
-    if re.search(r"/\s*hour|per\s+hour", text):
-        return None, False
+    row["cost_per_week"] = str(int(cost)) if cost == int(cost) else str(cost)
+    counts["filled"] += 1
+    if needs_review:
+        counts["flagged"] += 1
+        existing_notes = (row.get("cost_notes") or "").strip()
+        review_note = "cost_per_week auto-parsed — verify"
+        if existing_notes:
+            row["cost_notes"] = f"{existing_notes}; {review_note}"
+        else:
+            row["cost_notes"] = review_note
+
+
+def transform(table: ColumnTable) -> dict:
+    """Fill blank cost_per_week values in place; return counts."""
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    # cost_raw strings repeat across sessions; parse each distinct one once
+    parsed = {raw: parse_cost(raw) for raw in table.column("cost_raw").distinct()}
+    for row in table:
+        fill_cost(row, counts, parse=parsed.__getitem__)
+    return counts
 
-    # Per-week / per-session / general
-    if re.search(r"/\s*week|per\s+week|weekly", text):
-        cost = min(amounts)  # use lower bound of any range
-        return round(cost, 2), False
 
-    if re.search(r"/\s*session|per\s+session", text):
-        cost = min(amounts)
-        return round(cost, 2), True
+def transform_stream(path: Path):
+    """Rewrite `path` row by row in constant memory; return (counts, rows)."""
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    parse = lru_cache(maxsize=STREAM_CACHE_SIZE)(parse_cost)
+    rows = rewrite_csv_streaming(path, lambda row: fill_cost(row, counts, parse=parse))
+    return counts, rows
 
-    # Bare dollar amount — assume weekly, flag for review
-    if amounts:
-        cost = min(amounts)
-        return round(cost, 2), True
 
-    return None, False
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fill cost_per_week from cost_raw")
+    parser.add_argument("--stream", action="store_true",
+                        help="rewrite row by row in constant memory instead of loading the file")
+    return parser.parse_args()
 
 
 def main():
-    with PROGRAMS_PATH.open(encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-
-    filled = 0
-    flagged = 0
-    skipped_existing = 0
-    skipped_no_parse = 0
-
-    for row in rows:
-        existing = (row.get("cost_per_week") or "").strip()
-        # Skip if already has a non-blank value (including "0" for free programs)
-        if existing != "":
-            skipped_existing += 1
-            continue
-
-        raw = (row.get("cost_raw") or "").strip()
-        cost, needs_review = parse_cost(raw)
-
-        if cost is None:
-            skipped_no_parse += 1
-            continue
-
-        row["cost_per_week"] = str(int(cost)) if cost == int(cost) else str(cost)
-        filled += 1
-        if needs_review:
-            flagged += 1
-            existing_notes = (row.get("cost_notes") or "").strip()
-            review_note = "cost_per_week auto-parsed — verify"
-            if existing_notes:
-                row["cost_notes"] = f"{existing_notes}; {review_note}"
-            else:
-                row["cost_notes"] = review_note
-
-    print(f"cost_per_week parsed:   {filled}")
-    print(f"  of which flagged for review: {flagged}")
-    print(f"already had value:       {skipped_existing}")
-    print(f"unparseable / ambiguous: {skipped_no_parse}")
-
-    with PROGRAMS_PATH.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    args = parse_args()
+    if args.stream:
+        counts, _ = transform_stream(PROGRAMS_PATH)
+    else:
+        table = ColumnTable.read(PROGRAMS_PATH)
+        counts = transform(table)
+        table.write(PROGRAMS_PATH)
+
+    print(f"cost_per_week parsed:   {counts['filled']}")
+    print(f"  of which flagged for review: {counts['flagged']}")
+    print(f"already had value:       {counts['existing']}")
+    print(f"unparseable / ambiguous: {counts['no_parse']}")
 
     print("Next step: python scripts/build_data_js.py")
 
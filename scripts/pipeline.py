@@ -0,0 +1,230 @@
+"""
+Run the CSV transform scripts as one pipeline.
+
+normalize_times.py, parse_costs.py, infer_activities.py, infer_counties.py,
+infer_org_types.py and backfill_age_grade.py still work on their own, but
+each run parses and rewrites the whole CSV. This runner loads
+organizations.csv and programs.csv once, applies the selected stages to
+the rows in memory, and writes each file once at the end (and only if some
+stage actually changed it).
+
+Every stage declares the columns it reads and writes. A stage waits for
+any earlier stage (in STAGES order) that writes a column it uses, or uses
+a column it writes; stages with no overlap run concurrently.
+
+Both files are held as dictionary-encoded ColumnTables (column_table.py),
+so per-value transforms such as time normalization run once per distinct
+value. For each stage the runner records which rows it changed by
+comparing the codes of the stage's output columns before and after it ran.
+
+Run from the project root:
+    python scripts/pipeline.py                                  # every stage
+    python scripts/pipeline.py normalize_times parse_costs      # just these
+    python scripts/pipeline.py --dry-run                        # report only
+    python scripts/pipeline.py --list
+"""
+
+import argparse
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import backfill_age_grade
+import infer_activities
+import infer_counties
+import infer_org_types
+import normalize_times
+import parse_costs
+from column_table import ColumnTable
+
+TABLE_PATHS = {
+    "programs": Path("data/programs.csv"),
+    "orgs":     Path("data/organizations.csv"),
+}
+DEFAULT_WORKERS = 4
+
+
+class Stage:
+    """One in-memory transform. `run(tables)` mutates tables and returns counts."""
+
+    def __init__(self, name: str, run, reads, writes) -> None:
+        self.name = name
+        self.run = run
+        self.writes = set(writes)
+        self.uses = set(reads) | self.writes
+
+    @property
+    def tables(self) -> set:
+        return {column.split(".", 1)[0] for column in self.uses}
+
+    def must_follow(self, earlier: "Stage") -> bool:
+        return bool(earlier.writes & self.uses or self.writes & earlier.uses)
+
+
+STAGES = [
+    Stage(
+        "infer_org_types",
+        lambda t: infer_org_types.transform(t["orgs"]),
+        reads={"orgs.org_name"},
+        writes={"orgs.org_type"},
+    ),
+    Stage(
+        "normalize_times",
+        lambda t: normalize_times.transform(t["programs"]),
+        reads=set(),
+        writes={"programs.start_time", "programs.end_time"},
+    ),
+    Stage(
+        "parse_costs",
+        lambda t: parse_costs.transform(t["programs"]),
+        reads={"programs.cost_raw"},
+        writes={"programs.cost_per_week", "programs.cost_notes"},
+    ),
+    Stage(
+        "backfill_age_grade",
+        lambda t: backfill_age_grade.transform(t["programs"]),
+        reads=set(),
+        writes={"programs.age_min", "programs.age_max",
+                "programs.grades_min", "programs.grades_max"},
+    ),
+    Stage(
+        "infer_activities",
+        lambda t: infer_activities.transform(t["programs"]),
+        reads={"programs.program_name", "programs.description"},
+        writes={"programs.activities"},
+    ),
+    Stage(
+        "infer_counties",
+        lambda t: infer_counties.transform(t["programs"], t["orgs"]),
+        reads={"programs.org_id", "orgs.org_id"},
+        writes={"programs.site_city", "programs.site_county",
+                "orgs.city", "orgs.county"},
+    ),
+]
+
+
+def dependencies(stages) -> dict:
+    """Return {stage name: names of earlier selected stages it must wait for}."""
+    return {
+        stage.name: {e.name for e in stages[:i] if stage.must_follow(e)}
+        for i, stage in enumerate(stages)
+    }
+
+
+def _snapshot(stage: Stage, tables: dict) -> dict:
+    """Copy the codes of every column the stage writes: {table: [codes, ...]}."""
+    snapshot = {}
+    for column in sorted(stage.writes):
+        table, name = column.split(".", 1)
+        snapshot.setdefault(table, []).append(array("I", tables[table].column(name).codes))
+    return snapshot
+
+
+def run_stage(stage: Stage, tables: dict):
+    """Run one stage; return (counts, {table: changed row indexes}, seconds)."""
+    before = _snapshot(stage, tables)
+    started = time.perf_counter()
+    counts = stage.run(tables)
+    elapsed = time.perf_counter() - started
+    after = _snapshot(stage, tables)
+    changed = {}
+    for table in before:
+        rows = changed[table] = set()
+        for old, new in zip(before[table], after[table]):
+            rows.update(i for i, (a, b) in enumerate(zip(old, new)) if a != b)
+    return counts, changed, elapsed
+
+
+def run_pipeline(stages, tables: dict, workers: int = DEFAULT_WORKERS) -> dict:
+    """Run `stages` over `tables` ({name: ColumnTable}); return {stage name: result}."""
+    by_name = {stage.name: stage for stage in stages}
+    pending = dependencies(stages)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {}
+        while pending or running:
+            ready = [name for name, deps in pending.items() if deps <= results.keys()]
+            for name in ready:
+                del pending[name]
+                running[pool.submit(run_stage, by_name[name], tables)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def _format_counts(counts: dict) -> str:
+    return ", ".join(
+        f"{key}={len(value) if isinstance(value, list) else value}"
+        for key, value in counts.items()
+    )
+
+
+# -- main --------------------------------------------------------------------
+
+
+def parse_args():
+    names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Run CSV transform stages in one pass")
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"stages to run (default: all). One of: {', '.join(names)}")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="run the stages and report changes without writing")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"stages to run at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--list", action="store_true", help="list stages and exit")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.list:
+        deps = dependencies(STAGES)
+        for stage in STAGES:
+            after = ", ".join(sorted(deps[stage.name])) or "-"
+            print(f"  {stage.name:<20} writes {', '.join(sorted(stage.writes))}  (after: {after})")
+        return
+
+    unknown = [name for name in args.stages if name not in {s.name for s in STAGES}]
+    if unknown:
+        print(f"Unknown stage(s): {', '.join(unknown)}. Use --list to see stages.")
+        sys.exit(2)
+    selected = [s for s in STAGES if not args.stages or s.name in args.stages]
+
+    needed = set().union(*(stage.tables for stage in selected))
+    tables = {name: ColumnTable.read(path) for name, path in TABLE_PATHS.items() if name in needed}
+
+    results = run_pipeline(selected, tables, workers=args.workers)
+
+    changed_rows = {name: set() for name in tables}
+    for stage in selected:
+        counts, changed, elapsed = results[stage.name]
+        summary = "  ".join(f"{len(idx)} {table} rows" for table, idx in sorted(changed.items()))
+        print(f"{stage.name:<20} {summary:<30} {elapsed:6.2f}s  ({_format_counts(counts)})")
+        for table, idx in changed.items():
+            changed_rows[table] |= idx
+
+    no_match = results.get("infer_counties", ({},))[0].get("city_no_match")
+    if no_match:
+        print(f"Cities with no county match: {no_match}")
+
+    print()
+    for name, table in tables.items():
+        path = TABLE_PATHS[name]
+        if not changed_rows[name]:
+            print(f"{path}: unchanged, not written")
+        elif args.dry_run:
+            print(f"{path}: {len(changed_rows[name])} rows would change (dry run)")
+        else:
+            table.write(path)
+            print(f"{path}: {len(changed_rows[name])} rows changed, written")
+
+    if not args.dry_run and any(changed_rows.values()):
+        print("Next step: python scripts/build_data_js.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""In-memory indexes over the program objects, for dev_server.py's JSON API.
+
+ProgramIndex is built once from build_data_js program objects (the same
+dicts that go into data.js) and then answers /api/programs and
+/api/facets without scanning every program:
+
+    category, type, city, county, subject   posting sets per value
+    grade                                    set of programs covering each grade
+    week                                     posting sets per ISO week (weekMask)
+    maxCost                                  priced ids sorted by weekly cents
+    search                                   trigram postings over the same text
+                                             app.js searches, then a substring check
+    past                                     programs sorted by their last date
+
+Filters mean what they mean in app.js applyFilters(): programs with
+unknown grades, no dates or no price stay in the results rather than
+being hidden. Unlike the page, the camp-only filters (week, maxCost,
+scholarship) and county apply to every category.
+
+Facet counts are "how many results would I get if I picked this value",
+computed with every other filter applied, so a client can grey out
+options that would leave nothing.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+GRADE_ORDER = ["K", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12"]
+COST_FACET_DOLLARS = [100, 200, 300, 500, 1000]  # the "Max Cost" options in index.html
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+TRIGRAM = 3
+VALUE_FACETS = {  # facet / filter name -> program key
+    "category": "category",
+    "type": "type",
+    "city": "city",
+    "county": "county",
+}
+
+
+class QueryError(ValueError):
+    """A bad query parameter (400)."""
+
+
+def program_model(p: dict) -> str:
+    return p.get("providerProgramType") or p.get("type") or ""
+
+
+def search_text(p: dict) -> str:
+    """The text app.js matches the search box against."""
+    parts = [p.get("name"), p.get("organization"), p.get("city"), p.get("county"),
+             p.get("description"), *(p.get("subjects") or [])]
+    return " ".join(str(part) for part in parts if part is not None).lower()
+
+
+def trigrams(text: str) -> set:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def parse_week(value: str):
+    """(iso_year, week) for "2026-W27" or any date in that week."""
+    try:
+        if "-W" in value.upper():
+            year, week = value.upper().split("-W")
+            year, week = int(year), int(week)
+            date.fromisocalendar(year, week, 1)  # validates the week number
+            return year, week
+        iso = date.fromisoformat(value).isocalendar()
+        return iso[0], iso[1]
+    except ValueError:
+        raise QueryError(f"week must be YYYY-MM-DD or YYYY-Www, not {value!r}") from None
+
+
+def encode_cursor(sort: str, key: tuple) -> str:
+    raw = json.dumps([sort, list(key)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise QueryError("malformed cursor") from None
+    if cursor_sort != sort:
+        raise QueryError("cursor belongs to a different sort order")
+    return tuple(key)
+
+
+class ProgramIndex:
+    def __init__(self, program_objs: list, version: str = "") -> None:
+        self.version = version
+        self.programs = {p["id"]: p for p in program_objs}
+        self.all = frozenset(self.programs)
+
+        self.values = {name: {} for name in VALUE_FACETS}
+        self.subjects: dict[str, set] = {}
+        self.grades = {g: set() for g in GRADE_ORDER}
+        self.weeks: dict[tuple, set] = {}
+        self.undated: set = set()
+        self.scholarship: set = set()
+        self.trigrams: dict[str, set] = {}
+        self.text: dict[int, str] = {}
+        unknown_grades = set()
+        priced, last_dates = [], []
+
+        for pid, p in self.programs.items():
+            for name, key in VALUE_FACETS.items():
+                value = program_model(p) if name == "type" else p.get(key) or ""
+                if value:
+                    self.values[name].setdefault(value, set()).add(pid)
+            for subject in p.get("subjects") or []:
+                self.subjects.setdefault(subject, set()).add(pid)
+
+            lo = GRADE_ORDER.index(p["gradesMin"]) if p.get("gradesMin") in GRADE_ORDER else -1
+            hi = GRADE_ORDER.index(p["gradesMax"]) if p.get("gradesMax") in GRADE_ORDER else -1
+            if lo < 0 or hi < 0:
+                unknown_grades.add(pid)
+            else:
+                for g in GRADE_ORDER[lo:hi + 1]:
+                    self.grades[g].add(pid)
+
+            mask = p.get("weekMask")
+            if mask is None:
+                self.undated.add(pid)
+            else:
+                bits = mask[0] | mask[1] << 32
+                while bits:
+                    week = (bits & -bits).bit_length()
+                    self.weeks.setdefault((p["weekYear"], week), set()).add(pid)
+                    bits &= bits - 1
+
+            if p.get("costWeeklyCents"):
+                priced.append((p["costWeeklyCents"], pid))
+            if p.get("scholarshipAvailable"):
+                self.scholarship.add(pid)
+
+            last = p.get("endDate") or p.get("startDate")
+            if last:
+                last_dates.append((last, pid))
+
+            text = self.text[pid] = search_text(p)
+            for gram in trigrams(text):
+                self.trigrams.setdefault(gram, set()).add(pid)
+
+        # Unknown grades pass every grade filter, as in gradesOverlap()
+        for g in GRADE_ORDER:
+            self.grades[g] |= unknown_grades
+        priced.sort()
+        self.weekly_cents = [cents for cents, _ in priced]
+        self.by_weekly = [pid for _, pid in priced]
+        self.unpriced = self.all - set(self.by_weekly)
+        last_dates.sort()
+        self.last_dates = [d for d, _ in last_dates]
+        self.by_last_date = [pid for _, pid in last_dates]
+        self._current = (None, None)  # (today, ids not past)
+
+    # -- filters ---------------------------------------------------------------
+
+    def current(self) -> frozenset:
+        """Programs that aren't over yet (isPast() in app.js)."""
+        today = date.today().isoformat()
+        if self._current[0] != today:
+            past = self.by_last_date[:bisect_left(self.last_dates, today)]
+            self._current = (today, self.all - frozenset(past))
+        return self._current[1]
+
+    def within_cost(self, dollars: int) -> set:
+        bound = bisect_right(self.weekly_cents, dollars * 100)
+        return self.unpriced | set(self.by_weekly[:bound])
+
+    def matching_text(self, query: str) -> set:
+        if len(query) < TRIGRAM:
+            return {pid for pid, text in self.text.items() if query in text}
+        postings = sorted(
+            (self.trigrams.get(gram, set()) for gram in trigrams(query)), key=len
+        )
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {pid for pid in candidates if query in self.text[pid]}
+
+    def filter_sets(self, params: dict) -> dict:
+        """filter name -> allowed ids, for each filter present in `params`."""
+        sets = {}
+        for name in VALUE_FACETS:
+            if params.get(name):
+                sets[name] = self.values[name].get(params[name], set())
+        if params.get("subject"):
+            sets["subject"] = self.subjects.get(params["subject"], set())
+        if params.get("grade"):
+            if params["grade"] not in self.grades:
+                raise QueryError(f"grade must be one of {', '.join(GRADE_ORDER)}")
+            sets["grade"] = self.grades[params["grade"]]
+        if params.get("week"):
+            sets["week"] = self.weeks.get(parse_week(params["week"]), set()) | self.undated
+        if params.get("maxCost"):
+            try:
+                dollars = int(params["maxCost"])
+            except ValueError:
+                raise QueryError("maxCost must be a whole number of dollars") from None
+            sets["maxCost"] = self.within_cost(dollars)
+        if params.get("scholarship") == "yes":
+            sets["scholarship"] = self.scholarship
+        search = (params.get("search") or "").lower().strip()
+        if search:
+            sets["search"] = self.matching_text(search)
+        if params.get("past", "") not in {"1", "true", "yes"}:
+            sets["past"] = self.current()
+        return sets
+
+    def matching(self, sets: dict, skip: str = "") -> set:
+        chosen = sorted((ids for name, ids in sets.items() if name != skip), key=len)
+        if not chosen:
+            return set(self.all)
+        return set(chosen[0]).intersection(*chosen[1:])
+
+    # -- sorting ---------------------------------------------------------------
+
+    def sort_key(self, sort: str, pid: int, today: str) -> tuple:
+        p = self.programs[pid]
+        name = (p.get("name") or "").lower()
+        tiebreak = (p.get("programId") or "", pid)
+        if sort == "name":
+            return (name, *tiebreak)
+        if sort == "city":
+            return ((p.get("city") or "").lower(), name, *tiebreak)
+        if sort == "cost":
+            cents = p.get("costWeeklyCents") or 0
+            return (0 if cents else 1, cents, name, *tiebreak)
+        # "date": the card order in app.js — current before past, then by start
+        start = p.get("startDate") or ""
+        last = p.get("endDate") or start
+        return (1 if last and last < today else 0, 0 if start else 1, start, name, *tiebreak)
+
+    # -- endpoints -------------------------------------------------------------
+
+    def query(self, params: dict) -> dict:
+        """/api/programs: filter, sort, page and project."""
+        sort = params.get("sort") or "date"
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-")
+        if sort not in {"date", "name", "city", "cost"}:
+            raise QueryError("sort must be date, name, city or cost (prefix - to reverse)")
+        try:
+            limit = int(params.get("limit") or DEFAULT_LIMIT)
+        except ValueError:
+            raise QueryError("limit must be a number") from None
+        limit = max(1, min(limit, MAX_LIMIT))
+        fields = [f for f in (params.get("fields") or "").split(",") if f]
+
+        ids = self.matching(self.filter_sets(params))
+        today = date.today().isoformat()
+        keyed = sorted((self.sort_key(sort, pid, today), pid) for pid in ids)
+        keys = [key for key, _ in keyed]
+
+        cursor = params.get("cursor")
+        if descending:
+            end = bisect_left(keys, decode_cursor(cursor, "-" + sort)) if cursor else len(keys)
+            page = keyed[max(0, end - limit):end][::-1]
+            more = end - limit > 0
+        else:
+            start = bisect_right(keys, decode_cursor(cursor, sort)) if cursor else 0
+            page = keyed[start:start + limit]
+            more = start + limit < len(keys)
+
+        items = []
+        for _, pid in page:
+            p = self.programs[pid]
+            if fields:
+                unknown = [f for f in fields if f not in p]
+                if unknown:
+                    raise QueryError(f"unknown field(s): {', '.join(unknown)}")
+                p = {"id": pid, **{f: p[f] for f in fields}}
+            items.append(p)
+        return {
+            "version": self.version,
+            "total": len(ids),
+            "count": len(items),
+            "items": items,
+            "nextCursor": (
+                encode_cursor(("-" if descending else "") + sort, page[-1][0])
+                if more and page else None
+            ),
+        }
+
+    def facets(self, params: dict) -> dict:
+        """/api/facets: per-value result counts under the other filters."""
+        sets = self.filter_sets(params)
+        result = {"version": self.version, "total": len(self.matching(sets)), "facets": {}}
+        facets = result["facets"]
+
+        def count(name: str, postings: dict) -> dict:
+            base = self.matching(sets, skip=name)
+            return {value: len(base & ids) for value, ids in postings.items()}
+
+        for name in VALUE_FACETS:
+            facets[name] = count(name, dict(sorted(self.values[name].items())))
+        facets["subject"] = count("subject", dict(sorted(self.subjects.items())))
+        facets["grade"] = count("grade", self.grades)
+        facets["week"] = count("week", {
+            f"{year}-W{week:02d}": ids | self.undated
+            for (year, week), ids in sorted(self.weeks.items())
+        })
+        facets["maxCost"] = count("maxCost", {
+            str(dollars): self.within_cost(dollars) for dollars in COST_FACET_DOLLARS
+        })
+        facets["scholarship"] = count("scholarship", {"yes": self.scholarship})
+        return result
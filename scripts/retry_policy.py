@@ -0,0 +1,162 @@
+"""
+Retry and circuit-breaker policy for the network enrichment scripts.
+
+FetchEngine (scripts/fetch_engine.py) consults this module on every
+failed request:
+
+  - RetryPolicy decides whether an error is transient (timeouts, dropped
+    connections, 408/429/5xx) and how long to wait before the next
+    attempt: capped exponential backoff with full jitter, or the server's
+    Retry-After for 429/503 when it asks for a reasonable wait.
+  - CircuitBreaker tracks consecutive failures per host. After
+    `failure_threshold` failures the host is "open" and every request to
+    it fails immediately with CircuitOpenError for `reset_timeout`
+    seconds. Then one trial request is let through; success closes the
+    circuit, failure re-opens it. A request counts once, after its
+    retries, and an HTTP 5xx counts once per URL: one broken page on a
+    shared registration site must not block every other program there.
+
+A dead domain hosting 30 programs therefore costs a few timeouts, not 30.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import random
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+HOST_FAILURE_STATUS = {500, 502, 503, 504}
+
+
+class CircuitOpenError(urllib.error.URLError):
+    """Raised instead of contacting a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"circuit open for {host} (retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def _root_cause(exc: BaseException) -> BaseException:
+    if isinstance(exc, urllib.error.URLError) and not isinstance(
+        exc, urllib.error.HTTPError
+    ) and isinstance(exc.reason, BaseException):
+        return exc.reason
+    return exc
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    """True if the error suggests the host itself is down or unreachable."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code in HOST_FAILURE_STATUS
+    cause = _root_cause(exc)
+    if isinstance(cause, ssl.SSLCertVerificationError):
+        return False
+    return isinstance(cause, (OSError, TimeoutError))
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Parse a Retry-After header (seconds or HTTP date) from an HTTPError."""
+    if not isinstance(exc, urllib.error.HTTPError) or exc.headers is None:
+        return None
+    value = (exc.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        max_retry_after: float = 120.0,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_transient(self, exc: BaseException) -> bool:
+        if isinstance(exc, CircuitOpenError):
+            return False
+        if isinstance(exc, urllib.error.HTTPError):
+            return exc.code in TRANSIENT_STATUS
+        cause = _root_cause(exc)
+        if isinstance(cause, (socket.gaierror, ssl.SSLCertVerificationError)):
+            return False  # DNS failures and bad certificates will not fix themselves
+        return isinstance(cause, (OSError, TimeoutError))
+
+    def delay(self, attempt: int, exc: BaseException) -> float | None:
+        """Seconds to wait before attempt `attempt + 1`, or None to give up."""
+        if attempt >= self.max_attempts or not self.is_transient(exc):
+            return None
+        if isinstance(exc, urllib.error.HTTPError) and exc.code in (429, 503):
+            wait = retry_after_seconds(exc)
+            if wait is not None:
+                return wait if wait <= self.max_retry_after else None
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Per-host breaker: closed -> open after N failures -> half-open trial."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._failed_keys: set = set()
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def before_request(self, host: str) -> None:
+        """Raise CircuitOpenError unless a request to this host may proceed."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if waited < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(host, max(0.0, self.reset_timeout - waited))
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._failed_keys.clear()
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, key: str | None = None) -> None:
+        """Count a failure; repeats of the same `key` (a URL) count once."""
+        with self._lock:
+            if key is None or key not in self._failed_keys:
+                self._failures += 1
+                if key is not None:
+                    self._failed_keys.add(key)
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
@@ -0,0 +1,288 @@
+"""
+Nightly re-verification scheduler for programs and organizations.
+
+Scores every active row by how likely its data is to be stale, then spends
+a fixed budget of requests on the highest-scoring URLs (rows sharing a
+registration page are checked with one request, and the budget counts
+URLs, not rows):
+
+  - programs: fetch registration_url and compare the page's visible text
+    with what was seen last time (conditional GET via the response cache,
+    so an unchanged page is usually a cheap 304)
+  - organizations: link check on website (HEAD, falling back to GET)
+
+Score components (higher = check sooner):
+  - staleness     months since verified_date, or since the last check that
+                  found the page unchanged, whichever is more recent
+  - confidence    "likely" rows score higher than "confirmed" ones
+  - registration  registration_opens within the next REG_WINDOW_DAYS
+  - stale year    start_date earlier than program_year (the 2025-dates
+                  problem described in NOTES.md)
+  - failures      consecutive failed checks (dead links need a human)
+
+Each outcome (unchanged / changed / baseline / error) is appended to
+data/.cache/reverify_history.jsonl, which feeds the next night's scores.
+"baseline" is the first fetch of a page: there is nothing to compare it
+with yet, so its fingerprint is stored but the row is not counted as
+freshly verified.
+Nothing in the CSVs is modified; rows whose pages changed or failed are
+listed at the end for manual review.
+
+Run from the project root (e.g. nightly from cron):
+    python scripts/reverify.py --budget 60
+    python scripts/reverify.py --dry-run     # show the plan only
+"""
+
+import argparse
+import hashlib
+import re
+import urllib.error
+from datetime import date
+from pathlib import Path
+
+from checkpoint import Journal
+from fetch_descriptions import sniff_charset
+from fetch_engine import FetchEngine
+from http_cache import ResponseCache
+from schema import Record, load_orgs, load_programs
+
+PROGRAMS_PATH = Path("data/programs.csv")
+ORGS_PATH     = Path("data/organizations.csv")
+HISTORY_DIR   = Path("data/.cache")
+# Not fetch_descriptions' data/.cache/http: that cache keeps only the part
+# of a page it parsed, and fingerprinting a truncated body on a 304 would
+# report the page as changed.
+CACHE_DIR     = HISTORY_DIR / "reverify_http"
+
+USER_AGENT = "CampFinderReverifier/1.0 (local research tool)"
+DEFAULT_BUDGET = 60
+MAX_BYTES = 200_000
+NEVER_VERIFIED_DAYS = 365
+REG_WINDOW_DAYS = 45
+
+CONFIDENCE_WEIGHT = {"confirmed": 0.0, "likely": 3.0, "": 3.0}
+REG_SOON_WEIGHT = 4.0
+STALE_YEAR_WEIGHT = 3.0
+FAILURE_WEIGHT = 1.5
+MAX_COUNTED_FAILURES = 3
+
+ENGINE = FetchEngine(
+    USER_AGENT, rate=4.0, burst=4.0, workers=8, per_host=1,
+    host_interval=0.8, timeout=15,
+)
+
+STRIP_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def parse_iso(value: str):
+    try:
+        return date.fromisoformat((value or "").strip()[:10])
+    except ValueError:
+        return None
+
+
+def content_fingerprint(raw: bytes, content_type: str = "") -> str:
+    """Hash of the page's visible text, ignoring scripts and markup churn."""
+    text = raw.decode(sniff_charset(raw, content_type), errors="replace")
+    text = TAG_RE.sub(" ", STRIP_RE.sub(" ", text))
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# -- scoring -----------------------------------------------------------------
+
+
+def score_row(row: Record, history: dict, today: date) -> float:
+    verified = parse_iso(row.get("verified_date"))
+    last_ok = parse_iso(history.get("last_ok"))
+    seen = max([d for d in (verified, last_ok) if d], default=None)
+    stale_days = (today - seen).days if seen else NEVER_VERIFIED_DAYS
+    score = min(stale_days, NEVER_VERIFIED_DAYS) / 30.0
+
+    score += CONFIDENCE_WEIGHT.get(row.get("confidence"), 0.0)
+
+    opens = parse_iso(row.get("registration_opens"))
+    if opens and 0 <= (opens - today).days <= REG_WINDOW_DAYS:
+        score += REG_SOON_WEIGHT * (1 - (opens - today).days / REG_WINDOW_DAYS)
+
+    start = parse_iso(row.get("start_date"))
+    year = row.get("program_year")
+    if start and year.isdigit() and start.year < int(year):
+        score += STALE_YEAR_WEIGHT
+
+    failures = min(history.get("failures", 0), MAX_COUNTED_FAILURES)
+    score += FAILURE_WEIGHT * failures
+    return score
+
+
+def build_candidates(programs, orgs, history, today):
+    """Return [(score, kind, url, keys)] ranked by score, one entry per URL.
+
+    Many programs share a registration page, so rows are grouped by URL and
+    a group scores as its stalest row. One fetch then covers every row.
+    """
+    groups = {}
+
+    def add(kind, url, key, row):
+        score = score_row(row, history.get(key, {}), today)
+        group = groups.setdefault((kind, url), [0.0, []])
+        group[0] = max(group[0], score)
+        group[1].append(key)
+
+    for program in programs:
+        if program.confidence == "inactive":
+            continue
+        url = next(iter(program.registration_url.split()), "")
+        if url and program.program_id:
+            add("page", url, f"program:{program.program_id}", program)
+    for org in orgs:
+        if org.confidence == "inactive":
+            continue
+        if org.website and org.org_id:
+            add("link", org.website, f"org:{org.org_id}", org)
+
+    ranked = [(score, kind, url, keys) for (kind, url), (score, keys) in groups.items()]
+    ranked.sort(key=lambda c: -c[0])
+    return ranked
+
+
+# -- checks ------------------------------------------------------------------
+
+
+def check_page(url: str, cache: ResponseCache, previous: dict) -> dict:
+    """GET a registration page; outcome is unchanged/changed by visible text."""
+    for conditional in (True, False):
+        headers = cache.conditional_headers(url) if conditional else {}
+        try:
+            with ENGINE.open(url, headers=headers) as resp:
+                raw = resp.read(MAX_BYTES)
+                cache.put(url, resp.geturl(), raw, resp.headers)
+                content_type = resp.headers.get("Content-Type", "")
+                status = resp.status
+            break
+        except urllib.error.HTTPError as e:
+            cached = cache.get(url) if e.code == 304 else None
+            if cached is not None:
+                _, content_type, raw = cached
+                status = 304
+                break
+            if e.code != 304 or not headers:
+                raise
+            # 304 but the cached body is gone (get() dropped the entry): ask again
+    fingerprint = content_fingerprint(raw, content_type)
+    if not previous.get("hash"):
+        outcome = "baseline"
+    elif previous["hash"] != fingerprint:
+        outcome = "changed"
+    else:
+        outcome = "unchanged"
+    return {"outcome": outcome, "status": status, "hash": fingerprint}
+
+
+def check_link(url: str) -> dict:
+    """HEAD a website, retrying as GET for servers that reject HEAD."""
+    try:
+        with ENGINE.open(url, method="HEAD") as resp:
+            return {"outcome": "unchanged", "status": resp.status}
+    except urllib.error.HTTPError as e:
+        if e.code not in (403, 405, 501):
+            raise
+    with ENGINE.open(url) as resp:
+        return {"outcome": "unchanged", "status": resp.status}
+
+
+def run_check(job, cache, history):
+    _, kind, url, keys = job
+    if kind == "page":
+        return check_page(url, cache, history.get(keys[0], {}))
+    return check_link(url)
+
+
+# -- main --------------------------------------------------------------------
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Budgeted nightly re-verification")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help="URLs to request this run; rows sharing a URL are "
+                             f"covered by one request (default: {DEFAULT_BUDGET})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the ranked plan without fetching anything")
+    parser.add_argument("--today", help="score as of this date (YYYY-MM-DD)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    today = parse_iso(args.today) if args.today else date.today()
+
+    _, programs = load_programs(PROGRAMS_PATH)
+    _, orgs = load_orgs(ORGS_PATH)
+    journal = Journal("reverify_history", directory=HISTORY_DIR)
+    history = journal.replay()
+
+    candidates = build_candidates(programs, orgs, history, today)
+    batch = candidates[:max(0, args.budget)]
+
+    rows = sum(len(c[3]) for c in candidates)
+    print(f"Checkable rows: {rows} across {len(candidates)} URLs  |  Budget: {len(batch)} URLs")
+    if args.dry_run:
+        for score, kind, url, keys in batch:
+            print(f"  {score:6.2f}  {kind:<4}  {len(keys):>3} rows  {url[:70]}")
+        return
+
+    cache = ResponseCache(CACHE_DIR)
+    needs_review = []
+    counts = {"unchanged": 0, "changed": 0, "baseline": 0, "error": 0}
+    try:
+        with journal:
+            results = ENGINE.run(lambda job: run_check(job, cache, history), batch)
+            for n, (job, result, error) in enumerate(results, 1):
+                score, kind, url, keys = job
+                previous = history.get(keys[0], {})
+                record = {"checked_at": today.isoformat()}
+                if error is None:
+                    record.update(result)
+                    record["failures"] = 0
+                    # Staleness counts from the last check that found the page
+                    # unchanged; a changed page stays near the top of the queue
+                    if record["outcome"] == "unchanged":
+                        record["last_ok"] = today.isoformat()
+                    else:
+                        record["last_ok"] = previous.get("last_ok", "")
+                    record.setdefault("hash", previous.get("hash", ""))
+                else:
+                    record.update({
+                        "outcome": "error",
+                        "error": str(error)[:200],
+                        "failures": previous.get("failures", 0) + 1,
+                        "last_ok": previous.get("last_ok", ""),
+                        "hash": previous.get("hash", ""),
+                    })
+                for key in keys:
+                    history[key] = record
+                    journal.append(key, record)
+                counts[record["outcome"]] += 1
+                if record["outcome"] in {"changed", "error"}:
+                    needs_review.append((keys, record, url))
+                detail = record.get("error") or record.get("status")
+                print(f"[{n}/{len(batch)}] {score:6.2f}  {url[:60]:<60}  {record['outcome']} ({detail})")
+    finally:
+        cache.save()
+    journal.compact(history)
+
+    print()
+    print(f"Unchanged: {counts['unchanged']}  |  Changed: {counts['changed']}  |  "
+          f"Baseline: {counts['baseline']}  |  Errors: {counts['error']}")
+    if needs_review:
+        print("\nNeeds review (page changed or check failed):")
+        for keys, record, url in needs_review:
+            note = record.get("error") or "page content changed since last check"
+            print(f"  {url}\n      {note}")
+            for key in keys:
+                print(f"      - {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Row-level edits to the data CSVs for dev_server.py.
+
+The admin page sends only the rows it changed:
+
+    PATCH /__rows/programs
+    If-Match: "<etag from the last GET or PATCH>"
+    {"upsert": [{"program_id": "...", "program_name": "..."}], "delete": ["..."]}
+
+An upsert updates the columns it names on the row with that key and
+leaves the others alone; a key that isn't in the file is appended, with
+blanks for the columns it doesn't name. Deleting a key that isn't there
+is not an error (it is reported back in "missing").
+
+The ETag is a hash of the file's bytes, so any change — another admin
+tab, a script, a hand edit — makes a stale If-Match fail with
+RowConflict (412) instead of silently overwriting it. Each table is
+guarded by a lock (a threading lock plus an flock on data/.<name>.lock
+where fcntl exists) held across read, check and write, and the new
+file is written to a temp file and renamed into place.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from csv_io import atomic_text_writer
+from schema import Organization, Program, read_records
+from static_files import strong_etag
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+TABLES = {
+    "programs": ("data/programs.csv", "program_id", Program),
+    "organizations": ("data/organizations.csv", "org_id", Organization),
+}
+
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+class RowError(ValueError):
+    """A malformed request (400)."""
+
+
+class RowConflict(Exception):
+    """If-Match didn't match the file on disk (412)."""
+
+    def __init__(self, etag: str) -> None:
+        super().__init__(f"file changed; current etag is {etag}")
+        self.etag = etag
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive lock on `path` across threads and (with fcntl) processes."""
+    path = Path(path)
+    with _thread_locks_guard:
+        lock = _thread_locks.setdefault(str(path), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        lock_path = path.with_name(f".{path.name}.lock")
+        with open(lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def if_match_ok(if_match: str, etag: str) -> bool:
+    """If-Match uses strong comparison; "*" matches any existing file."""
+    if_match = (if_match or "").strip()
+    if if_match == "*":
+        return True
+    return etag in {tag.strip() for tag in if_match.split(",")}
+
+
+def _lineterminator(data: bytes) -> str:
+    end = data.find(b"\n")
+    return "\r\n" if end > 0 and data[end - 1:end] == b"\r" else "\n"
+
+
+def _replace_text(path: Path, text: str) -> None:
+    with atomic_text_writer(path) as f:
+        f.write(text)
+
+
+class CsvTable:
+    def __init__(self, root: Path, name: str) -> None:
+        if name not in TABLES:
+            raise KeyError(name)
+        rel, self.key, self.record_type = TABLES[name]
+        self.name = name
+        self.path = Path(root) / rel
+
+    def _read(self):
+        """(etag, bytes, fieldnames, records) of the file as it is now."""
+        data = self.path.read_bytes()
+        text = io.StringIO(data.decode("utf-8-sig"), newline="")
+        return (strong_etag(data), data) + read_records(self.record_type, text)
+
+    def etag(self) -> str:
+        return strong_etag(self.path.read_bytes())
+
+    def get(self, ids=None) -> dict:
+        """Current etag and columns; the rows whose key is in `ids`, if given."""
+        with file_lock(self.path):
+            etag, _data, fieldnames, records = self._read()
+        result = {"table": self.name, "key": self.key, "etag": etag, "columns": fieldnames}
+        if ids is not None:
+            wanted = set(ids)
+            result["rows"] = [
+                record.to_dict(fieldnames) for record in records if record.get(self.key) in wanted
+            ]
+        return result
+
+    def patch(self, if_match: str, upsert=(), delete=()) -> dict:
+        """Apply upserts and deletes if the file still has etag `if_match`."""
+        upsert, delete = list(upsert or []), list(delete or [])
+        for row in upsert:
+            if not isinstance(row, dict) or not str(row.get(self.key) or "").strip():
+                raise RowError(f"every upserted row needs a non-empty {self.key}")
+        if not all(isinstance(key, str) for key in delete):
+            raise RowError(f"delete must be a list of {self.key} strings")
+
+        with file_lock(self.path):
+            etag, data, fieldnames, records = self._read()
+            if not if_match_ok(if_match, etag):
+                raise RowConflict(etag)
+            columns = set(fieldnames)
+            for row in upsert:
+                unknown = sorted(set(row) - columns)
+                if unknown:
+                    raise RowError(f"unknown column(s) for {self.name}: {', '.join(unknown)}")
+
+            position = {record.get(self.key): i for i, record in enumerate(records)}
+            gone = set(delete)
+            missing = sorted(gone - position.keys())
+            updated = inserted = 0
+            for change in upsert:
+                values = {col: "" if value is None else str(value) for col, value in change.items()}
+                key = values[self.key] = values[self.key].strip()
+                gone.discard(key)  # upsert wins if a row is in both lists
+                i = position.get(key)
+                if i is None:
+                    position[key] = len(records)
+                    record = self.record_type()
+                    for col in fieldnames:
+                        record.set(col, values.get(col, ""))
+                    records.append(record)
+                    inserted += 1
+                else:
+                    for col, value in values.items():
+                        records[i].set(col, value)
+                    updated += 1
+            deleted = sum(1 for record in records if record.get(self.key) in gone)
+            if deleted:
+                records = [record for record in records if record.get(self.key) not in gone]
+
+            if not (updated or inserted or deleted):
+                new_etag = etag
+            else:
+                out = io.StringIO(newline="")
+                writer = csv.DictWriter(out, fieldnames=fieldnames, lineterminator=_lineterminator(data))
+                writer.writeheader()
+                writer.writerows(record.to_dict(fieldnames) for record in records)
+                text = out.getvalue()
+                _replace_text(self.path, text)
+                new_etag = strong_etag(text.encode("utf-8"))
+        return {
+            "etag": new_etag,
+            "updated": updated,
+            "inserted": inserted,
+            "deleted": deleted,
+            "missing": missing,
+        }
+
+
+def write_text_locked(path: Path, content: str) -> str:
+    """Replace a whole file atomically under its lock; returns the new etag."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(path):
+        _replace_text(path, content)
+    return strong_etag(content.encode("utf-8"))
@@ -0,0 +1,297 @@
+"""
+Typed records for organizations.csv and programs.csv.
+
+Organization and Program are __slots__ classes with one str attribute
+per CSV column (whitespace-stripped), plus typed fields parsed once at
+load time:
+
+    Program.min_age / max_age            int or None
+    Program.min_grade / max_grade        Grade or None
+    Program.start_day / end_day          date ordinals (date.toordinal()) or None
+    Program.start_minute / end_minute    minutes since midnight or None
+    Program.cover_start / cover_end      the same window widened by known
+                                         pre/after-care hours, or None
+    Program.cost_per_week_cents          int or None
+    Program.cost                         cost_model.Cost or None (from
+                                         cost_per_week, else cost_raw)
+    Program.meals / transportation       bool
+    Organization.financial_aid           bool
+    Organization.verified_day            date ordinal or None
+
+load_programs() / load_orgs() return (fieldnames, records); write_records()
+writes them back. A load followed by a write reproduces the file exactly:
+column order, unknown extra columns, padded cells and the original line
+ending are all preserved.
+
+Typed fields are derived from the str columns. A script that edits a
+column should call record.parse() afterwards if it also reads the typed
+fields. record.get(name) and record.set(name, value) reach any column by
+name, including extra ones.
+
+The row-at-a-time scripts (build_data_js, validate_data,
+fetch_descriptions, enrich_locations, check_links, reverify and the
+dev server's row_store) all load and write through this module. The
+pipeline transforms (infer_*, normalize_times, parse_costs,
+backfill_age_grade) use column_table.ColumnTable instead, which keeps
+each column dictionary-encoded.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import re
+from datetime import date
+from enum import IntEnum
+from pathlib import Path
+
+from cost_model import program_cost
+from csv_io import detect_lineterminator, write_csv_atomic
+from normalize_times import covered_window, end_minutes, start_minutes
+
+PROGRAMS_PATH = Path("data/programs.csv")
+ORGS_PATH     = Path("data/organizations.csv")
+
+DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+US_DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{2,4})$")
+TRUE_VALUES = {"true", "yes", "1"}
+
+
+class Grade(IntEnum):
+    PK = -1
+    K = 0
+    G1 = 1
+    G2 = 2
+    G3 = 3
+    G4 = 4
+    G5 = 5
+    G6 = 6
+    G7 = 7
+    G8 = 8
+    G9 = 9
+    G10 = 10
+    G11 = 11
+    G12 = 12
+
+    @classmethod
+    def parse(cls, raw: str):
+        """Grade for "PK", "K"/"Kinder"/"Kindergarten" or "1".."12", else None."""
+        value = (raw or "").strip().upper()
+        if value in ("K", "KINDER", "KINDERGARTEN"):
+            return cls.K
+        if value == "PK":
+            return cls.PK
+        if value.isdigit() and 1 <= int(value) <= 12 and value == str(int(value)):
+            return cls(int(value))
+        return None
+
+    @property
+    def label(self) -> str:
+        """The CSV spelling: "PK", "K", "1".."12"."""
+        return self.name if self.value <= 0 else str(self.value)
+
+
+# -- field parsers -------------------------------------------------------------
+
+
+def parse_int(raw: str):
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_day(raw: str):
+    """Date ordinal for YYYY-MM-DD or M/D/YY(YY), else None."""
+    m = DATE_RE.match(raw or "")
+    if m:
+        year, month, day = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    else:
+        m = US_DATE_RE.match(raw or "")
+        if not m:
+            return None
+        month, day, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if year < 100:
+            year += 2000
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        return None
+
+
+def day_iso(ordinal) -> str:
+    return date.fromordinal(ordinal).isoformat() if ordinal is not None else ""
+
+
+def parse_cents(raw: str):
+    """Cents for a plain number like "350" or "312.50", else None."""
+    try:
+        amount = float(raw)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(amount):
+        return None
+    return int(amount * 100 + (0.5 if amount >= 0 else -0.5))
+
+
+def parse_bool(raw: str) -> bool:
+    return (raw or "").lower() in TRUE_VALUES
+
+
+# -- records -------------------------------------------------------------------
+
+
+class Record:
+    """Base for CSV-backed records; subclasses list COLUMNS and typed slots."""
+
+    COLUMNS = ()
+    __slots__ = ("extra", "padded")
+
+    def __init__(self, **values) -> None:
+        for name in self.COLUMNS:
+            setattr(self, name, (values.get(name) or "").strip())
+        self.extra = None   # {column: value} for columns not in COLUMNS
+        self.padded = None  # {column: original cell} where stripping changed it
+        self.parse()
+
+    def parse(self) -> None:
+        """(Re)compute the typed fields from the str columns."""
+
+    def get(self, name: str, default: str = "") -> str:
+        if name in self.COLUMNS:
+            return getattr(self, name)
+        return (self.extra or {}).get(name, default)
+
+    def set(self, name: str, value: str) -> None:
+        """Set a column by name, including columns not in COLUMNS."""
+        if name in self.COLUMNS:
+            setattr(self, name, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+
+    def cell(self, name: str) -> str:
+        """The value to write for `name`, restoring original padding."""
+        value = self.get(name)
+        original = self.padded.get(name) if self.padded else None
+        if original is not None and original.strip() == value:
+            return original
+        return value
+
+    def to_dict(self, fieldnames) -> dict:
+        return {name: self.cell(name) for name in fieldnames}
+
+    def __repr__(self) -> str:
+        key = self.COLUMNS[0] if self.COLUMNS else ""
+        return f"<{type(self).__name__} {getattr(self, key, '')!r}>"
+
+
+class Organization(Record):
+    COLUMNS = (
+        "org_id", "org_name", "org_type", "website", "phone", "email",
+        "street_address", "city", "county", "state", "zip",
+        "financial_aid_available", "financial_aid_notes", "registration_policy",
+        "registration_opens", "confidence", "verified_date", "notes",
+    )
+    __slots__ = COLUMNS + ("financial_aid", "verified_day")
+
+    def parse(self) -> None:
+        self.financial_aid = parse_bool(self.financial_aid_available)
+        self.verified_day = parse_day(self.verified_date)
+
+
+class Program(Record):
+    COLUMNS = (
+        "program_id", "org_id", "program_name", "program_type", "program_year",
+        "description", "session_type", "grades_min", "grades_max",
+        "age_min", "age_max", "schedule_type", "start_date", "end_date",
+        "days_of_week", "start_time", "end_time", "pre_after_care",
+        "cost_raw", "cost_per_week", "cost_notes", "meals_provided",
+        "transportation_provided", "transportation_notes", "activities",
+        "site_address", "site_city", "site_county", "registration_url",
+        "registration_opens", "registration_opens_early", "registration_notes",
+        "funding_source", "confidence", "verified_date", "notes",
+    )
+    __slots__ = COLUMNS + (
+        "min_age", "max_age", "min_grade", "max_grade", "start_day", "end_day",
+        "start_minute", "end_minute", "cover_start", "cover_end",
+        "cost_per_week_cents", "cost", "meals", "transportation",
+    )
+
+    def parse(self) -> None:
+        self.min_age = parse_int(self.age_min)
+        self.max_age = parse_int(self.age_max)
+        self.min_grade = Grade.parse(self.grades_min)
+        self.max_grade = Grade.parse(self.grades_max)
+        self.start_day = parse_day(self.start_date)
+        self.end_day = parse_day(self.end_date)
+        self.start_minute = start_minutes(self.start_time)
+        self.end_minute = end_minutes(self.end_time)
+        window = covered_window(self.start_time, self.end_time, self.pre_after_care)
+        self.cover_start, self.cover_end = window or (None, None)
+        self.cost_per_week_cents = parse_cents(self.cost_per_week) if self.cost_per_week else None
+        self.cost = program_cost(self.cost_raw, self.cost_per_week)
+        self.meals = parse_bool(self.meals_provided)
+        self.transportation = parse_bool(self.transportation_provided)
+
+
+# -- load / write --------------------------------------------------------------
+
+
+def load_records(cls, path: Path):
+    """Return (fieldnames, [cls records]) for a CSV file."""
+    with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+        return read_records(cls, f)
+
+
+def read_records(cls, f):
+    """Return (fieldnames, [cls records]) from an open text file (newline="")."""
+    reader = csv.reader(f)
+    fieldnames = next(reader, [])
+    known = set(cls.COLUMNS)
+    positions = [(i, name) for i, name in enumerate(fieldnames) if name in known]
+    unknown = [(i, name) for i, name in enumerate(fieldnames) if name not in known]
+    missing = [name for name in cls.COLUMNS if name not in fieldnames]
+    new = cls.__new__
+    records = []
+    for cells in reader:
+        if not cells:
+            continue
+        if len(cells) < len(fieldnames):
+            cells += [""] * (len(fieldnames) - len(cells))
+        record = new(cls)
+        padded = None
+        for i, name in positions:
+            cell = cells[i]
+            value = cell.strip()
+            if value != cell:
+                if padded is None:
+                    padded = {}
+                padded[name] = cell
+            setattr(record, name, value)
+        for name in missing:
+            setattr(record, name, "")
+        record.extra = {name: cells[i] for i, name in unknown} if unknown else None
+        record.padded = padded
+        record.parse()
+        records.append(record)
+    return fieldnames, records
+
+
+def load_programs(path: Path = PROGRAMS_PATH):
+    return load_records(Program, path)
+
+
+def load_orgs(path: Path = ORGS_PATH):
+    return load_records(Organization, path)
+
+
+def write_records(path: Path, fieldnames, records) -> None:
+    """Atomically write records, keeping the file's existing line ending."""
+    write_csv_atomic(
+        path, fieldnames, (record.to_dict(fieldnames) for record in records),
+        lineterminator=detect_lineterminator(path),
+    )
@@ -0,0 +1,234 @@
+"""Compressed variants, ETags and cache headers for dev_server.py.
+
+StaticFiles.lookup(path, accept_encoding) picks the best encoding the
+client accepts (br when the optional `brotli` package is installed, then
+gzip, then identity) and returns a Variant describing what to send. Each
+compressed variant is written once to a sidecar file under
+data/.cache/static/ whose mtime is set to the source's; later requests
+reuse it until the source's (mtime, size) changes, in memory or across
+server restarts.
+
+parse_range() reads a single-range Range header for the production
+server, which answers it with 206 from the uncompressed file.
+
+ETags are strong: a hash of the source bytes, suffixed with the encoding
+for compressed variants. Files whose name carries a content hash
+("app.3f9a2c1b.js") are marked immutable; everything else is
+"no-cache", so the browser revalidates and gets a 304 while it still has
+the current bytes.
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".html", ".js", ".css", ".json", ".geojson", ".csv", ".svg", ".txt", ".md", ".map",
+}
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+SIDECAR_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def supported_encodings() -> list:
+    """Encodings this server can produce, best first."""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def accepted_encodings(header: str) -> set:
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted, refused = set(), set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        (accepted if q > 0 else refused).add(name)
+    if "*" in accepted:
+        accepted |= {enc for enc in supported_encodings() if enc not in refused}
+    return accepted
+
+
+def choose_encoding(header: str, path: str) -> str:
+    """"br", "gzip" or "" (identity) for a file and an Accept-Encoding header."""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return ""
+    accepted = accepted_encodings(header)
+    return next((enc for enc in supported_encodings() if enc in accepted), "")
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    return data
+
+
+def strong_etag(data: bytes, encoding: str = "") -> str:
+    digest = hashlib.sha1(data).hexdigest()[:20]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def cache_control(path: str) -> str:
+    return CACHE_IMMUTABLE if HASHED_NAME_RE.search(os.path.basename(path)) else CACHE_REVALIDATE
+
+
+class RangeNotSatisfiable(ValueError):
+    """A Range header that selects no bytes of the file (416)."""
+
+
+def parse_range(header: str, size: int):
+    """(first, last) byte offsets, inclusive, for a single-range header.
+
+    Returns None for anything to ignore (not bytes, several ranges, or
+    malformed), which means sending the whole file with a 200.
+    """
+    unit, _, spec = (header or "").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start is None:  # suffix: the last N bytes
+        if end is None or end < 0:
+            return None
+        if end == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - end), size - 1
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+class Variant:
+    """One representation of a file: where its bytes are and how to label them."""
+
+    __slots__ = ("path", "encoding", "etag", "size", "mtime")
+
+    def __init__(self, path: str, encoding: str, etag: str, size: int, mtime: float) -> None:
+        self.path = path          # file to stream (the source or a sidecar)
+        self.encoding = encoding  # Content-Encoding, "" for identity
+        self.etag = etag
+        self.size = size
+        self.mtime = mtime        # the source's mtime, for Last-Modified
+
+
+class _Entry:
+    __slots__ = ("signature", "digest", "variants")
+
+    def __init__(self, signature) -> None:
+        self.signature = signature  # (st_mtime_ns, st_size) of the source
+        self.digest = None          # strong ETag of the source bytes
+        self.variants = {}          # encoding -> Variant
+
+
+class StaticFiles:
+    def __init__(self, root: Path, cache_dir: Path) -> None:
+        self.root = Path(root)
+        self.cache_dir = Path(cache_dir)
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, path: str, accept_encoding: str = "") -> Variant | None:
+        """Variant of regular file `path` to send, or None if it can't be read."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        encoding = choose_encoding(accept_encoding, path) if st.st_size >= MIN_COMPRESS_BYTES else ""
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.signature != signature:
+                entry = self._entries[path] = _Entry(signature)
+            variant = entry.variants.get(encoding)
+            if variant is not None:
+                return variant
+            try:
+                variant = self._build(path, st, entry, encoding)
+            except OSError:
+                return None
+            entry.variants[encoding] = variant
+            return variant
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def _sidecar(self, path: str, encoding: str) -> Path:
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith(".."):
+            rel = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return self.cache_dir / (rel + SIDECAR_SUFFIX[encoding])
+
+    def _build(self, path: str, st: os.stat_result, entry: _Entry, encoding: str) -> Variant:
+        data = None
+        if entry.digest is None:
+            data = Path(path).read_bytes()
+            entry.digest = strong_etag(data)
+        if not encoding:
+            return Variant(path, "", entry.digest, st.st_size, st.st_mtime)
+
+        etag = entry.digest[:-1] + f'-{encoding}"'
+        sidecar = self._sidecar(path, encoding)
+        try:
+            sst = sidecar.stat()
+            if sst.st_mtime_ns == st.st_mtime_ns:
+                return Variant(str(sidecar), encoding, etag, sst.st_size, st.st_mtime)
+        except OSError:
+            pass
+
+        if data is None:
+            data = Path(path).read_bytes()
+        body = compress(data, encoding)
+        if len(body) >= len(data):
+            return Variant(path, "", entry.digest, st.st_size, st.st_mtime)
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        tmp = sidecar.with_name(f".{sidecar.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, sidecar)
+        return Variant(str(sidecar), encoding, etag, len(body), st.st_mtime)
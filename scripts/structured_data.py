@@ -0,0 +1,200 @@
+"""
+Turn schema.org Event/Offer data found on registration pages into
+candidate values for programs.csv columns.
+
+fetch_descriptions.py collects JSON-LD Event objects and microdata items
+(one dict of itemprops per Event itemscope) while it parses each page;
+this module maps them onto:
+
+    start_date, end_date   YYYY-MM-DD
+    cost_raw               "$350", "$300-$450", "Free"
+    age_min, age_max       integers as strings
+    site_address           "123 Main St, Burlington, VT 05401"
+
+All fields come from one Event: the one that fills the most of them,
+the first on a tie. Fields from different Events are never mixed, so a
+page listing several sessions can't pair one session's dates with
+another's price. Values are candidates for review only; nothing here
+writes to programs.csv.
+
+Not meant to be run directly.
+"""
+
+import json
+import math
+import re
+
+CANDIDATE_FIELDS = [
+    "start_date", "end_date", "cost_raw", "age_min", "age_max", "site_address",
+]
+
+# Microdata itemprops worth keeping while parsing a page
+MICRODATA_PROPS = {
+    "startDate", "endDate", "price", "lowPrice", "highPrice", "priceCurrency",
+    "typicalAgeRange", "suggestedMinAge", "suggestedMaxAge",
+    "streetAddress", "addressLocality", "addressRegion", "postalCode",
+}
+
+DATE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+AGE_RANGE_RE = re.compile(r"(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})|(\d{1,2})\s*\+")
+
+
+def _types(obj) -> list:
+    t = obj.get("@type", [])
+    return t if isinstance(t, list) else [t]
+
+
+def is_event(obj) -> bool:
+    return any(str(t).endswith("Event") for t in _types(obj))
+
+
+def _walk(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for value in node.values():
+            if isinstance(value, (list, dict)):
+                yield from _walk(value)
+
+
+def events_from_jsonld(text: str) -> list:
+    """Return every Event object in a JSON-LD block (including @graph)."""
+    try:
+        data = json.loads(text.strip().rstrip(";"))
+    except ValueError:
+        return []
+    return [obj for obj in _walk(data) if is_event(obj)]
+
+
+def microdata_event(props: dict):
+    """Build an Event-shaped dict from one microdata item's itemprops, or None."""
+    if not (props.get("startDate") or props.get("endDate")):
+        return None
+    return {
+        "@type": "Event",
+        "startDate": props.get("startDate"),
+        "endDate": props.get("endDate"),
+        "typicalAgeRange": props.get("typicalAgeRange"),
+        "audience": {
+            "suggestedMinAge": props.get("suggestedMinAge"),
+            "suggestedMaxAge": props.get("suggestedMaxAge"),
+        },
+        "offers": {
+            "price": props.get("price"),
+            "lowPrice": props.get("lowPrice"),
+            "highPrice": props.get("highPrice"),
+            "priceCurrency": props.get("priceCurrency"),
+        },
+        "location": {"address": {
+            "streetAddress": props.get("streetAddress"),
+            "addressLocality": props.get("addressLocality"),
+            "addressRegion": props.get("addressRegion"),
+            "postalCode": props.get("postalCode"),
+        }},
+    }
+
+
+# -- field mappers -------------------------------------------------------------
+
+
+def _date(value) -> str:
+    m = DATE_RE.match(str(value or "").strip())
+    return m.group(1) if m else ""
+
+
+def _money(value) -> str:
+    text = str(value if value is not None else "").strip().replace("$", "")
+    try:
+        amount = float(text.replace(",", ""))
+    except ValueError:
+        return ""
+    if not math.isfinite(amount):  # "NaN" and "Infinity" parse as floats
+        return ""
+    return f"${amount:,.0f}" if amount == int(amount) else f"${amount:,.2f}"
+
+
+def _cost(offers) -> str:
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    if not isinstance(offers, dict):
+        return ""
+    currency = (offers.get("priceCurrency") or "USD").upper()
+    if currency != "USD":
+        return ""
+    low, high = _money(offers.get("lowPrice")), _money(offers.get("highPrice"))
+    if low and high and low != high:
+        return f"{low}-{high}"
+    price = _money(offers.get("price")) or low or high
+    if price == "$0":
+        return "Free"
+    if not price and isinstance(offers.get("priceSpecification"), dict):
+        return _cost({**offers["priceSpecification"], "priceCurrency": currency})
+    return price
+
+
+def _ages(event):
+    audience = event.get("audience") if isinstance(event.get("audience"), dict) else {}
+    lo = str(audience.get("suggestedMinAge") or "").strip()
+    hi = str(audience.get("suggestedMaxAge") or "").strip()
+    m = AGE_RANGE_RE.search(str(event.get("typicalAgeRange") or ""))
+    if m and m.group(1):
+        lo, hi = lo or m.group(1), hi or m.group(2)
+    elif m:
+        lo = lo or m.group(3)
+    lo = str(int(float(lo))) if re.match(r"^\d+(\.0+)?$", lo) else ""
+    hi = str(int(float(hi))) if re.match(r"^\d+(\.0+)?$", hi) else ""
+    return lo, hi
+
+
+def _address(location) -> str:
+    if isinstance(location, list):
+        location = location[0] if location else {}
+    if isinstance(location, str):
+        return location.strip()
+    if not isinstance(location, dict):
+        return ""
+    address = location.get("address", location)
+    if isinstance(address, str):
+        return address.strip()
+    if not isinstance(address, dict):
+        return ""
+    street = str(address.get("streetAddress") or "").strip()
+    city = str(address.get("addressLocality") or "").strip()
+    region = str(address.get("addressRegion") or "").strip()
+    if region.lower() == "vermont":
+        region = "VT"
+    postcode = str(address.get("postalCode") or "").strip()
+    if not street:
+        return ""
+    line2 = ", ".join(p for p in (city, f"{region} {postcode}".strip()) if p)
+    return f"{street}, {line2}" if line2 else street
+
+
+def candidates_from_event(event: dict) -> dict:
+    age_min, age_max = _ages(event)
+    return {
+        "start_date": _date(event.get("startDate")),
+        "end_date": _date(event.get("endDate")),
+        "cost_raw": _cost(event.get("offers")),
+        "age_min": age_min,
+        "age_max": age_max,
+        "site_address": _address(event.get("location")),
+    }
+
+
+def extract_candidates(jsonld_events, microdata_items) -> dict:
+    """Candidates from the page's best Event: most fields filled, first on a tie."""
+    events = list(jsonld_events)
+    for props in microdata_items:
+        md = microdata_event(props)
+        if md:
+            events.append(md)
+
+    best = {}
+    for event in events:
+        found = {field: value for field, value in candidates_from_event(event).items() if value}
+        if len(found) > len(best):
+            best = found
+    return best